@@ -3,7 +3,20 @@ from .weclappy import (
     WeclappAPIError,
     WeclappEntity,
     WeclappResponse,
+    DocumentMirror,
+    ArticleImageCache,
+    JsonCodec,
+    MetricsRegistry,
+    Tracer,
+    Span,
+    OpenTelemetryTracer,
+    ChromeTraceProfiler,
+    Transport,
+    RecordingTransport,
+    ReplayTransport,
+    get_json_codec,
     MIME_TYPES,
+    EXTENSIONS_BY_MIME_TYPE,
     infer_content_type,
 )
 
@@ -12,6 +25,19 @@ __all__ = [
     "WeclappAPIError",
     "WeclappEntity",
     "WeclappResponse",
+    "DocumentMirror",
+    "ArticleImageCache",
+    "JsonCodec",
+    "MetricsRegistry",
+    "Tracer",
+    "Span",
+    "OpenTelemetryTracer",
+    "ChromeTraceProfiler",
+    "Transport",
+    "RecordingTransport",
+    "ReplayTransport",
+    "get_json_codec",
     "MIME_TYPES",
+    "EXTENSIONS_BY_MIME_TYPE",
     "infer_content_type",
 ]
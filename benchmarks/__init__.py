@@ -0,0 +1 @@
+"""Offline benchmarks for weclappy. Not part of the installed package."""
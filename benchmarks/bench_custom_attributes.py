@@ -0,0 +1,116 @@
+"""Benchmark customAttribute flattening on attribute-heavy pages.
+
+Wraps a synthetic page of articles carrying many ``customAttributes`` without
+``internalName`` (the real weclapp shape) and compares the client's compiled
+flattening plan against the previous per-row resolution loop.
+
+Usage::
+
+    python -m benchmarks.bench_custom_attributes --rows 1000 --attributes 60
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from weclappy import Weclapp, WeclappEntity  # noqa: E402
+
+_TYPES = (
+    ('STRING', 'stringValue', 'text'),
+    ('DECIMAL', 'numberValue', '12.5'),
+    ('BOOLEAN', 'booleanValue', True),
+    ('DATE', 'dateValue', 1700000000000),
+    ('LIST', 'selectedValueId', '4711'),
+)
+
+
+def build_page(rows: int, attributes: int):
+    definitions = {}
+    for n in range(attributes):
+        attr_type, _, _ = _TYPES[n % len(_TYPES)]
+        definitions[f"def-{n}"] = {
+            'id': f"def-{n}",
+            'attributeKey': f"attr{n}",
+            'attributeType': attr_type,
+        }
+    page = []
+    for r in range(rows):
+        custom_attributes = []
+        for n in range(attributes):
+            _, field, value = _TYPES[n % len(_TYPES)]
+            item = {'attributeDefinitionId': f"def-{n}", 'stringValue': None}
+            item[field] = value
+            custom_attributes.append(item)
+        page.append({'id': str(r), 'articleNumber': f"A-{r}", 'customAttributes': custom_attributes})
+    return page, definitions
+
+
+def legacy_flatten(entity, custom_attributes, attribute_definitions):
+    """Per-row resolution loop used before flattening plans were compiled."""
+    index = entity._custom_attr_index
+    for position, item in enumerate(custom_attributes):
+        if not isinstance(item, dict):
+            continue
+        name = item.get('internalName')
+        if not name:
+            attr_def_id = item.get('attributeDefinitionId')
+            if attr_def_id and attribute_definitions:
+                defn = attribute_definitions.get(attr_def_id)
+                if defn:
+                    name = defn.get('attributeKey') or defn.get('internalName')
+        if not name:
+            continue
+        value, value_field = None, 'stringValue'
+        for field in WeclappEntity._CUSTOM_ATTRIBUTE_VALUE_FIELDS:
+            if field in item and item[field] is not None:
+                value, value_field = item[field], field
+                break
+        if name in entity:
+            continue
+        dict.__setitem__(entity, name, value)
+        index[name] = (position, value_field, item.get('attributeDefinitionId'))
+
+
+def best_of(repeat: int, fn) -> float:
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=1000)
+    parser.add_argument('--attributes', type=int, default=60)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args(argv)
+
+    page, definitions = build_page(args.rows, args.attributes)
+    client = Weclapp('http://localhost/webapp/api/v1', 'benchmark')
+    client._attribute_definitions_by_id = definitions
+
+    planned = best_of(args.repeat, lambda: client._wrap_rows(page, None, None))
+
+    original = WeclappEntity._flatten_custom_attributes
+    WeclappEntity._flatten_custom_attributes = classmethod(
+        lambda cls, entity, cas, _defs=None: legacy_flatten(entity, cas, definitions)
+    )
+    try:
+        legacy = best_of(args.repeat, lambda: client._wrap_rows(page, None, None))
+    finally:
+        WeclappEntity._flatten_custom_attributes = original
+
+    print(f"rows={args.rows} attributes={args.attributes}")
+    print(f"legacy per-row resolution: {legacy * 1000:8.1f} ms ({args.rows / legacy:,.0f} rows/s)")
+    print(f"compiled plan:             {planned * 1000:8.1f} ms ({args.rows / planned:,.0f} rows/s)")
+    print(f"speedup:                   {legacy / planned:8.2f}x")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
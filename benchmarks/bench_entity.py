@@ -0,0 +1,314 @@
+"""Microbenchmarks for WeclappEntity wrapping, attribute access and to_payload.
+
+Times the per-row and per-field hot paths on fixed synthetic rows:
+
+- ``from_row`` on a flat row, a salesOrder with nested orderItems, an article
+  with 60 customAttributes and a row with many ``*Id`` references;
+- ``__getattr__`` on a plain field, a flattened customAttribute and a
+  resolved reference (cached, uncached and via the flat id fallback);
+- ``to_payload`` round trips of the nested and customAttribute rows.
+
+Each case reports ns/op and its cost relative to a fixed pure-Python
+calibration loop timed right before each run (the fastest of ``--repeat``
+runs of about ``--min-time`` seconds, and the median per-run ratio), and
+allocations/op measured with tracemalloc: memory blocks and bytes still
+allocated per call when every result is kept alive.
+
+``--save-baseline`` stores the relative costs and allocations as JSON, without
+absolute timings. ``--check`` compares a run against a stored baseline and
+exits with status 1 if any case's relative cost, or its blocks/op, grew by more
+than ``--threshold`` percent. Normalizing by the calibration loop makes the
+baseline usable across machines and under CPU frequency changes; it cannot
+cancel every difference between interpreters, so keep the baseline on the
+Python version that runs the check.
+
+Usage::
+
+    python -m benchmarks.bench_entity
+    python -m benchmarks.bench_entity --save-baseline
+    python -m benchmarks.bench_entity --check --threshold 15
+"""
+
+import argparse
+import gc
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List, Tuple
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from weclappy import WeclappEntity, _CustomAttributePlan  # noqa: E402
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(__file__), 'baselines', 'bench_entity.json')
+
+_TYPES = (
+    ('STRING', 'stringValue', 'text'),
+    ('DECIMAL', 'numberValue', '12.5'),
+    ('BOOLEAN', 'booleanValue', True),
+    ('DATE', 'dateValue', 1700000000000),
+    ('LIST', 'selectedValueId', '4711'),
+)
+
+
+def flat_row() -> Dict[str, Any]:
+    row = {'id': '100001', 'version': '7', 'name': 'Schraube M6', 'articleNumber': 'A-100001'}
+    row.update({f"field{n}": f"value {n}" for n in range(20)})
+    return row
+
+
+def nested_row(items: int = 20) -> Dict[str, Any]:
+    return {
+        'id': '200001',
+        'orderNumber': 'SO-200001',
+        'customerId': '5001',
+        'recordAddress': {'street1': 'Hauptstraße 1', 'city': 'Köln', 'countryCode': 'DE'},
+        'orderItems': [
+            {
+                'id': f"item-{i}",
+                'articleId': str(9000 + i),
+                'quantity': str(i + 1),
+                'unitPrice': '19.99',
+                'reductionAdditionItems': [{'id': f"red-{i}", 'type': 'REDUCTION', 'value': '5'}],
+                'shipmentInformation': {'weight': '1.5', 'packaging': {'type': 'BOX', 'size': 'M'}},
+            }
+            for i in range(items)
+        ],
+    }
+
+
+def custom_attribute_row(attributes: int = 60) -> Tuple[Dict[str, Any], Dict[str, Dict[str, Any]]]:
+    definitions = {}
+    custom_attributes = []
+    for n in range(attributes):
+        attr_type, field, value = _TYPES[n % len(_TYPES)]
+        definitions[f"def-{n}"] = {'id': f"def-{n}", 'attributeKey': f"attr{n}", 'attributeType': attr_type}
+        item = {'attributeDefinitionId': f"def-{n}", 'stringValue': None}
+        item[field] = value
+        custom_attributes.append(item)
+    return {'id': '300001', 'articleNumber': 'A-300001', 'customAttributes': custom_attributes}, definitions
+
+
+def referenced_row(references: int = 10, bucket_size: int = 1000):
+    referenced = {
+        f"ref{b}": {str(n): {'id': str(n), 'name': f"ref{b} {n}"} for n in range(bucket_size)}
+        for b in range(references)
+    }
+    referenced['party'] = {str(n): {'id': str(n), 'name': f"Party {n}"} for n in range(bucket_size)}
+    row = {'id': '400001', 'customerId': '42'}
+    row.update({f"ref{b}Id": str((b * 37) % bucket_size) for b in range(references)})
+    return row, referenced
+
+
+def build_cases() -> List[Tuple[str, Callable[[], Any]]]:
+    flat = flat_row()
+    nested = nested_row()
+    attributed, definitions = custom_attribute_row()
+    refs, referenced = referenced_row()
+    # Weclapp._wrap_rows compiles one plan per definition set and passes it to every row.
+    plan = _CustomAttributePlan(definitions)
+
+    nested_entity = WeclappEntity.from_row(nested)
+    attributed_entity = WeclappEntity.from_row(attributed, attribute_definitions=definitions)
+    refs_entity = WeclappEntity.from_row(refs, referenced_entities=referenced)
+    refs_entity.ref3  # populate the reference cache for the cached case
+
+    def uncached_reference():
+        refs_entity._ref_cache.clear()
+        return refs_entity._resolve_reference('ref7', refs['ref7Id'])
+
+    def fallback_reference():
+        # customerId has no 'customer' bucket, so it falls back to the flat id scan.
+        refs_entity._ref_cache.clear()
+        return refs_entity._resolve_reference('customer', refs['customerId'])
+
+    return [
+        ('from_row flat (24 fields)', lambda: WeclappEntity.from_row(flat)),
+        ('from_row nested (20 orderItems)', lambda: WeclappEntity.from_row(nested)),
+        ('from_row 60 customAttributes', lambda: WeclappEntity.from_row(attributed, attribute_definitions=plan)),
+        ('from_row 10 references', lambda: WeclappEntity.from_row(refs, referenced_entities=referenced)),
+        ('getattr plain field', lambda: nested_entity.orderNumber),
+        ('getattr customAttribute', lambda: attributed_entity.attr42),
+        ('getattr reference (cached)', lambda: refs_entity.ref3),
+        ('_resolve_reference (uncached)', uncached_reference),
+        ('_resolve_reference (id fallback)', fallback_reference),
+        ('to_payload nested (20 orderItems)', nested_entity.to_payload),
+        ('to_payload 60 customAttributes', attributed_entity.to_payload),
+    ]
+
+
+def calibration() -> Any:
+    """Fixed dict, list and attribute work that ``relative`` costs are measured against."""
+    row = {f"field{n}": n for n in range(16)}
+    items = [{'id': key, 'value': value} for key, value in row.items() if value % 3]
+    return sorted(items, key=lambda item: item['value'], reverse=True)
+
+
+def loop_size(fn: Callable[[], Any], min_time: float) -> int:
+    """Number of calls that take about ``min_time`` seconds."""
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        if time.perf_counter() - start >= min_time / 10:
+            return number * 10
+        number *= 2
+
+
+def time_per_op(fn: Callable[[], Any], min_time: float, repeat: int) -> Tuple[float, float]:
+    """Return ``(ns/op, relative cost)`` over ``repeat`` runs.
+
+    Each run times the calibration loop right before ``fn``, so both see the
+    same CPU frequency and load. ns/op is the fastest run; the relative cost
+    is the median of the per-run ratios, which ignores runs where another
+    process interrupted only one of the pair. The garbage collector is off
+    while timing, as in ``timeit``.
+    """
+    number = loop_size(fn, min_time)
+    calibration_number = loop_size(calibration, min_time)
+    best = float('inf')
+    ratios = []
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        for _ in range(repeat):
+            start = time.perf_counter()
+            for _ in range(calibration_number):
+                calibration()
+            calibration_seconds = (time.perf_counter() - start) / calibration_number
+            start = time.perf_counter()
+            for _ in range(number):
+                fn()
+            seconds = (time.perf_counter() - start) / number
+            best = min(best, seconds)
+            ratios.append(seconds / calibration_seconds)
+            gc.collect()
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+    return best * 1e9, statistics.median(ratios)
+
+
+def allocations_per_op(fn: Callable[[], Any], number: int) -> Tuple[float, float]:
+    """Return (blocks, bytes) allocated per call, keeping every result alive."""
+    results = []
+    gc.collect()
+    tracemalloc.start()
+    try:
+        before = tracemalloc.take_snapshot()
+        for _ in range(number):
+            results.append(fn())
+        after = tracemalloc.take_snapshot()
+    finally:
+        tracemalloc.stop()
+    # Ignore tracemalloc's own bookkeeping and the list holding the results.
+    filters = [tracemalloc.Filter(False, tracemalloc.__file__)]
+    stats = after.filter_traces(filters).compare_to(before.filter_traces(filters), 'filename')
+    blocks = sum(stat.count_diff for stat in stats if stat.traceback[0].filename != __file__)
+    size = sum(stat.size_diff for stat in stats if stat.traceback[0].filename != __file__)
+    del results
+    return blocks / number, size / number
+
+
+def run(min_time: float, repeat: int, allocation_calls: int) -> List[Dict[str, Any]]:
+    results = []
+    for name, fn in build_cases():
+        fn()  # warm caches (compiled attribute plan, method lookups)
+        blocks, size = allocations_per_op(fn, allocation_calls)
+        ns_per_op, relative = time_per_op(fn, min_time, repeat)
+        results.append({
+            'name': name,
+            'ns_per_op': ns_per_op,
+            'relative': relative,
+            'blocks_per_op': blocks,
+            'bytes_per_op': size,
+        })
+    return results
+
+
+def check(results: List[Dict[str, Any]], baseline: Dict[str, Any], threshold: float) -> List[str]:
+    """Return a message for every case that regressed past ``threshold`` percent."""
+    previous = {case['name']: case for case in baseline['results']}
+    regressions = []
+    for case in results:
+        before = previous.get(case['name'])
+        if before is None:
+            continue
+        for key, label in (('relative', 'relative cost'), ('blocks_per_op', 'blocks/op')):
+            # Half a block of slack so 0 -> 0.4 blocks/op is not a regression.
+            limit = before[key] * (1 + threshold / 100) + (0.5 if key == 'blocks_per_op' else 0)
+            if case[key] > limit:
+                regressions.append(
+                    f"{case['name']}: {label} {before[key]:.2f} -> {case[key]:.2f} "
+                    f"({(case[key] / before[key] - 1) * 100 if before[key] else float('inf'):+.0f}%)"
+                )
+    return regressions
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--min-time', type=float, default=0.2, help='seconds per timing run')
+    parser.add_argument('--repeat', type=int, default=7)
+    parser.add_argument('--allocation-calls', type=int, default=200, help='calls traced for allocations/op')
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE, help='baseline JSON path')
+    parser.add_argument('--save-baseline', action='store_true', help='store this run as the baseline')
+    parser.add_argument('--check', action='store_true', help='fail on regressions against the baseline')
+    parser.add_argument('--threshold', type=float, default=20.0, help='allowed slowdown in percent')
+    args = parser.parse_args(argv)
+
+    results = run(args.min_time, args.repeat, args.allocation_calls)
+    baseline = None
+    if os.path.exists(args.baseline) and not args.save_baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)
+    previous = {case['name']: case for case in baseline['results']} if baseline else {}
+
+    print(
+        f"{'case':36s} {'ns/op':>11s} {'relative':>9s} {'blocks/op':>10s} {'bytes/op':>10s}"
+        + (f" {'vs base':>8s}" if previous else '')
+    )
+    for case in results:
+        line = (
+            f"{case['name']:36s} {case['ns_per_op']:11,.0f} {case['relative']:9.2f} "
+            f"{case['blocks_per_op']:10.1f} {case['bytes_per_op']:10,.0f}"
+        )
+        if case['name'] in previous:
+            line += f" {(case['relative'] / previous[case['name']]['relative'] - 1) * 100:+7.1f}%"
+        print(line)
+
+    if args.save_baseline:
+        os.makedirs(os.path.dirname(os.path.abspath(args.baseline)), exist_ok=True)
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump({
+                'benchmark': 'entity',
+                'python': platform.python_version(),
+                'platform': platform.platform(),
+                # Absolute timings only describe the machine that saved the baseline.
+                'results': [
+                    {key: value for key, value in case.items() if key != 'ns_per_op'} for case in results
+                ],
+            }, f, indent=2)
+            f.write('\n')
+        print(f"saved baseline to {args.baseline}")
+
+    if args.check:
+        if baseline is None:
+            print(f"no baseline at {args.baseline}; run with --save-baseline first")
+            return 2
+        regressions = check(results, baseline, args.threshold)
+        if regressions:
+            print(f"{len(regressions)} regression(s) over {args.threshold:g}%:")
+            for message in regressions:
+                print(f"  {message}")
+            return 1
+        print(f"no regressions over {args.threshold:g}%")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,104 @@
+"""Throughput and tail latency of get_all under injected faults.
+
+Runs threaded ``get_all`` against the local stub server once per fault
+profile from ``tests/fault_injection.py`` (healthy, slow_tail, rate_limited,
+flaky_5xx, resets, truncated). The faults are injected below the client's
+urllib3 ``Retry`` policy, so retries, backoff and ``Retry-After`` waits are
+part of the measured time. Pages that still fail are dropped by threaded
+``get_all``; the ``lost`` column counts the rows that went missing. A run
+whose ``/count`` request fails raises and is counted under ``failed``.
+
+Usage::
+
+    python -m benchmarks.bench_faults --rows 5000 --workers 8
+    python -m benchmarks.bench_faults --profiles healthy,flaky_5xx --runs 5
+"""
+
+import argparse
+import logging
+import os
+import sys
+import time
+
+import requests
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, REPO_ROOT)
+sys.path.insert(0, os.path.join(REPO_ROOT, 'tests'))
+
+import weclappy  # noqa: E402
+from weclappy import Weclapp, WeclappAPIError  # noqa: E402
+from benchmarks.stub_server import StubServer, custom_attribute_definitions, sales_order_rows  # noqa: E402
+from fault_injection import PROFILES, FaultInjectingAdapter  # noqa: E402
+
+
+def run_profile(base_url: str, profile, rows: int, workers: int, runs: int, seed: int):
+    client = Weclapp(base_url, 'benchmark', pool_maxsize='auto')
+    client.get_all('salesOrder', limit=1)  # load customAttributeDefinitions before faults start
+    client.metrics.reset()
+    adapter = FaultInjectingAdapter.mount(client, profile, seed=seed)
+
+    fetched = 0
+    failed = 0
+    start = time.perf_counter()
+    for _ in range(runs):
+        try:
+            fetched += len(client.get_all('salesOrder', threaded=True, max_workers=workers))
+        except (WeclappAPIError, requests.exceptions.RequestException):
+            failed += 1
+    seconds = time.perf_counter() - start
+    stats = client.stats()
+    return {
+        'profile': profile.name,
+        'rows_per_second': fetched / seconds,
+        'lost': rows * (runs - failed) - fetched,
+        'failed': failed,
+        'latency_ms': stats['latency_ms'],
+        'requests': stats['requests'],
+        'retries': stats['retries'],
+        'rate_limited': stats['rate_limited'],
+        'errors': stats['errors'],
+        'injected': adapter.injected,
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=5000)
+    parser.add_argument('--workers', type=int, default=8)
+    parser.add_argument('--runs', type=int, default=3, help='get_all runs per profile')
+    parser.add_argument('--profiles', default=','.join(PROFILES), help='comma-separated profile names')
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args(argv)
+
+    # Dropped pages are logged as errors; the table reports them instead.
+    logging.getLogger('weclappy').setLevel(logging.CRITICAL)
+    # Small pages give enough requests for meaningful percentiles.
+    weclappy.DEFAULT_PAGE_SIZE = 100
+
+    datasets = {
+        'salesOrder': sales_order_rows(args.rows),
+        'customAttributeDefinition': custom_attribute_definitions(5),
+    }
+    print(
+        f"{'profile':13s} {'rows/s':>8s} {'lost':>6s} {'p50 ms':>7s} {'p95 ms':>7s} {'p99 ms':>7s} "
+        f"{'req':>5s} {'retry':>5s} {'429':>4s} {'err':>4s} {'failed':>6s}  injected"
+    )
+    with StubServer(datasets) as server:
+        for name in args.profiles.split(','):
+            r = run_profile(server.base_url, PROFILES[name], args.rows, args.workers, args.runs, args.seed)
+            latency = r['latency_ms']
+            injected = ', '.join(
+                f"{fault}={count}" for fault, count in r['injected'].items()
+                if count and fault != 'latency_seconds'
+            )
+            print(
+                f"{r['profile']:13s} {r['rows_per_second']:8.0f} {r['lost']:6d} {latency['p50']:7.1f} "
+                f"{latency['p95']:7.1f} {latency['p99']:7.1f} {r['requests']:5d} {r['retries']:5d} "
+                f"{r['rate_limited']:4d} {r['errors']:4d} {r['failed']:6d}  {injected or '-'}"
+            )
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
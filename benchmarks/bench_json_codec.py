@@ -0,0 +1,120 @@
+"""Benchmark JSON codecs on 1000-row salesOrder pages.
+
+Compares the previous response path (``content.strip()`` emptiness check plus
+``response.json()``) with ``Weclapp._decode_json`` for every installed codec,
+and stdlib ``json=`` request encoding with ``Weclapp._encode_json`` on
+``WeclappEntity.to_payload()`` output.
+
+Usage::
+
+    python -m benchmarks.bench_json_codec --rows 1000
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+import requests
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from weclappy import Weclapp, WeclappEntity, get_json_codec  # noqa: E402
+
+
+def build_sales_order_page(rows: int):
+    result = []
+    for n in range(rows):
+        result.append({
+            'id': str(100000 + n),
+            'version': '3',
+            'orderNumber': f"SO-{n:06d}",
+            'customerId': str(5000 + n % 50),
+            'orderDate': 1700000000000 + n,
+            'status': 'ORDER_CONFIRMATION_PRINTED',
+            'netAmount': f"{n * 1.5:.2f}",
+            'grossAmount': f"{n * 1.785:.2f}",
+            'recordAddress': {'street1': 'Hauptstraße 1', 'city': 'Köln', 'zipcode': '50667', 'countryCode': 'DE'},
+            'orderItems': [
+                {
+                    'id': f"{n}-{i}",
+                    'articleId': str(9000 + i),
+                    'quantity': str(i + 1),
+                    'unitPrice': '19.99',
+                    'title': f"Artikel {i}",
+                    'description': 'Lorem ipsum dolor sit amet ' * 3,
+                }
+                for i in range(5)
+            ],
+            'customAttributes': [
+                {'attributeDefinitionId': f"def-{a}", 'stringValue': f"value {a}"} for a in range(5)
+            ],
+        })
+    return {'result': result}
+
+
+def make_response(body: bytes) -> requests.Response:
+    response = requests.Response()
+    response.status_code = 200
+    response.headers['Content-Type'] = 'application/json'
+    response._content = body
+    return response
+
+
+def best_of(repeat: int, fn) -> float:
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def legacy_decode(response: requests.Response):
+    if not response.content.strip():
+        return {}
+    return response.json()
+
+
+def legacy_encode(payloads):
+    # What requests does for ``json=``: stdlib dumps, then encode to UTF-8.
+    for payload in payloads:
+        json.dumps(payload, allow_nan=False).encode('utf-8')
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=1000)
+    parser.add_argument('--repeat', type=int, default=10)
+    args = parser.parse_args(argv)
+
+    page = build_sales_order_page(args.rows)
+    body = json.dumps(page).encode('utf-8')
+    response = make_response(body)
+    payloads = [WeclappEntity.from_row(row).to_payload() for row in page['result']]
+
+    print(f"salesOrder page: {args.rows} rows, {len(body) / 1024:.0f} KiB")
+    legacy = best_of(args.repeat, lambda: legacy_decode(response))
+    print(f"decode  strip + response.json(): {legacy * 1000:8.2f} ms")
+    legacy_enc = best_of(args.repeat, lambda: legacy_encode(payloads))
+    print(f"encode  requests json=:          {legacy_enc * 1000:8.2f} ms")
+
+    for name in ('json', 'ujson', 'msgspec', 'orjson'):
+        try:
+            codec = get_json_codec(name)
+        except ImportError:
+            print(f"{name:8s} not installed")
+            continue
+        client = Weclapp('http://localhost/webapp/api/v1', 'benchmark', json_codec=codec)
+        decode = best_of(args.repeat, lambda: client._decode_json(response))
+        encode = best_of(args.repeat, lambda: [client._encode_json(p) for p in payloads])
+        print(
+            f"{name:8s} decode {decode * 1000:8.2f} ms ({legacy / decode:5.2f}x)  "
+            f"encode {encode * 1000:8.2f} ms ({legacy_enc / encode:5.2f}x)"
+        )
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,318 @@
+"""Concurrent load test: many simulated jobs sharing one Weclapp client.
+
+Runs ``--jobs`` threads against a single :class:`weclappy.Weclapp` instance
+for ``--duration`` seconds. Each job picks operations from a weighted mix
+(``--mix``): get by id, one ``get`` page, a full ``get_all`` of a small
+filtered set, ``put`` and ``download``. The stub server runs in a separate
+process, so the client's CPU time is its own. Optionally a fault profile from
+``tests/fault_injection.py`` is mounted below the client's retry policy.
+
+Each concurrency level reports operations/s, latency percentiles and error
+rate per operation type, client CPU utilisation and connection pool
+contention (time spent waiting for a pooled connection, connections opened and
+discarded). When several levels are given, the saturation point is the last
+level that still raised throughput by ``--gain`` percent or more.
+
+Usage::
+
+    python -m benchmarks.bench_load --jobs 1,4,16,64 --duration 10
+    python -m benchmarks.bench_load --jobs 32 --mix get_by_id=1,page=1 --pool-maxsize 8
+    python -m benchmarks.bench_load --jobs 8,32 --profile flaky_5xx --json load.json
+"""
+
+import argparse
+import json
+import logging
+import multiprocessing
+import os
+import platform
+import random
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional
+
+import requests
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, REPO_ROOT)
+sys.path.insert(0, os.path.join(REPO_ROOT, 'tests'))
+
+import weclappy  # noqa: E402
+from weclappy import Weclapp, WeclappAPIError  # noqa: E402
+from benchmarks.bench_pagination import git_commit, parse_pool_size  # noqa: E402
+from benchmarks.stub_server import StubServer, custom_attribute_definitions, sales_order_rows  # noqa: E402
+
+DOCUMENTS = 20
+DEFAULT_MIX = 'get_by_id=5,page=3,get_all=1,put=2,download=1'
+
+
+def _get_by_id(client: Weclapp, rng: random.Random, settings: Dict[str, Any]) -> None:
+    client.get('salesOrder', id=str(100000 + rng.randrange(settings['rows'])))
+
+
+def _page(client: Weclapp, rng: random.Random, settings: Dict[str, Any]) -> None:
+    pages = max(1, settings['rows'] // settings['page_size'])
+    client.get('salesOrder', params={'page': rng.randint(1, pages), 'pageSize': settings['page_size']})
+
+
+def _get_all(client: Weclapp, rng: random.Random, settings: Dict[str, Any]) -> None:
+    client.get_all('salesOrder', limit=settings['page_size'] * 2)
+
+
+def _put(client: Weclapp, rng: random.Random, settings: Dict[str, Any]) -> None:
+    entity_id = str(100000 + rng.randrange(settings['rows']))
+    client.put('salesOrder', entity_id, {'version': '3', 'commission': f"load {rng.random():.6f}"})
+
+
+def _download(client: Weclapp, rng: random.Random, settings: Dict[str, Any]) -> None:
+    client.download('document', id=str(rng.randrange(DOCUMENTS)))
+
+
+OPERATIONS: Dict[str, Callable[[Weclapp, random.Random, Dict[str, Any]], None]] = {
+    'get_by_id': _get_by_id,
+    'page': _page,
+    'get_all': _get_all,
+    'put': _put,
+    'download': _download,
+}
+
+
+def parse_mix(value: str) -> Dict[str, float]:
+    mix = {}
+    for item in value.split(','):
+        name, _, weight = item.partition('=')
+        if name not in OPERATIONS:
+            raise argparse.ArgumentTypeError(f"unknown operation {name!r} (choose from {', '.join(OPERATIONS)})")
+        mix[name] = float(weight or 1)
+    return mix
+
+
+def percentiles(samples: List[float]) -> Dict[str, float]:
+    if not samples:
+        return {'p50': 0.0, 'p95': 0.0, 'p99': 0.0, 'max': 0.0}
+    ordered = sorted(samples)
+
+    def at(quantile: float) -> float:
+        return ordered[min(len(ordered) - 1, int(quantile * len(ordered)))]
+
+    return {'p50': at(0.50), 'p95': at(0.95), 'p99': at(0.99), 'max': ordered[-1]}
+
+
+def _error_name(error: BaseException) -> str:
+    if isinstance(error, WeclappAPIError):
+        return f"HTTP {error.status_code}" if error.status_code else type(error.__cause__ or error).__name__
+    return type(error).__name__
+
+
+def run_level(base_url: str, jobs: int, args) -> Dict[str, Any]:
+    """Drive ``jobs`` concurrent workloads through one client for ``args.duration`` seconds."""
+    client = Weclapp(base_url, 'benchmark', pool_maxsize=args.pool_maxsize)
+    client.get_all('salesOrder', limit=1)  # load customAttributeDefinitions before measuring
+    adapter = None
+    if args.profile:
+        from fault_injection import PROFILES, FaultInjectingAdapter
+        adapter = FaultInjectingAdapter.mount(client, PROFILES[args.profile], seed=args.seed)
+    client.metrics.reset()
+
+    settings = {'rows': args.rows, 'page_size': args.page_size}
+    names = list(args.mix)
+    weights = [args.mix[name] for name in names]
+    latencies: Dict[str, List[float]] = {name: [] for name in names}
+    errors: Dict[str, Dict[str, int]] = {name: {} for name in names}
+    lock = threading.Lock()
+    start_barrier = threading.Barrier(jobs + 1)
+    deadline = [0.0]
+
+    def job(number: int) -> None:
+        rng = random.Random(args.seed * 1000 + number)
+        own: Dict[str, List[float]] = {name: [] for name in names}
+        own_errors: Dict[str, Dict[str, int]] = {name: {} for name in names}
+        start_barrier.wait()
+        while time.perf_counter() < deadline[0]:
+            name = rng.choices(names, weights)[0]
+            started = time.perf_counter()
+            try:
+                OPERATIONS[name](client, rng, settings)
+            except (WeclappAPIError, requests.exceptions.RequestException) as error:
+                kind = _error_name(error)
+                own_errors[name][kind] = own_errors[name].get(kind, 0) + 1
+            own[name].append((time.perf_counter() - started) * 1000)
+        with lock:
+            for name in names:
+                latencies[name].extend(own[name])
+                for kind, count in own_errors[name].items():
+                    errors[name][kind] = errors[name].get(kind, 0) + count
+
+    threads = [threading.Thread(target=job, args=(n,), daemon=True) for n in range(jobs)]
+    for thread in threads:
+        thread.start()
+    cpu_start = time.process_time()
+    started = time.perf_counter()
+    deadline[0] = started + args.duration
+    start_barrier.wait()
+    for thread in threads:
+        thread.join()
+    seconds = time.perf_counter() - started
+    cpu_seconds = time.process_time() - cpu_start
+
+    stats = client.stats()
+    pool = stats['pool']
+    operations = {}
+    for name in names:
+        count = len(latencies[name])
+        failed = sum(errors[name].values())
+        operations[name] = {
+            'operations': count,
+            'operations_per_second': count / seconds,
+            'latency_ms': percentiles(latencies[name]),
+            'errors': failed,
+            'error_rate': failed / count if count else 0.0,
+            'error_kinds': errors[name],
+        }
+    total = sum(op['operations'] for op in operations.values())
+    return {
+        'jobs': jobs,
+        'seconds': seconds,
+        'operations': total,
+        'operations_per_second': total / seconds,
+        'error_rate': sum(op['errors'] for op in operations.values()) / total if total else 0.0,
+        # Above ~100% only if the client released the GIL long enough for threads to overlap.
+        'cpu_percent': cpu_seconds / seconds * 100,
+        'requests': stats['requests'],
+        'retries': stats['retries'],
+        'rate_limited': stats['rate_limited'],
+        'pool': {
+            'maxsize': pool['maxsize'],
+            'checkouts': pool['checkouts'],
+            'wait_ms_per_checkout': pool['wait_seconds'] * 1000 / pool['checkouts'] if pool['checkouts'] else 0.0,
+            'wait_seconds': pool['wait_seconds'],
+            'connections_opened': pool['connections_opened'],
+            'connections_discarded': pool['connections_discarded'],
+        },
+        'injected': adapter.injected if adapter is not None else None,
+        'by_operation': operations,
+    }
+
+
+def saturation(levels: List[Dict[str, Any]], gain_percent: float) -> Optional[Dict[str, Any]]:
+    """The last level whose throughput grew by ``gain_percent`` over the previous one."""
+    best = levels[0] if levels else None
+    for previous, level in zip(levels, levels[1:]):
+        if level['operations_per_second'] < previous['operations_per_second'] * (1 + gain_percent / 100):
+            break
+        best = level
+    return best
+
+
+def _serve(connection, rows: int, latency_ms: float, jitter_ms: float, document_kib: int) -> None:
+    datasets = {
+        'salesOrder': sales_order_rows(rows),
+        'customAttributeDefinition': custom_attribute_definitions(5),
+    }
+    payload = os.urandom(document_kib * 1024)
+    downloads = {f"document/id/{n}/download": payload for n in range(DOCUMENTS)}
+    with StubServer(datasets, latency_ms=latency_ms, jitter_ms=jitter_ms, downloads=downloads) as server:
+        connection.send(server.base_url)
+        connection.recv()  # block until the parent is done
+
+
+def print_level(level: Dict[str, Any]) -> None:
+    pool = level['pool']
+    print(
+        f"\njobs={level['jobs']}: {level['operations_per_second']:.0f} ops/s, "
+        f"{level['error_rate'] * 100:.1f}% errors, client CPU {level['cpu_percent']:.0f}%, "
+        f"pool wait {pool['wait_ms_per_checkout']:.2f} ms/checkout (maxsize {pool['maxsize']}, "
+        f"{pool['connections_opened']} opened, {pool['connections_discarded']} discarded), "
+        f"{level['retries']} retries"
+    )
+    if level['injected']:
+        print('  injected: ' + ', '.join(
+            f"{fault}={count}" for fault, count in level['injected'].items() if count and fault != 'latency_seconds'
+        ))
+    print(f"  {'operation':10s} {'ops':>7s} {'ops/s':>8s} {'p50 ms':>7s} {'p95 ms':>7s} {'p99 ms':>7s} {'max ms':>7s} {'err %':>6s}  errors")
+    for name, op in level['by_operation'].items():
+        latency = op['latency_ms']
+        kinds = ', '.join(f"{kind}={count}" for kind, count in sorted(op['error_kinds'].items()))
+        print(
+            f"  {name:10s} {op['operations']:7d} {op['operations_per_second']:8.1f} {latency['p50']:7.1f} "
+            f"{latency['p95']:7.1f} {latency['p99']:7.1f} {latency['max']:7.1f} "
+            f"{op['error_rate'] * 100:6.1f}  {kinds or '-'}"
+        )
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--jobs', type=lambda v: [int(j) for j in v.split(',')], default=[1, 4, 16, 32],
+                        help='comma-separated concurrency levels')
+    parser.add_argument('--duration', type=float, default=5.0, help='seconds per concurrency level')
+    parser.add_argument('--mix', type=parse_mix, default=parse_mix(DEFAULT_MIX),
+                        help=f"weighted operations (default {DEFAULT_MIX})")
+    parser.add_argument('--rows', type=int, default=5000, help='salesOrder rows served by the stub')
+    parser.add_argument('--page-size', type=int, default=100)
+    parser.add_argument('--document-kib', type=int, default=256, help='size of each downloadable document')
+    parser.add_argument('--latency-ms', type=float, default=10.0, help='server latency per request')
+    parser.add_argument('--jitter-ms', type=float, default=5.0, help='extra random latency per request')
+    parser.add_argument('--pool-maxsize', type=parse_pool_size, default=10)
+    parser.add_argument('--profile', help='fault profile from tests/fault_injection.py')
+    parser.add_argument('--gain', type=float, default=10.0,
+                        help='minimum throughput gain in percent for a level to count as unsaturated')
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--json', metavar='PATH', help='write machine-readable results to PATH')
+    args = parser.parse_args(argv)
+
+    # Failed operations are counted in the report; keep the log quiet.
+    logging.getLogger('weclappy').setLevel(logging.CRITICAL)
+    weclappy.DEFAULT_PAGE_SIZE = args.page_size
+
+    context = multiprocessing.get_context('spawn')
+    parent, child = context.Pipe()
+    server = context.Process(
+        target=_serve, args=(child, args.rows, args.latency_ms, args.jitter_ms, args.document_kib), daemon=True
+    )
+    server.start()
+    levels = []
+    try:
+        base_url = parent.recv()
+        print(
+            f"stub: {args.rows} salesOrder rows, {args.latency_ms:g} ms (+{args.jitter_ms:g} ms jitter) "
+            f"latency at {base_url}; mix {', '.join(f'{n}={w:g}' for n, w in args.mix.items())}"
+        )
+        for jobs in args.jobs:
+            level = run_level(base_url, jobs, args)
+            print_level(level)
+            levels.append(level)
+    finally:
+        parent.send('stop')
+        server.join(timeout=5)
+
+    print(f"\n{'jobs':>5s} {'ops/s':>8s} {'err %':>6s} {'CPU %':>6s} {'wait ms':>8s}")
+    for level in levels:
+        print(
+            f"{level['jobs']:5d} {level['operations_per_second']:8.0f} {level['error_rate'] * 100:6.1f} "
+            f"{level['cpu_percent']:6.0f} {level['pool']['wait_ms_per_checkout']:8.2f}"
+        )
+    best = saturation(levels, args.gain)
+    if len(levels) > 1 and best is not None:
+        print(f"saturation: ~{best['jobs']} jobs ({best['operations_per_second']:.0f} ops/s)")
+
+    if args.json:
+        report = {
+            'benchmark': 'load',
+            'commit': git_commit(),
+            'timestamp': datetime.now(timezone.utc).isoformat(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'settings': {key: value for key, value in vars(args).items() if key != 'json'},
+            'saturation_jobs': best['jobs'] if best is not None else None,
+            'levels': levels,
+        }
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print(f"wrote {args.json}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,310 @@
+"""Memory per row of get_all: peak RSS and tracemalloc attribution by copy.
+
+Runs ``get_all`` over synthetic pages from the local stub server and reports,
+per mode:
+
+- peak RSS growth and bytes per row (measured without tracemalloc);
+- tracemalloc peak and retained bytes per row;
+- live memory by allocation site at three points: when wrapping starts (all
+  pages decoded and merged), when wrapping ends (raw rows and entities both
+  alive, usually the peak) and after ``get_all`` returned (what the caller
+  keeps); in ``pages`` mode, while the first page is held. Sites are
+  grouped into the copies a large export makes: raw response bodies
+  (requests/urllib3), decoded JSON pages, merged result lists in ``get_all``, ``WeclappResponse`` bookkeeping and wrapped
+  ``WeclappEntity`` rows. The snapshots are taken from ``weclapp.wrap`` span
+  hooks, so the client runs unmodified.
+
+Modes: ``sequential`` and ``threaded`` ``get_all``, and ``pages``: one
+``get`` per page with each page dropped after use, the floor a streaming
+export would reach. Every mode runs in a fresh interpreter, twice: once for
+RSS and time, once under tracemalloc.
+
+Usage::
+
+    python -m benchmarks.bench_memory --rows 50000 --page-size 1000
+    python -m benchmarks.bench_memory --rows 200000 --modes sequential,pages --dataset spec --json memory.json
+"""
+
+import argparse
+import ast
+import json
+import logging
+import multiprocessing
+import os
+import platform
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, REPO_ROOT)
+
+import weclappy  # noqa: E402
+from weclappy import Span, Tracer, Weclapp  # noqa: E402
+from benchmarks.bench_pagination import git_commit, peak_rss_mib  # noqa: E402
+from benchmarks.stub_server import StubServer, custom_attribute_definitions, sales_order_rows  # noqa: E402
+
+MODES = ('sequential', 'threaded', 'pages')
+CATEGORIES = (
+    'raw response bodies', 'decoded JSON pages', 'merged lists', 'WeclappResponse', 'wrapped entities', 'other',
+)
+CATEGORY_BY_FUNCTION = {
+    'Weclapp._session_request': 'raw response bodies',
+    'Weclapp._send_request': 'raw response bodies',
+    'Weclapp._decode_json': 'decoded JSON pages',
+    'JsonCodec.loads': 'decoded JSON pages',
+    '_OrjsonCodec.loads': 'decoded JSON pages',
+    '_MsgspecCodec.loads': 'decoded JSON pages',
+    '_UjsonCodec.loads': 'decoded JSON pages',
+    'Weclapp._get_all': 'merged lists',
+    'WeclappResponse.from_api_response': 'WeclappResponse',
+    'Weclapp._wrap_rows': 'wrapped entities',
+}
+# Allocations made directly in these files are response bodies being read.
+TRANSPORT_FILES = (
+    f"{os.sep}requests{os.sep}", f"{os.sep}urllib3{os.sep}", f"{os.sep}http{os.sep}client.py",
+    f"{os.sep}socket.py", f"{os.sep}ssl.py",
+)
+MIB = 1024 * 1024
+
+
+def function_spans(path: str) -> List[tuple]:
+    """``(first line, last line, qualname)`` of every function in ``path``."""
+    with open(path, encoding='utf-8') as f:
+        tree = ast.parse(f.read())
+    spans = []
+
+    def visit(node, prefix: str) -> None:
+        for child in ast.iter_child_nodes(node):
+            if isinstance(child, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+                name = f"{prefix}{child.name}"
+                if not isinstance(child, ast.ClassDef):
+                    spans.append((child.lineno, child.end_lineno, name))
+                visit(child, f"{name}." if isinstance(child, ast.ClassDef) else f"{name}.<locals>.")
+
+    visit(tree, '')
+    return spans
+
+
+class SiteClassifier:
+    """Maps a tracemalloc traceback to one of :data:`CATEGORIES`."""
+
+    def __init__(self) -> None:
+        self.module = os.path.abspath(weclappy.__file__)
+        self.spans = function_spans(self.module)
+        self._cache: Dict[int, Optional[str]] = {}
+
+    def function_at(self, lineno: int) -> Optional[str]:
+        if lineno not in self._cache:
+            # The innermost (shortest) function containing the line.
+            matches = [span for span in self.spans if span[0] <= lineno <= span[1]]
+            self._cache[lineno] = min(matches, key=lambda s: s[1] - s[0])[2] if matches else None
+        return self._cache[lineno]
+
+    def category(self, traceback: tracemalloc.Traceback) -> str:
+        # Tracebacks run from the oldest frame to the allocating one.
+        for index, frame in enumerate(reversed(traceback)):
+            filename = frame.filename
+            if index == 0 and any(part in filename for part in TRANSPORT_FILES):
+                return 'raw response bodies'
+            if filename != self.module and os.path.abspath(filename) != self.module:
+                continue
+            function = self.function_at(frame.lineno) or ''
+            if function.startswith('WeclappEntity.'):
+                return 'wrapped entities'
+            outer = function.split('.<locals>.')[0]
+            return CATEGORY_BY_FUNCTION.get(function, CATEGORY_BY_FUNCTION.get(outer, 'other'))
+        return 'other'
+
+
+def breakdown(snapshot: tracemalloc.Snapshot, classifier: SiteClassifier, top: int) -> Dict[str, Any]:
+    totals = dict.fromkeys(CATEGORIES, 0)
+    sites = []
+    for stat in snapshot.statistics('traceback'):
+        totals[classifier.category(stat.traceback)] += stat.size
+        sites.append(stat)
+    sites.sort(key=lambda stat: -stat.size)
+    return {
+        'total': sum(totals.values()),
+        'categories': totals,
+        'top_sites': [
+            {'site': f"{os.path.basename(stat.traceback[-1].filename)}:{stat.traceback[-1].lineno}",
+             'category': classifier.category(stat.traceback), 'bytes': stat.size, 'blocks': stat.count}
+            for stat in sites[:top]
+        ],
+    }
+
+
+class _WrapSpan(Span):
+    def __init__(self, tracer: 'SnapshotTracer') -> None:
+        self.tracer = tracer
+
+    def end(self) -> None:
+        self.tracer.take('wrap end')
+
+
+class SnapshotTracer(Tracer):
+    """Takes tracemalloc snapshots when ``get_all`` starts and finishes wrapping rows."""
+
+    def __init__(self) -> None:
+        self.snapshots: Dict[str, tracemalloc.Snapshot] = {}
+
+    def take(self, label: str) -> None:
+        # No filter_traces(): it is pure Python and takes longer than the export.
+        self.snapshots[label] = tracemalloc.take_snapshot()
+
+    def start_span(self, name, parent=None, attributes=None):
+        if name != 'weclapp.wrap':
+            return super().start_span(name, parent, attributes)
+        self.take('wrap start')
+        return _WrapSpan(self)
+
+
+def export(client: Weclapp, mode: str, rows: int, page_size: int, workers: int) -> int:
+    """Run one export; return the number of rows seen. ``pages`` keeps none of them."""
+    if mode == 'pages':
+        seen = 0
+        for page in range(1, rows // page_size + 2):
+            batch = client.get('salesOrder', params={'page': page, 'pageSize': page_size})
+            seen += len(batch)
+            if page == 1 and isinstance(client.tracer, SnapshotTracer):
+                client.tracer.take('page held')
+            if len(batch) < page_size:
+                break
+        return seen
+    result = client.get_all('salesOrder', threaded=mode == 'threaded', max_workers=workers)
+    client.retained = result  # keep the rows alive for the final snapshot
+    return len(result)
+
+
+def run_mode(
+    base_url: str, mode: str, rows: int, page_size: int, workers: int, traced: bool, top: int, frames: int
+) -> Dict[str, Any]:
+    """Measure one mode in this (child) process."""
+    weclappy.DEFAULT_PAGE_SIZE = page_size
+    tracer = SnapshotTracer() if traced else None
+    client = Weclapp(base_url, 'benchmark', tracer=tracer)
+    client.get('salesOrder', params={'pageSize': 1})  # load customAttributeDefinitions and connect
+    result: Dict[str, Any] = {'mode': mode}
+    if not traced:
+        before = peak_rss_mib()
+        start = time.perf_counter()
+        result['rows'] = export(client, mode, rows, page_size, workers)
+        result['seconds'] = time.perf_counter() - start
+        after = peak_rss_mib()
+        if before is not None and after is not None:
+            result['peak_rss_growth_mib'] = after - before
+            result['rss_bytes_per_row'] = (after - before) * MIB / max(result['rows'], 1)
+        return result
+
+    classifier = SiteClassifier()
+    tracemalloc.start(frames)
+    baseline = tracemalloc.get_traced_memory()[0]
+    result['rows'] = export(client, mode, rows, page_size, workers)
+    current, peak = tracemalloc.get_traced_memory()
+    tracer.take('returned')
+    tracemalloc.stop()
+    count = max(result['rows'], 1)
+    result['traced_peak_bytes_per_row'] = (peak - baseline) / count
+    result['retained_bytes_per_row'] = (current - baseline) / count
+    result['snapshots'] = {
+        label: breakdown(snapshot, classifier, top) for label, snapshot in tracer.snapshots.items()
+    }
+    return result
+
+
+def _child(queue, *args) -> None:
+    queue.put(run_mode(*args))
+
+
+def run_isolated(context, *args) -> Dict[str, Any]:
+    queue = context.Queue()
+    process = context.Process(target=_child, args=(queue,) + args)
+    process.start()
+    result = queue.get()
+    process.join()
+    return result
+
+
+def print_results(results: List[Dict[str, Any]], top: int) -> None:
+    print(f"{'mode':11s} {'rows':>8s} {'seconds':>8s} {'RSS MiB':>8s} {'RSS B/row':>10s} {'peak B/row':>11s} {'kept B/row':>11s}")
+    for r in results:
+        rss = f"{r['peak_rss_growth_mib']:8.1f} {r['rss_bytes_per_row']:10.0f}" if 'rss_bytes_per_row' in r else f"{'-':>8s} {'-':>10s}"
+        print(
+            f"{r['mode']:11s} {r['rows']:8d} {r['seconds']:8.2f} {rss} "
+            f"{r['traced_peak_bytes_per_row']:11.0f} {r['retained_bytes_per_row']:11.0f}"
+        )
+    for r in results:
+        labels = list(r['snapshots'])
+        print(f"\n{r['mode']}: live MiB by copy at " + ', '.join(labels))
+        for category in CATEGORIES:
+            values = [r['snapshots'][label]['categories'][category] / MIB for label in labels]
+            if any(value >= 0.05 for value in values):
+                print(f"  {category:22s} " + ' '.join(f"{value:10.1f}" for value in values))
+        print(f"  {'total':22s} " + ' '.join(f"{r['snapshots'][label]['total'] / MIB:10.1f}" for label in labels))
+        if top:
+            worst = max(labels, key=lambda label: r['snapshots'][label]['total'])
+            print(f"  top sites at {worst}:")
+            for site in r['snapshots'][worst]['top_sites']:
+                print(f"    {site['bytes'] / MIB:8.1f} MiB {site['blocks']:9d} blocks  {site['site']:28s} {site['category']}")
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=50000)
+    parser.add_argument('--page-size', type=int, default=1000)
+    parser.add_argument('--items', type=int, default=5, help='orderItems per salesOrder')
+    parser.add_argument('--custom-attributes', type=int, default=5)
+    parser.add_argument('--dataset', choices=('simple', 'spec'), default='simple',
+                        help="'spec' generates schema-complete rows with benchmarks.datagen")
+    parser.add_argument('--modes', default=','.join(MODES), help='comma-separated modes')
+    parser.add_argument('--workers', type=int, default=8, help='max_workers for threaded mode')
+    parser.add_argument('--top', type=int, default=8, help='allocation sites to list per mode')
+    parser.add_argument('--frames', type=int, default=1,
+                        help='tracemalloc frames per allocation; more attribute transport allocations '
+                             'to their caller but make the traced pass much slower')
+    parser.add_argument('--json', metavar='PATH', help='write machine-readable results to PATH')
+    args = parser.parse_args(argv)
+
+    # Pages are slow under tracemalloc; keep [API_SLOW] warnings out of the report.
+    logging.getLogger('weclappy').setLevel(logging.CRITICAL)
+    if args.dataset == 'spec':
+        from benchmarks.datagen import DatasetGenerator
+        generator = DatasetGenerator(list_sizes={'orderItems': args.items}, custom_attributes=args.custom_attributes)
+        rows = list(generator.rows('salesOrder', args.rows))
+        definitions = generator.custom_attribute_definitions(['salesOrder'])
+    else:
+        rows = sales_order_rows(args.rows, args.items, args.custom_attributes)
+        definitions = custom_attribute_definitions(args.custom_attributes)
+
+    context = multiprocessing.get_context('spawn')
+    results = []
+    with StubServer({'salesOrder': rows, 'customAttributeDefinition': definitions}) as server:
+        print(f"stub: {args.rows} {args.dataset} salesOrder rows, page size {args.page_size}")
+        for mode in args.modes.split(','):
+            common = (server.base_url, mode, args.rows, args.page_size, args.workers)
+            plain = run_isolated(context, *common, False, args.top, args.frames)
+            traced = run_isolated(context, *common, True, args.top, args.frames)
+            results.append(dict(traced, **plain))
+    print_results(results, args.top)
+
+    if args.json:
+        report = {
+            'benchmark': 'memory',
+            'commit': git_commit(),
+            'timestamp': datetime.now(timezone.utc).isoformat(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'settings': {key: value for key, value in vars(args).items() if key != 'json'},
+            'results': results,
+        }
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print(f"wrote {args.json}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,213 @@
+"""End-to-end pagination benchmark against a local weclapp stub server.
+
+Starts :class:`benchmarks.stub_server.StubServer` with realistic salesOrder
+rows and the configured latency, then times ``get`` by id, sequential
+``get_all`` and threaded ``get_all`` across page sizes, ``max_workers`` and
+``pool_maxsize``. Every scenario runs in a fresh interpreter so its peak RSS
+is its own. Page size is set through ``weclappy.DEFAULT_PAGE_SIZE``, the same
+constant ``get_all`` uses.
+
+Reports rows/s, requests/s and client-side latency percentiles (from
+``Weclapp.stats()``). ``--json`` writes the results with the commit, Python
+version and settings so runs on two commits can be compared with
+``--compare``.
+
+Usage::
+
+    python -m benchmarks.bench_pagination --rows 10000 --latency-ms 10
+    python -m benchmarks.bench_pagination --json before.json
+    python -m benchmarks.bench_pagination --json after.json --compare before.json
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, REPO_ROOT)
+
+import weclappy  # noqa: E402
+from weclappy import Weclapp  # noqa: E402
+from benchmarks.stub_server import StubServer, custom_attribute_definitions, sales_order_rows  # noqa: E402
+
+
+def peak_rss_mib() -> Optional[float]:
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is KiB on Linux and bytes on macOS.
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def parse_pool_size(value: str):
+    return value if value == 'auto' else int(value)
+
+
+def build_scenarios(args) -> List[Dict[str, Any]]:
+    scenarios = [{'name': 'get by id', 'mode': 'get', 'page_size': None, 'max_workers': 1, 'pool_maxsize': 10}]
+    for page_size in args.page_sizes:
+        scenarios.append({
+            'name': f"sequential page={page_size}", 'mode': 'sequential',
+            'page_size': page_size, 'max_workers': 1, 'pool_maxsize': 10,
+        })
+        for workers in args.workers:
+            for pool_size in args.pool_sizes:
+                scenarios.append({
+                    'name': f"threaded page={page_size} workers={workers} pool={pool_size}",
+                    'mode': 'threaded', 'page_size': page_size,
+                    'max_workers': workers, 'pool_maxsize': pool_size,
+                })
+    return scenarios
+
+
+def run_scenario(base_url: str, scenario: Dict[str, Any], repeat: int, gets: int, rows: int) -> Dict[str, Any]:
+    """Run one scenario in this (child) process and return its measurements."""
+    if scenario['page_size'] is not None:
+        weclappy.DEFAULT_PAGE_SIZE = scenario['page_size']
+    client = Weclapp(base_url, 'benchmark', pool_maxsize=scenario['pool_maxsize'])
+    if scenario['mode'] == 'get':
+        ids = [str(100000 + (n * 7919) % rows) for n in range(gets)]
+
+        def run():
+            for entity_id in ids:
+                client.get('salesOrder', id=entity_id)
+            return len(ids)
+    else:
+        threaded = scenario['mode'] == 'threaded'
+
+        def run():
+            return len(client.get_all('salesOrder', threaded=threaded, max_workers=scenario['max_workers']))
+
+    # Warm up: connections, customAttributeDefinitions and the stub's page cache.
+    run()
+    client.metrics.reset()
+
+    best = float('inf')
+    fetched = 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fetched = run()
+        best = min(best, time.perf_counter() - start)
+    stats = client.stats()
+    requests_per_run = stats['requests'] / repeat
+    return dict(
+        scenario,
+        seconds=best,
+        rows=fetched,
+        requests=requests_per_run,
+        rows_per_second=fetched / best,
+        requests_per_second=requests_per_run / best,
+        latency_ms=stats['latency_ms'],
+        errors=stats['errors'],
+        connections_opened=stats['pool']['connections_opened'],
+        connections_discarded=stats['pool']['connections_discarded'],
+        peak_rss_mib=peak_rss_mib(),
+    )
+
+
+def _child(queue, *args) -> None:
+    queue.put(run_scenario(*args))
+
+
+def run_isolated(context, *args) -> Dict[str, Any]:
+    queue = context.Queue()
+    process = context.Process(target=_child, args=(queue,) + args)
+    process.start()
+    result = queue.get()
+    process.join()
+    return result
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=REPO_ROOT,
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def print_results(results: List[Dict[str, Any]], baseline: Optional[Dict[str, Any]]) -> None:
+    previous = {r['name']: r for r in baseline['results']} if baseline else {}
+    header = f"{'scenario':44s} {'rows/s':>10s} {'req/s':>8s} {'p50 ms':>7s} {'p95 ms':>7s} {'p99 ms':>7s} {'RSS MiB':>8s}"
+    if previous:
+        header += f" {'vs base':>8s}"
+    print(header)
+    for r in results:
+        latency = r['latency_ms']
+        rss = f"{r['peak_rss_mib']:8.1f}" if r['peak_rss_mib'] is not None else f"{'-':>8s}"
+        line = (
+            f"{r['name']:44s} {r['rows_per_second']:10.0f} {r['requests_per_second']:8.1f} "
+            f"{latency['p50']:7.1f} {latency['p95']:7.1f} {latency['p99']:7.1f} {rss}"
+        )
+        if r['name'] in previous:
+            before = previous[r['name']]['rows_per_second']
+            line += f" {(r['rows_per_second'] / before - 1) * 100:+7.1f}%"
+        print(line)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=10000, help='salesOrder rows served by the stub')
+    parser.add_argument('--items', type=int, default=5, help='orderItems per salesOrder')
+    parser.add_argument('--latency-ms', type=float, default=10.0, help='server latency per request')
+    parser.add_argument('--jitter-ms', type=float, default=2.0, help='extra random latency per request')
+    parser.add_argument('--page-sizes', type=lambda v: [int(p) for p in v.split(',')], default=[100, 1000])
+    parser.add_argument('--workers', type=lambda v: [int(w) for w in v.split(',')], default=[4, 10, 20])
+    parser.add_argument('--pool-sizes', type=lambda v: [parse_pool_size(p) for p in v.split(',')], default=[10, 'auto'])
+    parser.add_argument('--gets', type=int, default=100, help='requests in the get-by-id scenario')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--json', metavar='PATH', help='write machine-readable results to PATH')
+    parser.add_argument('--compare', metavar='PATH', help='show rows/s change against an earlier --json file')
+    args = parser.parse_args(argv)
+
+    baseline = None
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            baseline = json.load(f)
+
+    datasets = {
+        'salesOrder': sales_order_rows(args.rows, args.items),
+        'customAttributeDefinition': custom_attribute_definitions(5),
+    }
+    context = multiprocessing.get_context('spawn')
+    results = []
+    with StubServer(datasets, latency_ms=args.latency_ms, jitter_ms=args.jitter_ms) as server:
+        print(
+            f"stub: {args.rows} salesOrder rows, {args.latency_ms:g} ms (+{args.jitter_ms:g} ms jitter) "
+            f"latency at {server.base_url}"
+        )
+        for scenario in build_scenarios(args):
+            results.append(run_isolated(context, server.base_url, scenario, args.repeat, args.gets, args.rows))
+    print_results(results, baseline)
+
+    if args.json:
+        report = {
+            'benchmark': 'pagination',
+            'commit': git_commit(),
+            'timestamp': datetime.now(timezone.utc).isoformat(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'settings': {
+                key: value for key, value in vars(args).items() if key not in ('json', 'compare')
+            },
+            'results': results,
+        }
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print(f"wrote {args.json}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
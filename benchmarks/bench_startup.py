@@ -0,0 +1,199 @@
+"""Cold-start cost of a short-lived weclappy job: import, client, first row.
+
+Each run is a fresh interpreter, as in a CLI job or a serverless cold
+start. It times:
+
+- ``import weclappy`` (requests and urllib3 are only imported when the first
+  client is created);
+- ``Weclapp(...)`` construction;
+- time to first row: ``get`` of one salesOrder after ``--init-ms`` of
+  simulated application startup, including the customAttributeDefinition
+  load and the first connect.
+
+Two scenarios run alternately: ``cold`` sends the first request on a new
+connection, ``warmup`` calls :meth:`Weclapp.warmup` right after
+construction so the connect overlaps the startup work. Against the local
+stub a connect costs well under a millisecond; DNS and TLS savings show
+against a real tenant (``--base-url`` with ``WECLAPP_API_KEY``). The first
+run of each scenario is discarded so the bytecode cache is warm.
+``--importtime`` lists the slowest modules of ``import weclappy`` from
+``python -X importtime``.
+
+Usage::
+
+    python -m benchmarks.bench_startup --repeat 20
+    python -m benchmarks.bench_startup --importtime 15 --json startup.json
+    WECLAPP_API_KEY=... python -m benchmarks.bench_startup --base-url https://tenant.weclapp.com/webapp/api/v1
+"""
+
+import argparse
+import json
+import os
+import platform
+import re
+import statistics
+import subprocess
+import sys
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, REPO_ROOT)
+
+from benchmarks.bench_pagination import git_commit  # noqa: E402
+from benchmarks.stub_server import StubServer, custom_attribute_definitions, sales_order_rows  # noqa: E402
+
+SCENARIOS = ('cold', 'warmup')
+
+# Runs in a fresh interpreter; prints one JSON line of timings in milliseconds.
+CHILD = """
+import json, sys, time
+start = time.perf_counter()
+import weclappy
+imported = time.perf_counter()
+requests_on_import = 'requests' in sys.modules
+base_url, api_key, warmup, init_ms = sys.argv[1], sys.argv[2], sys.argv[3] == 'warmup', float(sys.argv[4])
+client = weclappy.Weclapp(base_url, api_key)
+constructed = time.perf_counter()
+if warmup:
+    client.warmup()
+time.sleep(init_ms / 1000)
+ready = time.perf_counter()
+opened = client.stats()['pool']['connections_opened']
+rows = client.get('salesOrder', params={'pageSize': 1})
+first_row = time.perf_counter()
+print(json.dumps({
+    'import_ms': (imported - start) * 1000,
+    'construct_ms': (constructed - imported) * 1000,
+    'first_row_ms': (first_row - ready) * 1000,
+    'total_ms': (first_row - start) * 1000 - init_ms,
+    'rows': len(rows),
+    'requests_on_import': requests_on_import,
+    'first_row_connects': client.stats()['pool']['connections_opened'] - opened,
+}))
+"""
+
+TIMINGS = ('import_ms', 'construct_ms', 'first_row_ms', 'total_ms')
+IMPORTTIME_LINE = re.compile(r'import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)')
+
+
+def run_child(base_url: str, api_key: str, scenario: str, init_ms: float) -> Dict[str, Any]:
+    output = subprocess.run(
+        [sys.executable, '-c', CHILD, base_url, api_key, scenario, str(init_ms)],
+        cwd=REPO_ROOT, capture_output=True, text=True, check=True,
+    ).stdout
+    return json.loads(output.splitlines()[-1])
+
+
+def summarize(runs: List[Dict[str, Any]]) -> Dict[str, Any]:
+    summary: Dict[str, Any] = {
+        name: {
+            'median': statistics.median(run[name] for run in runs),
+            'min': min(run[name] for run in runs),
+            'max': max(run[name] for run in runs),
+        }
+        for name in TIMINGS
+    }
+    summary['runs'] = len(runs)
+    summary['requests_on_import'] = any(run['requests_on_import'] for run in runs)
+    summary['first_row_connects'] = statistics.median(run['first_row_connects'] for run in runs)
+    return summary
+
+
+def import_profile(top: int) -> List[Dict[str, Any]]:
+    """Slowest modules of ``import weclappy`` by cumulative time, from ``-X importtime``."""
+    stderr = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', 'import weclappy'],
+        cwd=REPO_ROOT, capture_output=True, text=True, check=True,
+    ).stderr
+    modules = []
+    for line in stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            modules.append({
+                'module': name, 'depth': len(indent) // 2,
+                'self_ms': int(self_us) / 1000, 'cumulative_ms': int(cumulative_us) / 1000,
+            })
+    return sorted(modules, key=lambda m: m['cumulative_ms'], reverse=True)[:top]
+
+
+def print_results(results: Dict[str, Dict[str, Any]]) -> None:
+    print(f"{'scenario':9s} {'import ms':>10s} {'client ms':>10s} {'first row ms':>13s} {'total ms':>9s} {'connects':>9s}")
+    for scenario, r in results.items():
+        print(
+            f"{scenario:9s} {r['import_ms']['median']:10.1f} {r['construct_ms']['median']:10.1f} "
+            f"{r['first_row_ms']['median']:13.1f} {r['total_ms']['median']:9.1f} "
+            f"{r['first_row_connects']:9g}"
+        )
+    print("medians; 'total' excludes the simulated startup work, 'connects' are opened while fetching the first row")
+    if any(r['requests_on_import'] for r in results.values()):
+        print("note: requests was already imported by 'import weclappy'")
+    if os.environ.get('PYTHONDONTWRITEBYTECODE'):
+        print("note: PYTHONDONTWRITEBYTECODE is set, so import times include compiling weclappy")
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=10, help='fresh interpreters per scenario')
+    parser.add_argument('--init-ms', type=float, default=50.0,
+                        help='simulated application startup between client creation and the first request')
+    parser.add_argument('--latency-ms', type=float, default=10.0, help='stub server latency per request')
+    parser.add_argument('--base-url', help='measure against this API instead of the local stub')
+    parser.add_argument('--importtime', type=int, default=0, metavar='N',
+                        help='list the N slowest modules of import weclappy')
+    parser.add_argument('--json', metavar='PATH', help='write machine-readable results to PATH')
+    args = parser.parse_args(argv)
+
+    def measure(base_url: str, api_key: str) -> Dict[str, Dict[str, Any]]:
+        runs: Dict[str, List[Dict[str, Any]]] = {scenario: [] for scenario in SCENARIOS}
+        for index in range(args.repeat + 1):
+            for scenario in SCENARIOS:
+                run = run_child(base_url, api_key, scenario, args.init_ms)
+                if index:
+                    runs[scenario].append(run)
+        return {scenario: summarize(scenario_runs) for scenario, scenario_runs in runs.items()}
+
+    if args.base_url:
+        api_key = os.environ.get('WECLAPP_API_KEY')
+        if not api_key:
+            parser.error('--base-url needs the API key in WECLAPP_API_KEY')
+        print(f"target: {args.base_url}")
+        results = measure(args.base_url, api_key)
+    else:
+        datasets = {
+            'salesOrder': sales_order_rows(10),
+            'customAttributeDefinition': custom_attribute_definitions(5),
+        }
+        with StubServer(datasets, latency_ms=args.latency_ms) as server:
+            print(f"stub: {args.latency_ms:g} ms latency at {server.base_url}")
+            results = measure(server.base_url, 'benchmark')
+    print(f"{args.repeat} runs per scenario, {args.init_ms:g} ms simulated startup work")
+    print_results(results)
+
+    imports: Optional[List[Dict[str, Any]]] = None
+    if args.importtime:
+        imports = import_profile(args.importtime)
+        print(f"\n{'module':40s} {'self ms':>8s} {'cumul. ms':>10s}")
+        for module in imports:
+            print(f"{'  ' * module['depth'] + module['module']:40s} {module['self_ms']:8.1f} {module['cumulative_ms']:10.1f}")
+
+    if args.json:
+        report = {
+            'benchmark': 'startup',
+            'commit': git_commit(),
+            'timestamp': datetime.now(timezone.utc).isoformat(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'settings': {key: value for key, value in vars(args).items() if key != 'json'},
+            'results': results,
+            'imports': imports,
+        }
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print(f"wrote {args.json}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
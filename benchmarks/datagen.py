@@ -0,0 +1,354 @@
+"""Synthetic weclapp datasets generated from ``docs/weclapp-openapi.json``.
+
+Rows follow the entity's component schema: every required property plus a
+``fill`` share of the optional ones, typed values for ``decimal``,
+``timestamp``, ``int32``/``int64``, ``html`` and ``email`` formats, enum
+members for enum schemas, and nested objects and lists resolved through
+``$ref`` and ``allOf`` down to ``max_depth``. On top of that:
+
+- ``list_sizes`` sets the length of object lists by property name
+  (``{'orderItems': 50}``); other object lists get ``list_size`` entries.
+- ``custom_attributes`` items per row reference the definitions from
+  :meth:`DatasetGenerator.custom_attribute_definitions`, one per attribute
+  type in turn, so ``WeclappEntity`` flattening has real work to do.
+- Reference properties (``x-weclapp.entity``) point at ``reference_fanout``
+  distinct ids of the target entity. ``pages(include_referenced=True)``
+  adds those entities as ``referencedEntities``.
+- ``pages(additional_properties=[...])`` adds ``additionalProperties``
+  values shaped like the spec's response schema.
+
+Rows depend only on ``seed``, the entity and the row number, so any slice of
+a dataset can be regenerated and output streams with constant memory. Ids
+are ``str(ID_BASE + n)`` for row ``n``; references use the same scheme, so a
+generated ``party`` dataset contains the customers a ``salesOrder`` dataset
+refers to.
+
+Usage::
+
+    generator = DatasetGenerator(seed=1, list_sizes={'orderItems': 20}, custom_attributes=30)
+    rows = list(generator.rows('salesOrder', 10000))
+    with StubServer({'salesOrder': rows, 'customAttributeDefinition': generator.custom_attribute_definitions()}):
+        ...
+
+Command line, NDJSON rows or one page-shaped JSON object per line::
+
+    python -m benchmarks.datagen salesOrder --count 100000 --output orders.ndjson
+    python -m benchmarks.datagen salesOrder --count 5000 --format pages --page-size 1000 \\
+        --list-size orderItems=20 --custom-attributes 30 --include-referenced --additional-properties consignment
+    python -m benchmarks.datagen --list
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+from typing import Any, Dict, Iterator, List, Optional, Sequence, TextIO
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, REPO_ROOT)
+sys.path.insert(0, os.path.join(REPO_ROOT, 'tests'))
+
+from benchmarks.stub_server import ATTRIBUTE_TYPES, ATTRIBUTE_VALUES  # noqa: E402
+from fake_weclapp import OpenApiSpec  # noqa: E402
+
+ID_BASE = 1000000
+TIMESTAMP_BASE = 1700000000000
+WORDS = (
+    'Lorem ipsum dolor sit amet consectetur adipiscing elit sed do eiusmod tempor incididunt ut labore et '
+    'dolore magna aliqua Hauptstraße Köln Lieferung Rechnung Artikel Kunde'
+).split()
+# Joining words per value dominated generation time; draw from fixed phrases instead.
+_phrase_random = random.Random(0)
+PHRASES = tuple(' '.join(_phrase_random.choice(WORDS) for _ in range(_phrase_random.randint(1, 6))) for _ in range(256))
+
+
+class DatasetGenerator:
+    """Deterministic rows and pages for any paginated entity of the spec.
+
+    :param spec: Parsed :class:`OpenApiSpec` (loaded from ``docs/`` if omitted).
+    :param seed: Seed; the same seed gives the same rows.
+    :param list_size: Length of object lists not named in ``list_sizes``.
+    :param list_sizes: Length of object lists by property name.
+    :param custom_attributes: customAttributes items per row (for entities that have them).
+    :param reference_fanout: Distinct ids each reference property points at.
+    :param fill: Share of optional properties present in a row (weclapp omits nulls).
+    :param max_depth: Nesting depth below which nested objects and lists are left out.
+    """
+
+    def __init__(
+        self,
+        spec: Optional[OpenApiSpec] = None,
+        seed: int = 0,
+        list_size: int = 2,
+        list_sizes: Optional[Dict[str, int]] = None,
+        custom_attributes: int = 5,
+        reference_fanout: int = 50,
+        fill: float = 0.7,
+        max_depth: int = 3,
+    ) -> None:
+        self.spec = spec or OpenApiSpec()
+        self.seed = seed
+        self.list_size = list_size
+        self.list_sizes = dict(list_sizes or {})
+        self.custom_attributes = custom_attributes
+        self.reference_fanout = reference_fanout
+        self.fill = fill
+        self.max_depth = max_depth
+
+    # -- rows ------------------------------------------------------------
+
+    def row(self, entity: str, number: int) -> Dict[str, Any]:
+        """Row ``number`` of ``entity``; the same for every call with the same seed."""
+        rng = random.Random(f"{self.seed}:{entity}:{number}")
+        row = self._object(self.spec.entity_properties(entity), rng, number, depth=0)
+        row['id'] = str(ID_BASE + number)
+        row['version'] = str(rng.randrange(10))
+        return row
+
+    def rows(self, entity: str, count: int, start: int = 0) -> Iterator[Dict[str, Any]]:
+        """Rows ``start`` to ``start + count - 1`` of ``entity``, generated lazily."""
+        for number in range(start, start + count):
+            yield self.row(entity, number)
+
+    def custom_attribute_definitions(self, entities: Sequence[str] = ()) -> List[Dict[str, Any]]:
+        """customAttributeDefinition rows matching the generated customAttributes."""
+        return [
+            {
+                'id': f"def-{a}",
+                'attributeKey': f"attr{a}",
+                'attributeType': ATTRIBUTE_TYPES[a % len(ATTRIBUTE_TYPES)],
+                'entities': list(entities),
+            }
+            for a in range(self.custom_attributes)
+        ]
+
+    # -- pages -----------------------------------------------------------
+
+    def pages(
+        self,
+        entity: str,
+        count: int,
+        page_size: int = 1000,
+        include_referenced: bool = False,
+        additional_properties: Sequence[str] = (),
+    ) -> Iterator[Dict[str, Any]]:
+        """``count`` rows as weclapp list responses of ``page_size`` rows each."""
+        for start in range(0, count, page_size):
+            rows = list(self.rows(entity, min(page_size, count - start), start))
+            page: Dict[str, Any] = {'result': rows}
+            if additional_properties:
+                page['additionalProperties'] = self.additional_properties(entity, rows, additional_properties)
+            if include_referenced:
+                page['referencedEntities'] = self.referenced_entities(entity, rows)
+            yield page
+
+    def referenced_entities(self, entity: str, rows: List[Dict[str, Any]]) -> Dict[str, List[Dict[str, Any]]]:
+        """``referencedEntities`` for every reference in ``rows`` whose target is a paginated entity."""
+        properties = self.spec.entity_properties(entity)
+        wanted: Dict[str, set] = {}
+        for row in rows:
+            self._collect_references(properties, row, wanted)
+        return {
+            target: [self.row(target, int(ref_id) - ID_BASE) for ref_id in sorted(ids)]
+            for target, ids in sorted(wanted.items())
+            if target in self.spec.entities
+        }
+
+    def additional_properties(
+        self, entity: str, rows: List[Dict[str, Any]], names: Sequence[str]
+    ) -> Dict[str, List[Any]]:
+        """``additionalProperties`` values for ``rows``: one list entry per row and name."""
+        schemas = (
+            self.spec.paths[f"/{entity}"]['get']['responses']['200']['content']['application/json']
+            ['schema']['properties'].get('additionalProperties', {}).get('properties', {})
+        )
+        result = {}
+        for name in names:
+            if name not in schemas:
+                raise ValueError(f"{entity} has no additionalProperty {name!r}")
+            item_schema = schemas[name]['items']
+            result[name] = [
+                self._value(name, item_schema, random.Random(f"{self.seed}:{entity}:{row['id']}:{name}"), 0, 1)
+                for row in rows
+            ]
+        return result
+
+    # -- values ----------------------------------------------------------
+
+    def _resolve(self, schema: Dict[str, Any]) -> Dict[str, Any]:
+        ref = schema.get('$ref')
+        return self.spec.schemas[ref.rsplit('/', 1)[-1]] if ref else schema
+
+    def _object(self, properties: Dict[str, Any], rng: random.Random, number: int, depth: int) -> Dict[str, Any]:
+        result = {}
+        for name, schema in properties.items():
+            required = schema.get('x-weclapp', {}).get('required', False) or name == 'customAttributes'
+            if not required and rng.random() >= self.fill:
+                continue
+            value = self._value(name, schema, rng, number, depth)
+            if value is not None:
+                result[name] = value
+        return result
+
+    def _value(self, name: str, schema: Dict[str, Any], rng: random.Random, number: int, depth: int) -> Any:
+        target = self._resolve(schema)
+        if 'enum' in target:
+            return rng.choice(target['enum'])
+        kind = target.get('type')
+        if kind == 'array':
+            return self._list(name, target['items'], rng, number, depth)
+        if kind == 'object' or 'allOf' in target or 'properties' in target:
+            if depth >= self.max_depth:
+                return None
+            return self._object(self.spec.properties(schema), rng, number, depth + 1)
+        reference = schema.get('x-weclapp', {}).get('entity')
+        if reference:
+            return str(ID_BASE + rng.randrange(self.reference_fanout))
+        return self._scalar(name, target, rng, number)
+
+    def _list(self, name: str, items: Dict[str, Any], rng: random.Random, number: int, depth: int) -> Any:
+        if name == 'customAttributes':
+            return self._custom_attributes(number) or None
+        target = self._resolve(items)
+        if target.get('type') == 'object' or 'allOf' in target or 'properties' in target:
+            if depth >= self.max_depth:
+                return None
+            properties = self.spec.properties(items)
+            result = []
+            for i in range(self.list_sizes.get(name, self.list_size)):
+                element = self._object(properties, rng, number, depth + 1)
+                if 'id' in properties:
+                    element['id'] = f"{ID_BASE + number}{i:04d}"
+                result.append(element)
+            return result
+        return [self._value(name, items, rng, number, depth) for _ in range(rng.randrange(3))]
+
+    def _custom_attributes(self, number: int) -> List[Dict[str, Any]]:
+        attributes = []
+        for a in range(self.custom_attributes):
+            field, value = ATTRIBUTE_VALUES[ATTRIBUTE_TYPES[a % len(ATTRIBUTE_TYPES)]]
+            attributes.append({'attributeDefinitionId': f"def-{a}", field: value(number)})
+        return attributes
+
+    @staticmethod
+    def _scalar(name: str, schema: Dict[str, Any], rng: random.Random, number: int) -> Any:
+        kind = schema.get('type')
+        fmt = schema.get('format')
+        if kind == 'boolean':
+            return rng.random() < 0.5
+        if kind == 'integer':
+            if fmt == 'timestamp':
+                return TIMESTAMP_BASE + rng.randrange(3 * 10 ** 10)
+            return rng.randrange(1000 if fmt == 'int32' else 10 ** 9)
+        if kind == 'number':
+            return round(rng.uniform(0, 1000), 2)
+        if fmt == 'decimal':
+            return f"{rng.uniform(0, 10000):.2f}"
+        if fmt == 'email':
+            return f"{name.lower()}{number}@example.com"
+        if name == 'version':
+            return str(rng.randrange(10))
+        if name == 'id' or name.endswith('Id'):
+            return str(ID_BASE + rng.randrange(10 ** 6))
+        text = rng.choice(PHRASES)
+        if fmt == 'html':
+            text = f"<p>{text}</p>"
+        elif name.endswith(('Number', 'Code')):
+            text = f"{name[:2].upper()}-{number:06d}"
+        max_length = schema.get('maxLength')
+        return text[:max_length] if max_length else text
+
+    # -- references ------------------------------------------------------
+
+    def _collect_references(self, properties: Dict[str, Any], obj: Dict[str, Any], wanted: Dict[str, set]) -> None:
+        for name, value in obj.items():
+            schema = properties.get(name)
+            if schema is None or name == 'customAttributes':
+                continue
+            reference = schema.get('x-weclapp', {}).get('entity')
+            if reference and isinstance(value, str):
+                wanted.setdefault(reference, set()).add(value)
+                continue
+            target = self._resolve(schema)
+            nested = target['items'] if target.get('type') == 'array' else schema
+            for element in value if isinstance(value, list) else (value,):
+                if isinstance(element, dict):
+                    self._collect_references(self.spec.properties(nested), element, wanted)
+
+
+def write_ndjson(objects: Iterator[Dict[str, Any]], out: TextIO) -> int:
+    written = 0
+    for obj in objects:
+        out.write(json.dumps(obj, ensure_ascii=False, separators=(',', ':')) + '\n')
+        written += 1
+    return written
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('entity', nargs='?', default='salesOrder')
+    parser.add_argument('--count', type=int, default=1000)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--format', choices=('ndjson', 'pages'), default='ndjson',
+                        help='one row per line, or one page-shaped response per line')
+    parser.add_argument('--page-size', type=int, default=1000)
+    parser.add_argument('--list-size', action='append', default=[], metavar='[NAME=]N',
+                        help="length of object lists, e.g. 'orderItems=20' or '3' for all others (repeatable)")
+    parser.add_argument('--custom-attributes', type=int, default=5)
+    parser.add_argument('--reference-fanout', type=int, default=50)
+    parser.add_argument('--fill', type=float, default=0.7, help='share of optional properties present')
+    parser.add_argument('--max-depth', type=int, default=3)
+    parser.add_argument('--include-referenced', action='store_true', help='pages: add referencedEntities')
+    parser.add_argument('--additional-properties', default='', help='pages: comma-separated additionalProperties')
+    parser.add_argument('--definitions', metavar='PATH', help='also write customAttributeDefinition rows as NDJSON')
+    parser.add_argument('--output', default='-', help="output file ('-' for stdout)")
+    parser.add_argument('--list', action='store_true', help='list the entities and their additionalProperties')
+    args = parser.parse_args(argv)
+
+    spec = OpenApiSpec()
+    if args.list:
+        for entity in sorted(spec.entities):
+            extra = ', '.join(spec.additional_properties[entity])
+            print(f"{entity}{f'  ({extra})' if extra else ''}")
+        return 0
+    if args.entity not in spec.entities:
+        parser.error(f"unknown entity {args.entity!r}; see --list")
+
+    list_size = 2
+    list_sizes = {}
+    for item in args.list_size:
+        name, _, size = item.rpartition('=')
+        if name:
+            list_sizes[name] = int(size)
+        else:
+            list_size = int(size)
+    generator = DatasetGenerator(
+        spec, seed=args.seed, list_size=list_size, list_sizes=list_sizes,
+        custom_attributes=args.custom_attributes, reference_fanout=args.reference_fanout,
+        fill=args.fill, max_depth=args.max_depth,
+    )
+    if args.format == 'pages':
+        objects = generator.pages(
+            args.entity, args.count, args.page_size, args.include_referenced,
+            [name for name in args.additional_properties.split(',') if name],
+        )
+    else:
+        objects = generator.rows(args.entity, args.count)
+
+    out = sys.stdout if args.output == '-' else open(args.output, 'w', encoding='utf-8')
+    try:
+        written = write_ndjson(objects, out)
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    if args.definitions:
+        with open(args.definitions, 'w', encoding='utf-8') as f:
+            write_ndjson(iter(generator.custom_attribute_definitions([args.entity])), f)
+    if args.output != '-':
+        print(f"wrote {written} {'pages' if args.format == 'pages' else 'rows'} to {args.output}", file=sys.stderr)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,325 @@
+"""Replay production traffic from ``[API]`` log lines.
+
+Every request the client sends is logged as
+``[API] Weclapp {method} {path} -> {status} ({ms}ms)`` (``[API_SLOW]`` above
+the slow threshold, ``-> ERROR`` for requests without a response). This tool
+turns those lines into a workload trace and replays it with the original
+inter-arrival timing, optionally compressed with ``--speedup``, through one
+shared :class:`weclappy.Weclapp` client:
+
+- against the local stub server (default). Entity ids in paths are mapped to
+  stub rows with a stable hash, so repeated ids stay repeated and caching
+  behaves as it would have. Every entity in the trace is served with
+  salesOrder-shaped rows. Action endpoints the stub does not know answer 404.
+- against a cassette written by :class:`weclappy.RecordingTransport`
+  (``--cassette``). Log lines carry neither query parameters nor bodies, so
+  requests are matched on method and path only.
+
+Request start times come from the timestamp at the start of each log line
+(``2024-05-01 12:00:00,123`` as written by ``logging``'s ``asctime``, ISO 8601
+or epoch seconds), minus the logged duration, because the line is written
+when the request ends. Lines without a timestamp start when the previous
+request ended. Requests are sent open-loop on schedule, so a client that falls
+behind shows up as schedule lag rather than as a slower trace.
+
+Usage::
+
+    python -m benchmarks.replay_log app.log
+    python -m benchmarks.replay_log app.log --speedup 10 --pool-maxsize auto
+    python -m benchmarks.replay_log app.log --cassette export.cassette.gz --save-trace trace.jsonl
+    grep 'salesOrder' app.log | python -m benchmarks.replay_log - --limit 5000
+"""
+
+import argparse
+import json
+import logging
+import os
+import re
+import sys
+import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Optional
+from urllib.parse import urljoin, urlsplit
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, REPO_ROOT)
+
+from weclappy import ReplayTransport, Weclapp, WeclappAPIError  # noqa: E402
+from benchmarks.bench_load import percentiles  # noqa: E402
+from benchmarks.bench_pagination import parse_pool_size  # noqa: E402
+from benchmarks.stub_server import API_PREFIX, StubServer, custom_attribute_definitions, sales_order_rows  # noqa: E402
+
+API_LINE = re.compile(r"\[API(?:_SLOW)?\] Weclapp (?P<method>[A-Z]+) (?P<path>\S+) -> (?P<status>\d{3}|ERROR) \((?P<ms>\d+)ms\)")
+TIMESTAMP = re.compile(
+    r"^\s*(?:(?P<iso>\d{4}-\d{2}-\d{2}[ T]\d{2}:\d{2}:\d{2}(?:[.,]\d+)?(?:Z|[+-]\d{2}:?\d{2})?)|(?P<epoch>\d{9,10}(?:\.\d+)?)\b)"
+)
+REPLAY_BASE_URL = 'http://replay.invalid/webapp/api/v1/'
+
+
+@dataclass(frozen=True)
+class TraceEvent:
+    """One logged request. ``offset`` is its start in seconds after the first request."""
+
+    offset: float
+    method: str
+    path: str
+    status: Optional[int]
+    duration_ms: float
+
+
+def parse_timestamp(line: str) -> Optional[float]:
+    match = TIMESTAMP.match(line)
+    if match is None:
+        return None
+    if match.group('epoch'):
+        return float(match.group('epoch'))
+    text = match.group('iso').replace(',', '.').replace('T', ' ').replace('Z', '+00:00')
+    # fromisoformat on Python < 3.11 only takes 3 or 6 fractional digits.
+    text = re.sub(r"\.(\d+)", lambda m: '.' + (m.group(1) + '000000')[:6], text)
+    parsed = datetime.fromisoformat(text)
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.timestamp()
+
+
+def parse_log(lines: Iterable[str]) -> List[TraceEvent]:
+    """Workload trace of the ``[API]`` lines in ``lines``, ordered by start time."""
+    raw = []
+    previous_end = 0.0
+    for line in lines:
+        match = API_LINE.search(line)
+        if match is None:
+            continue
+        duration_ms = float(match.group('ms'))
+        logged_at = parse_timestamp(line)
+        start = previous_end if logged_at is None else logged_at - duration_ms / 1000
+        previous_end = start + duration_ms / 1000
+        status = match.group('status')
+        raw.append((start, match.group('method'), match.group('path'), None if status == 'ERROR' else int(status), duration_ms))
+    if not raw:
+        return []
+    raw.sort(key=lambda event: event[0])
+    first = raw[0][0]
+    return [TraceEvent(start - first, method, path, status, ms) for start, method, path, status, ms in raw]
+
+
+def load_trace(path: str) -> List[TraceEvent]:
+    """Read a trace from a log file (``-`` for stdin) or a ``--save-trace`` JSON lines file."""
+    handle = sys.stdin if path == '-' else open(path, encoding='utf-8', errors='replace')
+    try:
+        lines = list(handle)
+    finally:
+        if handle is not sys.stdin:
+            handle.close()
+    if lines and lines[0].startswith('{'):
+        return [TraceEvent(**json.loads(line)) for line in lines if line.strip()]
+    return parse_log(lines)
+
+
+def save_trace(events: List[TraceEvent], path: str) -> None:
+    with open(path, 'w', encoding='utf-8') as f:
+        for event in events:
+            f.write(json.dumps(asdict(event)) + '\n')
+
+
+def relative_path(path: str) -> str:
+    """``/webapp/api/v1/salesOrder/id/42`` -> ``salesOrder/id/42``."""
+    return path[len(API_PREFIX):] if path.startswith(API_PREFIX) else path.lstrip('/')
+
+
+def stub_path(path: str, rows: int) -> str:
+    """Map the entity ids in ``path`` onto the stub's ids, stable per original id."""
+    parts = relative_path(path).split('/')
+    for index in range(1, len(parts)):
+        if parts[index - 1] == 'id':
+            parts[index] = str(100000 + zlib.crc32(parts[index].encode('utf-8')) % rows)
+    return '/'.join(parts)
+
+
+def peak_concurrency(intervals: List[tuple]) -> int:
+    edges = sorted([(start, 1) for start, _ in intervals] + [(end, -1) for _, end in intervals])
+    peak = current = 0
+    for _, step in edges:
+        current += step
+        peak = max(peak, current)
+    return peak
+
+
+class PathReplayTransport(ReplayTransport):
+    """:class:`ReplayTransport` that matches on method and path only."""
+
+    def __init__(self, path, latency_scale: float = 1.0) -> None:
+        super().__init__(path, latency_scale)
+        grouped: Dict[str, List[Dict[str, Any]]] = {}
+        for key, interactions in self._interactions.items():
+            grouped.setdefault(key.split('?', 1)[0], []).extend(interactions)
+        self._interactions = grouped
+
+    def _match_key(self, method, url, kwargs):
+        return f"{method.upper()} {urlsplit(url).path}"
+
+
+def replay(client: Weclapp, events: List[TraceEvent], paths: List[str], speedup: float, concurrency: int) -> List[Dict[str, Any]]:
+    """Send ``events`` on their (compressed) schedule; return one result per event."""
+    results: List[Optional[Dict[str, Any]]] = [None] * len(events)
+
+    def send(index: int, due: float) -> None:
+        event = events[index]
+        started = time.perf_counter()
+        status: Optional[int] = None
+        try:
+            data = b'{}' if event.method in ('POST', 'PUT') else None
+            client._send_request(event.method, urljoin(client.base_url, paths[index]), data=data)
+            status = 200
+        except WeclappAPIError as error:
+            status = error.status_code
+        ended = time.perf_counter()
+        results[index] = {
+            'lag_ms': (started - due) * 1000,
+            'duration_ms': (ended - started) * 1000,
+            'start': started,
+            'end': ended,
+            'status': status,
+        }
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        origin = time.perf_counter()
+        for index, event in enumerate(events):
+            due = origin + event.offset / speedup
+            wait = due - time.perf_counter()
+            if wait > 0:
+                time.sleep(wait)
+            executor.submit(send, index, due)
+    return results
+
+
+def _status_class(status: Optional[int]) -> str:
+    return 'error' if status is None else f"{status // 100}xx"
+
+
+def report(events: List[TraceEvent], results: List[Dict[str, Any]], client: Weclapp, speedup: float) -> Dict[str, Any]:
+    span = max(event.offset + event.duration_ms / 1000 for event in events)
+    wall = max(r['end'] for r in results) - min(r['start'] for r in results)
+    mismatched = sum(
+        1 for event, result in zip(events, results)
+        if event.status is not None and _status_class(event.status) != _status_class(result['status'])
+    )
+    stats = client.stats()
+    return {
+        'events': len(events),
+        'original_seconds': span,
+        'replay_seconds': wall,
+        'speedup': speedup,
+        'original_rate': len(events) / span if span else 0.0,
+        'replay_rate': len(events) / wall if wall else 0.0,
+        'original_peak_concurrency': peak_concurrency(
+            [(e.offset, e.offset + e.duration_ms / 1000) for e in events]
+        ),
+        'replay_peak_concurrency': peak_concurrency([(r['start'], r['end']) for r in results]),
+        'original_latency_ms': percentiles([e.duration_ms for e in events]),
+        'replay_latency_ms': percentiles([r['duration_ms'] for r in results]),
+        'schedule_lag_ms': percentiles([max(0.0, r['lag_ms']) for r in results]),
+        'status_mismatches': mismatched,
+        'retries': stats['retries'],
+        'pool': stats['pool'],
+        'endpoints': {
+            name: {'requests': endpoint['requests'], 'errors': endpoint['errors'], 'p95_ms': endpoint['latency_ms']['p95']}
+            for name, endpoint in stats['endpoints'].items()
+        },
+    }
+
+
+def print_report(summary: Dict[str, Any], top: int) -> None:
+    def row(label: str, original: Any, replayed: Any) -> None:
+        print(f"{label:24s} {original:>12s} {replayed:>12s}")
+
+    print(f"{'':24s} {'original':>12s} {'replay':>12s}")
+    row('requests', str(summary['events']), str(summary['events']))
+    row('seconds', f"{summary['original_seconds']:.2f}", f"{summary['replay_seconds']:.2f}")
+    row('requests/s', f"{summary['original_rate']:.1f}", f"{summary['replay_rate']:.1f}")
+    row('peak concurrency', str(summary['original_peak_concurrency']), str(summary['replay_peak_concurrency']))
+    for quantile in ('p50', 'p95', 'p99'):
+        row(
+            f"latency {quantile} ms",
+            f"{summary['original_latency_ms'][quantile]:.1f}", f"{summary['replay_latency_ms'][quantile]:.1f}",
+        )
+    lag = summary['schedule_lag_ms']
+    print(
+        f"\nschedule lag p50/p95/p99: {lag['p50']:.1f}/{lag['p95']:.1f}/{lag['p99']:.1f} ms; "
+        f"status class changed for {summary['status_mismatches']} requests; {summary['retries']} retries; "
+        f"pool wait {summary['pool']['wait_seconds'] * 1000:.0f} ms total, "
+        f"{summary['pool']['connections_opened']} connections opened"
+    )
+    endpoints = sorted(summary['endpoints'].items(), key=lambda item: -item[1]['requests'])[:top]
+    print(f"\n{'endpoint':52s} {'req':>6s} {'err':>5s} {'p95 ms':>7s}")
+    for name, endpoint in endpoints:
+        print(f"{name[:52]:52s} {endpoint['requests']:6d} {endpoint['errors']:5d} {endpoint['p95_ms']:7.1f}")
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('log', help="log file with [API] lines, a --save-trace file, or '-' for stdin")
+    parser.add_argument('--speedup', type=float, default=1.0, help='time compression factor for the schedule')
+    parser.add_argument('--limit', type=int, help='replay only the first N requests')
+    parser.add_argument('--cassette', metavar='PATH', help='answer from a RecordingTransport cassette instead of the stub')
+    parser.add_argument('--latency-scale', type=float, default=1.0,
+                        help="stub: fraction of the trace's median duration the stub waits per request; "
+                             'cassette: ReplayTransport latency_scale')
+    parser.add_argument('--rows', type=int, default=5000, help='stub rows per entity that ids are mapped onto')
+    parser.add_argument('--pool-maxsize', type=parse_pool_size, default=10)
+    parser.add_argument('--concurrency', type=int, default=100, help='maximum requests in flight')
+    parser.add_argument('--save-trace', metavar='PATH', help='write the parsed trace as JSON lines')
+    parser.add_argument('--json', metavar='PATH', help='write the replay summary to PATH')
+    parser.add_argument('--top', type=int, default=10, help='endpoints to list')
+    args = parser.parse_args(argv)
+
+    events = load_trace(args.log)
+    if args.limit:
+        events = events[:args.limit]
+    if not events:
+        print(f"no [API] lines in {args.log}")
+        return 1
+    if args.save_trace:
+        save_trace(events, args.save_trace)
+        print(f"wrote {len(events)} requests to {args.save_trace}")
+
+    # Failures are part of the report; keep the per-request log quiet.
+    logging.getLogger('weclappy').setLevel(logging.CRITICAL)
+    server = None
+    if args.cassette:
+        transport = PathReplayTransport(args.cassette, latency_scale=args.latency_scale)
+        client = Weclapp(REPLAY_BASE_URL, 'replay', transport=transport, pool_maxsize=args.pool_maxsize)
+        paths = [relative_path(event.path) for event in events]
+        target = f"cassette {args.cassette} ({len(transport)} interactions)"
+    else:
+        rows = sales_order_rows(args.rows)
+        datasets = {relative_path(event.path).split('/')[0]: rows for event in events}
+        datasets['customAttributeDefinition'] = custom_attribute_definitions(5)
+        # The stub sleeps the same for every request; use the trace's median.
+        median_ms = percentiles([event.duration_ms for event in events])['p50'] * args.latency_scale
+        server = StubServer(datasets, latency_ms=median_ms).start()
+        client = Weclapp(server.base_url, 'replay', pool_maxsize=args.pool_maxsize)
+        paths = [stub_path(event.path, args.rows) for event in events]
+        target = f"stub at {server.base_url} ({median_ms:.0f} ms latency)"
+
+    print(f"replaying {len(events)} requests at {args.speedup:g}x against {target}\n")
+    try:
+        results = replay(client, events, paths, args.speedup, args.concurrency)
+    finally:
+        if server is not None:
+            server.stop()
+    summary = report(events, results, client, args.speedup)
+    print_report(summary, args.top)
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(dict(summary, log=args.log, target=target), f, indent=2)
+        print(f"wrote {args.json}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
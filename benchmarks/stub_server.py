@@ -0,0 +1,277 @@
+"""Stdlib HTTP stub of the weclapp REST API for benchmarks.
+
+Serves in-memory datasets under ``/webapp/api/v1/{entity}`` with weclapp's
+pagination (``page``, ``pageSize``), ``/{entity}/count``, ``id-eq`` lookups
+and ``/{entity}/id/{id}``. ``PUT /{entity}/id/{id}`` answers with the row
+merged with the request body and its version incremented, ``POST /{entity}``
+echoes the body with a new id and ``DELETE /{entity}/id/{id}`` answers 204;
+none of them change the dataset. Binary ``downloads`` are served by path, e.g.
+``document/id/1/download``. Each request can be delayed by a fixed latency plus
+random jitter. Keep-alive is supported, so connection pooling behaves like it
+does against a real tenant.
+
+Usage::
+
+    with StubServer({'salesOrder': sales_order_rows(20000)}, latency_ms=20) as server:
+        client = Weclapp(server.base_url, 'benchmark')
+        client.get_all('salesOrder', threaded=True)
+
+Run standalone to poke at it with curl::
+
+    python -m benchmarks.stub_server --rows 5000 --latency-ms 25 --port 8080
+    python -m benchmarks.stub_server --data article=articles.ndjson
+"""
+
+import argparse
+import json
+import random
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional
+from urllib.parse import parse_qs, urlparse
+
+API_PREFIX = '/webapp/api/v1/'
+JSON_TYPE = 'application/json'
+ATTRIBUTE_TYPES = ('STRING', 'INTEGER', 'DECIMAL', 'BOOLEAN', 'DATE')
+ATTRIBUTE_VALUES = {
+    'STRING': ('stringValue', lambda n: f"value {n}"),
+    'INTEGER': ('numberValue', lambda n: str(n)),
+    'DECIMAL': ('numberValue', lambda n: f"{n * 0.5:.2f}"),
+    'BOOLEAN': ('booleanValue', lambda n: n % 2 == 0),
+    'DATE': ('dateValue', lambda n: 1700000000000 + n),
+}
+
+
+def custom_attribute_definitions(count: int) -> List[Dict[str, Any]]:
+    return [
+        {
+            'id': f"def-{a}",
+            'attributeKey': f"attr{a}",
+            'attributeType': ATTRIBUTE_TYPES[a % len(ATTRIBUTE_TYPES)],
+            'entities': ['salesOrder'],
+        }
+        for a in range(count)
+    ]
+
+
+def sales_order_rows(rows: int, items_per_order: int = 5, custom_attributes: int = 5) -> List[Dict[str, Any]]:
+    """Realistic salesOrder rows: header fields, an address, order items and
+    customAttributes matching :func:`custom_attribute_definitions`."""
+    result = []
+    for n in range(rows):
+        attributes = []
+        for a in range(custom_attributes):
+            field, value = ATTRIBUTE_VALUES[ATTRIBUTE_TYPES[a % len(ATTRIBUTE_TYPES)]]
+            attributes.append({'attributeDefinitionId': f"def-{a}", field: value(n)})
+        result.append({
+            'id': str(100000 + n),
+            'version': '3',
+            'orderNumber': f"SO-{n:06d}",
+            'customerId': str(5000 + n % 50),
+            'orderDate': 1700000000000 + n,
+            'status': 'ORDER_CONFIRMATION_PRINTED',
+            'netAmount': f"{n * 1.5:.2f}",
+            'grossAmount': f"{n * 1.785:.2f}",
+            'recordAddress': {'street1': 'Hauptstraße 1', 'city': 'Köln', 'zipcode': '50667', 'countryCode': 'DE'},
+            'orderItems': [
+                {
+                    'id': f"{n}-{i}",
+                    'articleId': str(9000 + i),
+                    'quantity': str(i + 1),
+                    'unitPrice': '19.99',
+                    'title': f"Artikel {i}",
+                    'description': 'Lorem ipsum dolor sit amet ' * 3,
+                }
+                for i in range(items_per_order)
+            ],
+            'customAttributes': attributes,
+        })
+    return result
+
+
+class StubServer:
+    """Threaded weclapp stub serving ``datasets`` (entity name -> rows)."""
+
+    def __init__(
+        self,
+        datasets: Dict[str, List[Dict[str, Any]]],
+        latency_ms: float = 0.0,
+        jitter_ms: float = 0.0,
+        host: str = '127.0.0.1',
+        port: int = 0,
+        seed: int = 0,
+        downloads: Optional[Dict[str, bytes]] = None,
+    ) -> None:
+        self.datasets = datasets
+        self.downloads = downloads or {}
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.requests = 0
+        self._created = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._pages: Dict[tuple, bytes] = {}
+        self._by_id = {
+            entity: {row.get('id'): row for row in rows} for entity, rows in datasets.items()
+        }
+        self._server = ThreadingHTTPServer((host, port), self._handler_class())
+        self._server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}{API_PREFIX.rstrip('/')}"
+
+    def start(self) -> 'StubServer':
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self) -> 'StubServer':
+        return self.start()
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+    def respond(self, method: str, path: str, query: Dict[str, List[str]], body: Optional[bytes] = None):
+        """Return ``(status, body, content_type)`` for one request."""
+        if not path.startswith(API_PREFIX):
+            return 404, {'error': f"no stub for {method} {path}"}, JSON_TYPE
+        relative = path[len(API_PREFIX):].strip('/')
+        if method == 'GET' and relative in self.downloads:
+            return 200, self.downloads[relative], 'application/octet-stream'
+        parts = relative.split('/')
+        rows = self.datasets.get(parts[0])
+        if rows is None:
+            return 404, {'error': f"unknown entity {parts[0]}"}, JSON_TYPE
+        if method == 'PUT' and len(parts) == 3 and parts[1] == 'id':
+            row = self._by_id[parts[0]].get(parts[2])
+            if row is None:
+                return 404, {'error': 'not found'}, JSON_TYPE
+            updated = dict(row, **json.loads(body or b'{}'))
+            updated['version'] = str(int(row.get('version', '0')) + 1)
+            return 200, updated, JSON_TYPE
+        if method == 'POST' and len(parts) == 1:
+            with self._lock:
+                self._created += 1
+                created = dict(json.loads(body or b'{}'), id=f"new-{self._created}", version='0')
+            return 201, created, JSON_TYPE
+        if method == 'DELETE' and len(parts) == 3 and parts[1] == 'id':
+            return (204, b'', JSON_TYPE) if parts[2] in self._by_id[parts[0]] else (404, {'error': 'not found'}, JSON_TYPE)
+        if method != 'GET':
+            return 404, {'error': f"no stub for {method} {path}"}, JSON_TYPE
+        if parts[1:] == ['count']:
+            return 200, {'result': len(rows)}, JSON_TYPE
+        if len(parts) == 3 and parts[1] == 'id':
+            row = self._by_id[parts[0]].get(parts[2])
+            return (200, row, JSON_TYPE) if row is not None else (404, {'error': 'not found'}, JSON_TYPE)
+        if len(parts) > 1:
+            return 404, {'error': f"no stub for {path}"}, JSON_TYPE
+        if 'id-eq' in query:
+            row = self._by_id[parts[0]].get(query['id-eq'][0])
+            return 200, {'result': [row] if row is not None else []}, JSON_TYPE
+        page = int(query.get('page', ['1'])[0])
+        page_size = int(query.get('pageSize', ['100'])[0])
+        key = (parts[0], page, page_size)
+        body = self._pages.get(key)
+        if body is None:
+            body = self._pages[key] = json.dumps(
+                {'result': rows[(page - 1) * page_size:page * page_size]}
+            ).encode('utf-8')
+        return 200, body, JSON_TYPE
+
+    def _delay(self) -> None:
+        if self.latency_ms or self.jitter_ms:
+            with self._lock:
+                jitter = self._random.uniform(0, self.jitter_ms)
+            time.sleep((self.latency_ms + jitter) / 1000)
+
+    def _handler_class(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+            # Headers and body go out in separate writes; without TCP_NODELAY
+            # delayed ACKs add ~40 ms to every keep-alive response.
+            disable_nagle_algorithm = True
+
+            def do_GET(self):
+                self._serve('GET')
+
+            def do_PUT(self):
+                self._serve('PUT')
+
+            def do_POST(self):
+                self._serve('POST')
+
+            def do_DELETE(self):
+                self._serve('DELETE')
+
+            def _serve(self, method: str) -> None:
+                url = urlparse(self.path)
+                length = int(self.headers.get('Content-Length') or 0)
+                request_body = self.rfile.read(length) if length else None
+                with stub._lock:
+                    stub.requests += 1
+                stub._delay()
+                status, body, content_type = stub.respond(method, url.path, parse_qs(url.query), request_body)
+                if not isinstance(body, bytes):
+                    body = json.dumps(body).encode('utf-8')
+                self.send_response(status)
+                self.send_header('Content-Type', content_type)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=5000)
+    parser.add_argument('--items', type=int, default=5, help='orderItems per salesOrder')
+    parser.add_argument('--custom-attributes', type=int, default=5)
+    parser.add_argument('--latency-ms', type=float, default=0.0)
+    parser.add_argument('--jitter-ms', type=float, default=0.0)
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--data', action='append', default=[], metavar='ENTITY=PATH',
+                        help='serve NDJSON rows (e.g. from benchmarks.datagen) as ENTITY (repeatable)')
+    args = parser.parse_args(argv)
+
+    datasets = {
+        'salesOrder': sales_order_rows(args.rows, args.items, args.custom_attributes),
+        'customAttributeDefinition': custom_attribute_definitions(args.custom_attributes),
+    }
+    for item in args.data:
+        entity, _, path = item.partition('=')
+        with open(path, encoding='utf-8') as f:
+            datasets[entity] = [json.loads(line) for line in f if line.strip()]
+    server = StubServer(
+        datasets,
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        port=args.port,
+    )
+    served = ', '.join(f"{len(rows)} {entity}" for entity, rows in datasets.items())
+    print(f"Serving {served} rows at {server.base_url} (Ctrl+C to stop)")
+    try:
+        server._server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server._server.server_close()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
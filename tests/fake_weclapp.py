@@ -0,0 +1,547 @@
+"""In-memory fake weclapp server generated from ``docs/weclapp-openapi.json``.
+
+Every entity the spec exposes as a paginated collection (``/{entity}`` with
+``page``) gets list, ``/count``, ``/id/{id}`` and create/update/delete
+routes backed by an in-memory store. Supported query semantics:
+
+- ``page`` / ``pageSize`` (default 100, capped at 1000) and ``sort``
+  (``sort=-orderDate,orderNumber``);
+- filters ``{property}-{op}`` with ``eq``, ``ne``, ``lt``, ``le``, ``gt``,
+  ``ge``, ``like``, ``ilike``, ``notlike``, ``in``, ``notin``, ``null`` and
+  ``notnull``; dotted paths (``orderItems.articleId-eq``) match if any nested
+  value matches;
+- ``properties`` projections, ``includeReferencedEntities`` (resolved through
+  the spec's ``x-weclapp.entity`` references) and ``additionalProperties``;
+- ``version`` optimistic locking on PUT, ``ignoreMissingProperties``,
+  ``dryRun`` and ``serializeNulls``.
+
+Values are compared using the property type from the spec: integers as
+numbers, ``format: decimal`` strings as decimals, booleans as ``true`` /
+``false``. Errors are weclapp-shaped problem responses, so ``WeclappAPIError``
+parses them like the real API. Other spec paths (actions such as
+``/salesOrder/id/{id}/createSalesInvoice``) answer 501 unless a handler is
+registered with :meth:`FakeWeclapp.route`.
+
+Usage::
+
+    with FakeWeclapp() as fake:
+        fake.load('party', [{'id': '1', 'partyType': 'ORGANIZATION', 'company': 'ACME'}])
+        fake.load('salesOrder', [{'orderNumber': 'SO-1', 'customerId': '1'}])
+        client = Weclapp(fake.base_url, 'test')
+        client.get_all('salesOrder', params={'customerId-eq': '1'}, threaded=True)
+
+Only the standard library is used.
+"""
+
+import copy
+import itertools
+import json
+import os
+import re
+import threading
+import time
+from decimal import Decimal, InvalidOperation
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlparse
+
+SPEC_PATH = os.path.join(os.path.dirname(__file__), '..', 'docs', 'weclapp-openapi.json')
+API_PREFIX = '/webapp/api/v1'
+MAX_PAGE_SIZE = 1000
+DEFAULT_PAGE_SIZE = 100
+FILTER_OPERATORS = (
+    'notnull', 'notlike', 'notin', 'ilike', 'like', 'null', 'eq', 'ne', 'lt', 'le', 'gt', 'ge', 'in',
+)
+_FILTER_PATTERN = re.compile(r'^(?P<path>.+)-(?P<op>' + '|'.join(FILTER_OPERATORS) + r')$')
+_RESERVED_PARAMS = {
+    'page', 'pageSize', 'sort', 'properties', 'includeReferencedEntities', 'additionalProperties',
+    'serializeNulls', 'ignoreMissingProperties', 'dryRun',
+}
+
+Handler = Callable[['FakeWeclapp', Dict[str, str], Dict[str, str], Any], Tuple[int, Any]]
+
+
+class FakeApiError(Exception):
+    """Raised inside the fake to answer with a weclapp problem response."""
+
+    def __init__(self, status: int, detail: str, title: Optional[str] = None) -> None:
+        super().__init__(detail)
+        self.status = status
+        self.detail = detail
+        self.title = title or {
+            400: 'Bad Request', 404: 'Not Found', 409: 'Conflict', 501: 'Not Implemented',
+        }.get(status, 'Error')
+
+    def body(self, path: str) -> Dict[str, Any]:
+        return {
+            'type': f"/webapp/view/api/errors.html#{self.title.lower().replace(' ', '-')}",
+            'title': self.title,
+            'status': self.status,
+            'detail': self.detail,
+            'error': self.detail,
+            'instance': path,
+        }
+
+
+class OpenApiSpec:
+    """Entity routes and flattened schemas from a weclapp OpenAPI document."""
+
+    def __init__(self, path: str = SPEC_PATH) -> None:
+        with open(path, encoding='utf-8') as f:
+            self.document = json.load(f)
+        self.schemas = self.document['components']['schemas']
+        self.paths = self.document['paths']
+        self.entities: Dict[str, str] = {}
+        self.additional_properties: Dict[str, List[str]] = {}
+        for path, item in self.paths.items():
+            get = item.get('get')
+            if path.count('/') != 1 or not get:
+                continue
+            if not any(p.get('name') == 'page' for p in get.get('parameters', [])):
+                continue
+            schema = get['responses']['200']['content']['application/json']['schema']['properties']
+            entity = path[1:]
+            self.entities[entity] = schema['result']['items']['$ref'].rsplit('/', 1)[-1]
+            self.additional_properties[entity] = sorted(
+                schema.get('additionalProperties', {}).get('properties', {})
+            )
+        self._properties: Dict[str, Dict[str, Any]] = {}
+
+    def properties(self, schema: Dict[str, Any]) -> Dict[str, Any]:
+        """Properties of ``schema`` with ``$ref`` and ``allOf`` resolved."""
+        ref = schema.get('$ref')
+        if ref is not None:
+            name = ref.rsplit('/', 1)[-1]
+            cached = self._properties.get(name)
+            if cached is None:
+                cached = self._properties[name] = self.properties(self.schemas[name])
+            return cached
+        merged: Dict[str, Any] = {}
+        for part in schema.get('allOf', []):
+            merged.update(self.properties(part))
+        merged.update(schema.get('properties', {}))
+        return merged
+
+    def entity_properties(self, entity: str) -> Dict[str, Any]:
+        return self.properties({'$ref': f"#/components/schemas/{self.entities[entity]}"})
+
+    def resolve(self, entity: str, path: str) -> Optional[Dict[str, Any]]:
+        """Schema of the dotted property ``path`` on ``entity`` (``None`` if unknown)."""
+        properties = self.entity_properties(entity)
+        schema = None
+        for segment in path.split('.'):
+            if properties is None or segment not in properties:
+                return None
+            schema = properties[segment]
+            target = schema.get('items', schema) if schema.get('type') == 'array' else schema
+            properties = self.properties(target) if ('$ref' in target or 'properties' in target or 'allOf' in target) else None
+        return schema
+
+
+class FakeWeclapp:
+    """Threaded in-memory weclapp server.
+
+    :param spec: Parsed :class:`OpenApiSpec`; loaded from ``docs/`` if
+        omitted. Pass one spec to many fakes to parse it only once.
+    :param latency_ms: Delay added to every request.
+    :param api_key: If set, requests must send it as ``AuthenticationToken``.
+    """
+
+    def __init__(
+        self,
+        spec: Optional[OpenApiSpec] = None,
+        latency_ms: float = 0.0,
+        api_key: Optional[str] = None,
+        host: str = '127.0.0.1',
+        port: int = 0,
+    ) -> None:
+        self.spec = spec or OpenApiSpec()
+        self.latency_ms = latency_ms
+        self.api_key = api_key
+        self.store: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        self.requests: List[Tuple[str, str]] = []
+        self.additional_property_values: Dict[Tuple[str, str], Callable[[Dict[str, Any]], Any]] = {}
+        self._routes: List[Tuple[str, re.Pattern, Handler]] = []
+        self._ids = itertools.count(1000000)
+        self._lock = threading.RLock()
+        self._server = ThreadingHTTPServer((host, port), self._handler_class())
+        self._server.daemon_threads = True
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}{API_PREFIX}/"
+
+    def start(self) -> 'FakeWeclapp':
+        threading.Thread(target=self._server.serve_forever, args=(0.05,), daemon=True).start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self) -> 'FakeWeclapp':
+        return self.start()
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+    # -- data ------------------------------------------------------------
+
+    def load(self, entity: str, rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Store ``rows`` for ``entity``, assigning ``id`` and ``version`` where missing."""
+        self._require_entity(entity)
+        stored = []
+        with self._lock:
+            table = self.store.setdefault(entity, {})
+            for row in rows:
+                row = copy.deepcopy(row)
+                row.setdefault('id', str(next(self._ids)))
+                row.setdefault('version', '0')
+                table[row['id']] = row
+                stored.append(row)
+        return stored
+
+    def rows(self, entity: str) -> List[Dict[str, Any]]:
+        with self._lock:
+            return list(self.store.get(entity, {}).values())
+
+    def route(self, method: str, path: str, handler: Handler) -> None:
+        """Serve ``method path`` with ``handler(fake, path_params, query, body) -> (status, body)``.
+
+        ``path`` is relative to the API root and may contain ``{name}``
+        placeholders, e.g. ``'/salesOrder/id/{id}/createSalesInvoice'``.
+        """
+        pattern = re.compile('^' + re.sub(r'\\{(\w+)\\}', r'(?P<\1>[^/]+)', re.escape(path)) + '$')
+        self._routes.insert(0, (method.upper(), pattern, handler))
+
+    # -- request handling ------------------------------------------------
+
+    def handle(self, method: str, path: str, query: Dict[str, str], body: Any) -> Tuple[int, Any]:
+        """Answer one request; ``path`` is relative to the API root."""
+        for route_method, pattern, handler in self._routes:
+            match = pattern.match(path)
+            if match and route_method == method:
+                return handler(self, match.groupdict(), query, body)
+        parts = path.strip('/').split('/')
+        entity = parts[0]
+        if entity in self.spec.entities:
+            if len(parts) == 1 and method == 'GET':
+                return 200, self._query(entity, query)
+            if len(parts) == 1 and method == 'POST':
+                return 201, self._create(entity, body, query)
+            if parts[1:] == ['count'] and method == 'GET':
+                return 200, {'result': len(self._filtered(entity, query))}
+            if len(parts) == 3 and parts[1] == 'id':
+                if method == 'GET':
+                    return 200, self._serialize(self._find(entity, parts[2]), query)
+                if method == 'PUT':
+                    return 200, self._update(entity, parts[2], body, query)
+                if method == 'DELETE':
+                    self._delete(entity, parts[2], query)
+                    return 204, None
+        if '/' + '/'.join(parts) in self.spec.paths or self._matches_spec_template(parts):
+            raise FakeApiError(501, f"{method} {path} is in the spec but not implemented by the fake")
+        raise FakeApiError(404, f"no endpoint {method} {path}")
+
+    def _matches_spec_template(self, parts: List[str]) -> bool:
+        if len(parts) < 3 or parts[1] != 'id':
+            return False
+        return '/'.join(['', parts[0], 'id', '{id}'] + parts[3:]) in self.spec.paths
+
+    def _require_entity(self, entity: str) -> None:
+        if entity not in self.spec.entities:
+            raise FakeApiError(404, f"unknown entity {entity}")
+
+    def _find(self, entity: str, entity_id: str) -> Dict[str, Any]:
+        row = self.store.get(entity, {}).get(entity_id)
+        if row is None:
+            raise FakeApiError(404, f"{entity} with id {entity_id} not found")
+        return row
+
+    def _query(self, entity: str, query: Dict[str, str]) -> Dict[str, Any]:
+        rows = self._filtered(entity, query)
+        if query.get('sort'):
+            for key in reversed(query['sort'].split(',')):
+                descending = key.startswith('-')
+                path = key.lstrip('-+')
+                schema = self._schema(entity, path)
+                # None sorts last in either direction.
+                present = [r for r in rows if _first(_values(r, path)) is not None]
+                missing = [r for r in rows if _first(_values(r, path)) is None]
+                present.sort(key=lambda r: _coerce(_first(_values(r, path)), schema), reverse=descending)
+                rows = present + missing
+        page = _int_param(query, 'page', 1)
+        page_size = min(_int_param(query, 'pageSize', DEFAULT_PAGE_SIZE), MAX_PAGE_SIZE)
+        if page < 1 or page_size < 1:
+            raise FakeApiError(400, 'page and pageSize must be positive')
+        rows = rows[(page - 1) * page_size:page * page_size]
+
+        response: Dict[str, Any] = {'result': [self._serialize(row, query) for row in rows]}
+        if query.get('additionalProperties'):
+            response['additionalProperties'] = self._additional_properties(entity, rows, query)
+        if query.get('includeReferencedEntities'):
+            response['referencedEntities'] = self._referenced_entities(entity, rows, query)
+        return response
+
+    def _filtered(self, entity: str, query: Dict[str, str]) -> List[Dict[str, Any]]:
+        if 'filter' in query:
+            raise FakeApiError(400, 'the filter expression parameter is not supported by the fake')
+        conditions = []
+        for name, raw in query.items():
+            if name in _RESERVED_PARAMS:
+                continue
+            match = _FILTER_PATTERN.match(name)
+            if not match:
+                raise FakeApiError(400, f"unknown query parameter {name}")
+            path, op = match.group('path'), match.group('op')
+            conditions.append((path, op, raw, self._schema(entity, path)))
+        rows = self.rows(entity)
+        for path, op, raw, schema in conditions:
+            rows = [row for row in rows if _matches(_values(row, path), op, raw, schema)]
+        return rows
+
+    def _schema(self, entity: str, path: str) -> Dict[str, Any]:
+        schema = self.spec.resolve(entity, path)
+        if schema is None:
+            raise FakeApiError(400, f"unknown property {path} for {entity}")
+        return schema
+
+    def _serialize(self, row: Dict[str, Any], query: Dict[str, str]) -> Dict[str, Any]:
+        if query.get('properties'):
+            row = _project(row, [p.strip() for p in query['properties'].split(',') if p.strip()])
+        if not _flag(query, 'serializeNulls'):
+            row = _strip_nulls(row)
+        return row
+
+    def _additional_properties(
+        self, entity: str, rows: List[Dict[str, Any]], query: Dict[str, str]
+    ) -> Dict[str, List[Any]]:
+        result = {}
+        for name in query['additionalProperties'].split(','):
+            name = name.strip()
+            if name not in self.spec.additional_properties.get(entity, []):
+                raise FakeApiError(400, f"unknown additional property {name} for {entity}")
+            compute = self.additional_property_values.get((entity, name), lambda row: None)
+            result[name] = [compute(row) for row in rows]
+        return result
+
+    def _referenced_entities(
+        self, entity: str, rows: List[Dict[str, Any]], query: Dict[str, str]
+    ) -> Dict[str, List[Dict[str, Any]]]:
+        referenced: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        for path in query['includeReferencedEntities'].split(','):
+            path = path.strip()
+            target = self._schema(entity, path).get('x-weclapp', {}).get('entity')
+            if target is None:
+                raise FakeApiError(400, f"{path} is not a reference property of {entity}")
+            bucket = referenced.setdefault(target, {})
+            table = self.store.get(target, {})
+            for row in rows:
+                for ref_id in _values(row, path):
+                    if ref_id in table:
+                        bucket[ref_id] = _strip_nulls(table[ref_id])
+        return {name: list(bucket.values()) for name, bucket in referenced.items()}
+
+    def _create(self, entity: str, body: Any, query: Dict[str, str]) -> Dict[str, Any]:
+        row = self._validated(entity, body)
+        row.pop('version', None)
+        row['id'] = str(next(self._ids))
+        row['version'] = '0'
+        now = int(time.time() * 1000)
+        properties = self.spec.entity_properties(entity)
+        for stamp in ('createdDate', 'lastModifiedDate'):
+            if stamp in properties:
+                row[stamp] = now
+        if not _flag(query, 'dryRun'):
+            with self._lock:
+                self.store.setdefault(entity, {})[row['id']] = row
+        return self._serialize(row, query)
+
+    def _update(self, entity: str, entity_id: str, body: Any, query: Dict[str, str]) -> Dict[str, Any]:
+        changes = self._validated(entity, body)
+        with self._lock:
+            current = self._find(entity, entity_id)
+            sent_version = changes.get('version')
+            if sent_version is not None and str(sent_version) != str(current.get('version')):
+                raise FakeApiError(
+                    409,
+                    f"Optimistic lock error: {entity} {entity_id} has version {current.get('version')}, "
+                    f"request sent version {sent_version}",
+                )
+            if _flag(query, 'ignoreMissingProperties'):
+                row = dict(current, **changes)
+            else:
+                row = changes
+            row['id'] = entity_id
+            row['version'] = str(int(current.get('version') or 0) + 1)
+            if 'lastModifiedDate' in self.spec.entity_properties(entity):
+                row['lastModifiedDate'] = int(time.time() * 1000)
+            if not _flag(query, 'dryRun'):
+                self.store[entity][entity_id] = row
+        return self._serialize(row, query)
+
+    def _delete(self, entity: str, entity_id: str, query: Dict[str, str]) -> None:
+        with self._lock:
+            self._find(entity, entity_id)
+            if not _flag(query, 'dryRun'):
+                del self.store[entity][entity_id]
+
+    def _validated(self, entity: str, body: Any) -> Dict[str, Any]:
+        if not isinstance(body, dict):
+            raise FakeApiError(400, 'request body must be a JSON object')
+        unknown = sorted(set(body) - set(self.spec.entity_properties(entity)))
+        if unknown:
+            raise FakeApiError(400, f"unknown properties for {entity}: {', '.join(unknown)}")
+        return copy.deepcopy(body)
+
+    def _handler_class(self):
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+            disable_nagle_algorithm = True
+
+            def _dispatch(self):
+                url = urlparse(self.path)
+                fake.requests.append((self.command, self.path))
+                if fake.latency_ms:
+                    time.sleep(fake.latency_ms / 1000)
+                length = int(self.headers.get('Content-Length') or 0)
+                raw = self.rfile.read(length) if length else b''
+                try:
+                    if fake.api_key is not None and self.headers.get('AuthenticationToken') != fake.api_key:
+                        raise FakeApiError(401, 'invalid or missing AuthenticationToken', 'Unauthorized')
+                    if not url.path.startswith(API_PREFIX + '/'):
+                        raise FakeApiError(404, f"no endpoint {url.path}")
+                    try:
+                        body = json.loads(raw) if raw else None
+                    except ValueError:
+                        raise FakeApiError(400, 'request body is not valid JSON')
+                    status, payload = fake.handle(
+                        self.command, url.path[len(API_PREFIX):], dict(parse_qsl(url.query, keep_blank_values=True)), body
+                    )
+                except FakeApiError as exc:
+                    status, payload = exc.status, exc.body(url.path)
+                data = b'' if payload is None else json.dumps(payload).encode('utf-8')
+                self.send_response(status)
+                if data:
+                    self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            do_GET = do_POST = do_PUT = do_DELETE = _dispatch
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+
+def _flag(query: Dict[str, str], name: str) -> bool:
+    return query.get(name, '').lower() == 'true'
+
+
+def _int_param(query: Dict[str, str], name: str, default: int) -> int:
+    try:
+        return int(query.get(name, default))
+    except ValueError:
+        raise FakeApiError(400, f"{name} must be an integer")
+
+
+def _values(row: Any, path: str) -> List[Any]:
+    """All values at dotted ``path``, descending into lists."""
+    current = [row]
+    for segment in path.split('.'):
+        found = []
+        for value in current:
+            items = value if isinstance(value, list) else [value]
+            for item in items:
+                if isinstance(item, dict) and segment in item:
+                    found.append(item[segment])
+        current = found
+    return [v for value in current for v in (value if isinstance(value, list) else [value])]
+
+
+def _first(values: List[Any]) -> Any:
+    return values[0] if values else None
+
+
+def _coerce(value: Any, schema: Dict[str, Any]) -> Any:
+    """Make ``value`` comparable according to the property schema."""
+    if value is None:
+        return None
+    kind = schema.get('items', {}).get('type') if schema.get('type') == 'array' else schema.get('type')
+    if kind == 'boolean':
+        return value if isinstance(value, bool) else str(value).lower() == 'true'
+    if kind == 'integer' or kind == 'number' or schema.get('format') == 'decimal':
+        try:
+            return Decimal(str(value))
+        except InvalidOperation:
+            raise FakeApiError(400, f"{value!r} is not a number")
+    return str(value)
+
+
+def _like(pattern: str, value: str, case_sensitive: bool) -> bool:
+    """SQL LIKE: ``%`` matches any run of characters, ``_`` a single one."""
+    regex = ''.join('.*' if c == '%' else '.' if c == '_' else re.escape(c) for c in pattern)
+    return re.fullmatch(regex, value, re.DOTALL if case_sensitive else re.DOTALL | re.IGNORECASE) is not None
+
+
+def _matches(values: List[Any], op: str, raw: str, schema: Dict[str, Any]) -> bool:
+    present = [v for v in values if v is not None]
+    if op == 'null':
+        return not present
+    if op == 'notnull':
+        return bool(present)
+    if op in ('in', 'notin'):
+        try:
+            options = json.loads(raw)
+        except ValueError:
+            raise FakeApiError(400, f"-{op} expects a JSON array, got {raw!r}")
+        wanted = {_coerce(option, schema) for option in options}
+        hit = any(_coerce(v, schema) in wanted for v in present)
+        return hit if op == 'in' else not hit
+    if op in ('like', 'ilike', 'notlike'):
+        hit = any(_like(raw, str(v), op == 'like') for v in present)
+        return hit if op != 'notlike' else not hit
+    target = _coerce(raw, schema)
+    compare = {
+        'eq': lambda v: v == target,
+        'ne': lambda v: v != target,
+        'lt': lambda v: v < target,
+        'le': lambda v: v <= target,
+        'gt': lambda v: v > target,
+        'ge': lambda v: v >= target,
+    }[op]
+    if op == 'ne':
+        return all(compare(_coerce(v, schema)) for v in present)
+    return any(compare(_coerce(v, schema)) for v in present)
+
+
+def _project(row: Dict[str, Any], paths: List[str]) -> Dict[str, Any]:
+    tree: Dict[str, Any] = {}
+    for path in paths:
+        node = tree
+        for segment in path.split('.'):
+            node = node.setdefault(segment, {})
+
+    def apply(value: Any, node: Dict[str, Any]) -> Any:
+        if not node:
+            return value
+        if isinstance(value, list):
+            return [apply(item, node) for item in value]
+        if isinstance(value, dict):
+            return {key: apply(value[key], child) for key, child in node.items() if key in value}
+        return value
+
+    return apply(row, tree)
+
+
+def _strip_nulls(value: Any) -> Any:
+    if isinstance(value, dict):
+        return {key: _strip_nulls(item) for key, item in value.items() if item is not None}
+    if isinstance(value, list):
+        return [_strip_nulls(item) for item in value]
+    return value
@@ -0,0 +1,214 @@
+"""Fault-injecting HTTP adapter for resilience tests and tail-latency benchmarks.
+
+Faults are injected inside urllib3's connection pool, below the client's
+``Retry`` policy, so they exercise the same retry, backoff and
+``Retry-After`` handling a real outage would:
+
+- latency drawn from a distribution (:func:`fixed`, :func:`uniform`,
+  :func:`lognormal`) before each request is sent;
+- bursts of 429 responses with a ``Retry-After`` header;
+- 5xx responses;
+- connection resets before the response arrives;
+- truncated bodies: the real response cut short, with its original
+  ``Content-Length``, so reading it fails.
+
+Usage::
+
+    client = Weclapp(base_url, api_key)
+    adapter = FaultInjectingAdapter.mount(client, PROFILES['flaky_5xx'], seed=1)
+    client.get_all('salesOrder', threaded=True)
+    adapter.injected  # {'server_error': 7, ...}
+
+``mount`` copies the client's retry policy and pool settings, and the
+adapter keeps reporting connection pool telemetry to ``client.metrics``.
+Only the standard library, requests and urllib3 are used.
+"""
+
+import io
+import math
+import random
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, Optional, Tuple
+
+from urllib3.exceptions import ProtocolError
+from urllib3.response import HTTPResponse
+
+from weclappy import (
+    Weclapp,
+    _InstrumentedHTTPAdapter,
+    _InstrumentedHTTPConnectionPool,
+    _InstrumentedHTTPSConnectionPool,
+)
+
+LatencyDistribution = Callable[[random.Random], float]
+
+
+def fixed(ms: float) -> LatencyDistribution:
+    return lambda rng: ms / 1000
+
+
+def uniform(low_ms: float, high_ms: float) -> LatencyDistribution:
+    return lambda rng: rng.uniform(low_ms, high_ms) / 1000
+
+
+def lognormal(median_ms: float, sigma: float) -> LatencyDistribution:
+    """Long-tailed latency: ``median_ms`` at p50, p99 at ``median_ms * e^(2.33 * sigma)``."""
+    mu = math.log(median_ms)
+    return lambda rng: rng.lognormvariate(mu, sigma) / 1000
+
+
+@dataclass(frozen=True)
+class FaultProfile:
+    """What to inject and how often. Rates are probabilities per request attempt.
+
+    ``schedule`` scripts the first attempts (``'rate_limit'``,
+    ``'server_error'``, ``'reset'``, ``'truncate'`` or ``None``) before the
+    rates apply, to replay a specific incident.
+    """
+
+    name: str = 'custom'
+    latency: Optional[LatencyDistribution] = None
+    rate_limit_rate: float = 0.0
+    rate_limit_burst: int = 3
+    retry_after: int = 1
+    server_error_rate: float = 0.0
+    server_error_statuses: Tuple[int, ...] = (500, 502, 503, 504)
+    reset_rate: float = 0.0
+    truncate_rate: float = 0.0
+    schedule: Tuple[Optional[str], ...] = ()
+
+
+PROFILES: Dict[str, FaultProfile] = {
+    profile.name: profile
+    for profile in (
+        FaultProfile('healthy', latency=uniform(5, 15)),
+        FaultProfile('slow_tail', latency=lognormal(10, 1.0)),
+        FaultProfile('rate_limited', latency=uniform(5, 15), rate_limit_rate=0.05, rate_limit_burst=3),
+        FaultProfile('flaky_5xx', latency=uniform(5, 15), server_error_rate=0.1),
+        FaultProfile('resets', latency=uniform(5, 15), reset_rate=0.05),
+        FaultProfile('truncated', latency=uniform(5, 15), truncate_rate=0.02),
+    )
+}
+
+
+class FaultInjector:
+    """Thread-safe, seeded fault decisions shared by all pools of an adapter."""
+
+    def __init__(self, profile: FaultProfile, seed: Optional[int] = None) -> None:
+        self.profile = profile
+        self.injected = {'rate_limit': 0, 'server_error': 0, 'reset': 0, 'truncate': 0, 'latency_seconds': 0.0}
+        self._random = random.Random(seed)
+        self._burst_left = 0
+        self._schedule = list(profile.schedule)
+        self._lock = threading.Lock()
+
+    def next_fault(self) -> Tuple[float, Optional[str], int]:
+        """Return ``(delay_seconds, fault, status)`` for the next request attempt."""
+        profile = self.profile
+        with self._lock:
+            rng = self._random
+            delay = profile.latency(rng) if profile.latency else 0.0
+            self.injected['latency_seconds'] += delay
+            fault, status = None, 0
+            if self._schedule:
+                fault = self._schedule.pop(0)
+                status = {'rate_limit': 429, 'server_error': profile.server_error_statuses[0]}.get(fault, 0)
+            elif self._burst_left or rng.random() < profile.rate_limit_rate:
+                # A burst is tenant-wide: the next attempts from every thread get 429.
+                self._burst_left = (self._burst_left or profile.rate_limit_burst) - 1
+                fault, status = 'rate_limit', 429
+            elif rng.random() < profile.server_error_rate:
+                fault, status = 'server_error', rng.choice(profile.server_error_statuses)
+            elif rng.random() < profile.reset_rate:
+                fault = 'reset'
+            elif rng.random() < profile.truncate_rate:
+                fault = 'truncate'
+            if fault:
+                self.injected[fault] += 1
+        return delay, fault, status
+
+
+class _FaultPoolMixin:
+    injector: FaultInjector
+
+    def _make_request(self, conn, method, url, *args, **kwargs):
+        delay, fault, status = self.injector.next_fault()
+        if delay:
+            time.sleep(delay)
+        if fault == 'reset':
+            raise ProtocolError('Connection aborted.', ConnectionResetError(104, 'Connection reset by peer'))
+        if fault in ('rate_limit', 'server_error'):
+            headers = {'Content-Type': 'application/json'}
+            if status == 429:
+                headers['Retry-After'] = str(self.injector.profile.retry_after)
+            body = f'{{"status": {status}, "title": "Injected fault", "error": "injected {fault}"}}'.encode()
+            headers['Content-Length'] = str(len(body))
+            return self._fake_response(method, url, status, headers, body, kwargs, kwargs.get('response_conn'))
+
+        response = super()._make_request(conn, method, url, *args, **kwargs)
+        if fault != 'truncate':
+            return response
+        body = response.data
+        headers = dict(response.headers)
+        status = response.status
+        response.release_conn()
+        # Keep the full Content-Length so the short body fails when read.
+        headers['Content-Length'] = str(len(body))
+        return self._fake_response(method, url, status, headers, body[:len(body) // 2], kwargs, None)
+
+    def _fake_response(self, method, url, status, headers, body, kwargs, connection) -> HTTPResponse:
+        return HTTPResponse(
+            body=io.BytesIO(body),
+            headers=headers,
+            status=status,
+            reason='Injected',
+            preload_content=kwargs.get('preload_content', True),
+            decode_content=kwargs.get('decode_content', True),
+            enforce_content_length=kwargs.get('enforce_content_length', True),
+            # Releasing the response hands the connection back to the pool.
+            pool=self,
+            connection=connection,
+            retries=kwargs.get('retries'),
+            request_method=method,
+            request_url=url,
+        )
+
+
+class FaultInjectingAdapter(_InstrumentedHTTPAdapter):
+    """Client adapter whose connection pools inject the faults of ``profile``."""
+
+    def __init__(self, profile: FaultProfile, seed: Optional[int] = None, metrics=None, **kwargs) -> None:
+        self.injector = FaultInjector(profile, seed)
+        super().__init__(metrics, **kwargs)
+
+    @property
+    def injected(self) -> Dict[str, float]:
+        return dict(self.injector.injected)
+
+    def init_poolmanager(self, connections, maxsize, block=False, **pool_kwargs):
+        super().init_poolmanager(connections, maxsize, block, **pool_kwargs)
+        attributes = {'injector': self.injector}
+        self.poolmanager.pool_classes_by_scheme = {
+            'http': type('FaultHTTPConnectionPool', (_FaultPoolMixin, _InstrumentedHTTPConnectionPool), attributes),
+            'https': type('FaultHTTPSConnectionPool', (_FaultPoolMixin, _InstrumentedHTTPSConnectionPool), attributes),
+        }
+
+    @classmethod
+    def mount(cls, client: Weclapp, profile: FaultProfile, seed: Optional[int] = None) -> 'FaultInjectingAdapter':
+        """Replace ``client``'s adapter, keeping its retries, pool size and metrics."""
+        current = client._adapter
+        adapter = cls(
+            profile,
+            seed,
+            metrics=client.metrics,
+            max_retries=current.max_retries,
+            pool_connections=current._pool_connections,
+            pool_maxsize=current.pool_maxsize,
+            pool_block=current._pool_block,
+        )
+        client._adapter = adapter
+        client.session.mount('http://', adapter)
+        client.session.mount('https://', adapter)
+        return adapter
@@ -0,0 +1,127 @@
+import unittest
+from unittest.mock import patch
+
+from fake_weclapp import FakeWeclapp, OpenApiSpec
+from weclappy import Weclapp, WeclappAPIError
+
+SPEC = OpenApiSpec()
+
+
+class TestFakeWeclapp(unittest.TestCase):
+    """The OpenAPI-driven fake server, driven through the real client."""
+
+    def setUp(self):
+        self.fake = FakeWeclapp(SPEC).start()
+        self.addCleanup(self.fake.stop)
+        self.weclapp = Weclapp(self.fake.base_url, "key")
+        self.fake.load("party", [
+            {"id": "p1", "partyType": "ORGANIZATION", "company": "ACME"},
+            {"id": "p2", "partyType": "ORGANIZATION", "company": "Globex"},
+        ])
+        self.fake.load("article", [{"id": "a1", "articleNumber": "A-1", "name": "Bolt"}])
+        self.fake.load("salesOrder", [
+            {
+                "id": str(n),
+                "orderNumber": f"SO-{n:03d}",
+                "customerId": "p1" if n % 2 else "p2",
+                "netAmount": f"{n * 10}.50",
+                "orderDate": 1700000000000 + n,
+                "orderItems": [{"id": f"i{n}", "articleId": "a1", "quantity": "1"}],
+            }
+            for n in range(1, 26)
+        ])
+
+    def test_spec_routes(self):
+        self.assertEqual(len(SPEC.entities), 145)
+        self.assertEqual(SPEC.entities["salesOrder"], "salesOrder")
+        self.assertEqual(SPEC.resolve("salesOrder", "orderItems.articleId")["x-weclapp"]["entity"], "article")
+        self.assertIsNone(SPEC.resolve("salesOrder", "noSuchField"))
+
+    def test_get_all_paginates_sequential_and_threaded(self):
+        with patch("weclappy.DEFAULT_PAGE_SIZE", 10):
+            sequential = self.weclapp.get_all("salesOrder")
+            threaded = self.weclapp.get_all("salesOrder", threaded=True, max_workers=3)
+
+        self.assertEqual([row.id for row in sequential], [str(n) for n in range(1, 26)])
+        self.assertEqual(sorted(row.id for row in threaded), sorted(str(n) for n in range(1, 26)))
+        pages = [path for method, path in self.fake.requests if "page=" in path]
+        self.assertEqual(len(pages), 6)
+
+    def test_filters_sort_and_count(self):
+        rows = self.weclapp.get("salesOrder", params={
+            "customerId-eq": "p1", "netAmount-ge": "100", "sort": "-netAmount", "pageSize": 3,
+        })
+        self.assertEqual([row.orderNumber for row in rows], ["SO-025", "SO-023", "SO-021"])
+
+        self.assertEqual(
+            [row.id for row in self.weclapp.get("salesOrder", params={"id-in": '["3", "7"]'})], ["3", "7"]
+        )
+        self.assertEqual(len(self.weclapp.get("salesOrder", params={"orderNumber-like": "SO-01%"})), 10)
+        self.assertEqual(len(self.weclapp.get("salesOrder", params={"orderNumber-ilike": "so-00_"})), 9)
+        self.assertEqual(len(self.weclapp.get("salesOrder", params={"orderItems.articleId-eq": "a1"})), 25)
+        self.assertEqual(len(self.weclapp.get("salesOrder", params={"orderDate-gt": "1700000000020"})), 5)
+        count = self.weclapp.session.get(f"{self.fake.base_url}salesOrder/count", params={"customerId-eq": "p2"})
+        self.assertEqual(count.json(), {"result": 12})
+
+    def test_unknown_filter_property_is_rejected(self):
+        with self.assertRaises(WeclappAPIError) as ctx:
+            self.weclapp.get("salesOrder", params={"bogus-eq": "1"})
+        self.assertEqual(ctx.exception.status_code, 400)
+        self.assertIn("unknown property bogus", ctx.exception.detail)
+
+    def test_properties_references_and_additional_properties(self):
+        self.fake.additional_property_values[("salesOrder", "consignment")] = lambda row: row["id"] == "1"
+
+        response = self.weclapp.get("salesOrder", params={
+            "id-eq": "1",
+            "properties": "id,customerId,orderItems.articleId",
+            "includeReferencedEntities": "customerId,orderItems.articleId",
+            "additionalProperties": "consignment",
+        }, return_weclapp_response=True)
+
+        order = response.result[0]
+        self.assertEqual(set(order), {"id", "customerId", "orderItems", "consignment"})
+        self.assertEqual(order["orderItems"], [{"articleId": "a1"}])
+        self.assertTrue(order.consignment)
+        self.assertEqual(order.customer.company, "ACME")
+        self.assertEqual(order.orderItems[0].article.name, "Bolt")
+        self.assertEqual(set(response.referenced_entities), {"party", "article"})
+
+    def test_crud_with_optimistic_locking(self):
+        created = self.weclapp.post("salesOrder", {"orderNumber": "SO-NEW", "customerId": "p1"})
+        self.assertEqual(created["version"], "0")
+        self.assertIn("createdDate", created)
+
+        updated = self.weclapp.put("salesOrder", created["id"], {"version": "0", "note": "first"})
+        self.assertEqual((updated["version"], updated["note"], updated["orderNumber"]), ("1", "first", "SO-NEW"))
+
+        with self.assertRaises(WeclappAPIError) as ctx:
+            self.weclapp.put("salesOrder", created["id"], {"version": "0", "note": "stale"})
+        self.assertEqual(ctx.exception.status_code, 409)
+        self.assertTrue(ctx.exception.is_optimistic_lock)
+        self.assertEqual(self.weclapp.get("salesOrder", id=created["id"]).note, "first")
+
+        self.weclapp.delete("salesOrder", created["id"])
+        with self.assertRaises(WeclappAPIError) as ctx:
+            self.weclapp.get("salesOrder", id=created["id"])
+        self.assertTrue(ctx.exception.is_not_found)
+
+    def test_dry_run_does_not_persist(self):
+        self.weclapp.post("salesOrder", {"orderNumber": "SO-DRY"}, params={"dryRun": True})
+        self.assertEqual(self.weclapp.get("salesOrder", params={"orderNumber-eq": "SO-DRY"}), [])
+
+    def test_action_endpoints_need_a_handler(self):
+        with self.assertRaises(WeclappAPIError) as ctx:
+            self.weclapp.call_method("salesOrder", "createSalesInvoice", entity_id="1", method="POST", data={})
+        self.assertEqual(ctx.exception.status_code, 501)
+
+        self.fake.route(
+            "POST", "/salesOrder/id/{id}/createSalesInvoice",
+            lambda fake, path, query, body: (200, {"result": {"salesOrderId": path["id"]}}),
+        )
+        result = self.weclapp.call_method("salesOrder", "createSalesInvoice", entity_id="1", method="POST", data={})
+        self.assertEqual(result["result"], {"salesOrderId": "1"})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,89 @@
+import unittest
+from unittest.mock import patch
+
+from fake_weclapp import FakeWeclapp, OpenApiSpec
+from fault_injection import FaultInjectingAdapter, FaultProfile, PROFILES
+from weclappy import Weclapp, WeclappAPIError
+
+SPEC = OpenApiSpec()
+
+
+class TestFaultInjection(unittest.TestCase):
+    """Retry behaviour and threaded page errors under injected faults."""
+
+    def setUp(self):
+        self.fake = FakeWeclapp(SPEC).start()
+        self.addCleanup(self.fake.stop)
+        self.fake.load("article", [{"id": str(n), "articleNumber": f"A-{n}"} for n in range(1, 31)])
+        self.weclapp = Weclapp(self.fake.base_url, "key")
+        sleep = patch('weclappy.time.sleep')
+        self.mock_sleep = sleep.start()
+        self.addCleanup(sleep.stop)
+
+    def mount(self, *schedule, **profile):
+        return FaultInjectingAdapter.mount(self.weclapp, FaultProfile(schedule=schedule, **profile), seed=1)
+
+    def test_server_error_is_retried(self):
+        adapter = self.mount("server_error")
+
+        self.assertEqual(self.weclapp.get("article", id="1").articleNumber, "A-1")
+
+        self.assertEqual(adapter.injected["server_error"], 1)
+        stats = self.weclapp.stats()
+        self.assertEqual((stats["requests"], stats["retries"], stats["errors"]), (1, 1, 0))
+        self.assertEqual(stats["pool"]["checkouts"], 2)
+
+    def test_rate_limit_burst_honours_retry_after(self):
+        self.mount("rate_limit", "rate_limit", retry_after=2)
+
+        self.weclapp.get("article", id="1")
+
+        self.assertEqual(self.weclapp.stats()["rate_limited"], 2)
+        self.assertEqual([c.args[0] for c in self.mock_sleep.call_args_list], [2, 2])
+
+    def test_exhausted_retries_raise(self):
+        self.mount("server_error", "server_error", "server_error", "server_error")
+
+        with self.assertRaises(WeclappAPIError):
+            self.weclapp.get("article", id="1")
+        self.assertEqual(len(self.fake.requests), 0)
+
+    def test_connection_reset_is_retried(self):
+        adapter = self.mount("reset")
+
+        self.assertEqual(self.weclapp.get("article", id="2").id, "2")
+        self.assertEqual(adapter.injected["reset"], 1)
+        self.assertEqual(self.weclapp.stats()["pool"]["connections_opened"], 1)
+
+    def test_truncated_body_raises(self):
+        self.mount("truncate")
+
+        with self.assertRaises(WeclappAPIError):
+            self.weclapp.get("article", id="1")
+        # The connection was released cleanly and is reused.
+        self.assertEqual(self.weclapp.get("article", id="1").id, "1")
+        self.assertEqual(self.weclapp.stats()["pool"]["connections_opened"], 1)
+
+    def test_threaded_get_all_drops_pages_that_fail(self):
+        # count, page 1, then page 2 fails on every attempt (1 try + 3 retries).
+        self.mount(None, None, "server_error", "server_error", "server_error", "server_error")
+
+        with patch('weclappy.DEFAULT_PAGE_SIZE', 10), self.assertLogs('weclappy', level='ERROR') as logs:
+            rows = self.weclapp.get_all("article", threaded=True, max_workers=1)
+
+        self.assertEqual(sorted(int(row.id) for row in rows), list(range(1, 11)) + list(range(21, 31)))
+        self.assertTrue(any("Error fetching page 2 for article" in line for line in logs.output))
+
+    def test_profiles_are_seeded(self):
+        def run():
+            client = Weclapp(self.fake.base_url, "key")
+            adapter = FaultInjectingAdapter.mount(client, PROFILES["flaky_5xx"], seed=7)
+            for n in range(1, 11):
+                client.get("article", id=str(n))
+            return adapter.injected
+
+        self.assertEqual(run(), run())
+
+
+if __name__ == "__main__":
+    unittest.main()
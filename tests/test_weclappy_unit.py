@@ -1,7 +1,17 @@
+import gzip
+import hashlib
+import io
+import json
+import os
+import tempfile
 import unittest
-from unittest.mock import patch, MagicMock
+import zipfile
+from unittest.mock import ANY, patch, MagicMock
 import requests
-from weclappy import Weclapp, WeclappResponse, WeclappAPIError
+from weclappy import (
+    Weclapp, WeclappResponse, WeclappAPIError, ArticleImageCache, MetricsRegistry, Span, Tracer,
+    ChromeTraceProfiler, RecordingTransport, ReplayTransport,
+)
 
 
 class TestWeclappUnit(unittest.TestCase):
@@ -417,13 +427,14 @@ class TestWeclappUnit(unittest.TestCase):
         data = {"name": "New Article", "articleNumber": "A123"}
         result = self.weclapp.post("article", data)
 
-        # Verify the request
+        # Verify the request: the payload is sent pre-encoded by the JSON codec
         mock_request.assert_called_once_with(
             "POST",
             "https://test.weclapp.com/webapp/api/v1/article",
-            json=data,
+            data=ANY,
             timeout=120,
         )
+        self.assertEqual(json.loads(mock_request.call_args[1]["data"]), data)
 
         # Verify the result
         self.assertEqual(result["id"], "123")
@@ -447,10 +458,11 @@ class TestWeclappUnit(unittest.TestCase):
         mock_request.assert_called_once_with(
             "POST",
             "https://test.weclapp.com/webapp/api/v1/quotation",
-            json=data,
+            data=ANY,
             params={"dryRun": True},
             timeout=120,
         )
+        self.assertEqual(json.loads(mock_request.call_args[1]["data"]), data)
 
         # Verify the result
         self.assertEqual(result["id"], "123")
@@ -474,10 +486,11 @@ class TestWeclappUnit(unittest.TestCase):
         mock_request.assert_called_once_with(
             "PUT",
             "https://test.weclapp.com/webapp/api/v1/article/id/123",
-            json=data,
+            data=ANY,
             params={"ignoreMissingProperties": True},
             timeout=120,
         )
+        self.assertEqual(json.loads(mock_request.call_args[1]["data"]), data)
 
         # Verify the result
         self.assertEqual(result["id"], "123")
@@ -528,7 +541,6 @@ class TestWeclappUnit(unittest.TestCase):
         mock_request.assert_called_once_with(
             "GET",
             "https://test.weclapp.com/webapp/api/v1/salesInvoice/id/123/downloadLatestSalesInvoicePdf",
-            json=None,
             params=None,
             timeout=120,
         )
@@ -536,6 +548,113 @@ class TestWeclappUnit(unittest.TestCase):
         # Verify the result
         self.assertEqual(result["result"], "success")
 
+    @patch('weclappy.requests.Session.request')
+    def test_put_entity_sends_to_payload(self, mock_request):
+        """A WeclappEntity passed to put is serialized via to_payload()."""
+        from weclappy import WeclappEntity
+
+        mock_response = MagicMock()
+        mock_response.status_code = 200
+        mock_response.headers = {"Content-Type": "application/json"}
+        mock_response.json.return_value = {"id": "1"}
+        mock_request.return_value = mock_response
+
+        entity = WeclappEntity.from_row(
+            {"id": "1", "customAttributes": [{"attributeDefinitionId": "d", "internalName": "note", "stringValue": "a"}]},
+            additional_properties_for_row={"totalWeight": 3},
+        )
+        entity.note = "b"
+        self.weclapp.put("article", id="1", data=entity)
+
+        sent = json.loads(mock_request.call_args[1]["data"])
+        self.assertNotIn("note", sent)
+        self.assertNotIn("totalWeight", sent)
+        self.assertEqual(sent["customAttributes"][0]["stringValue"], "b")
+
+    @patch('weclappy.requests.Session.request')
+    def test_call_method_payload_uses_json_codec(self, mock_request):
+        """call_method serializes its payload with json_codec, like post and put."""
+        from weclappy import JsonCodec
+
+        mock_response = MagicMock()
+        mock_response.status_code = 200
+        mock_response.headers = {"Content-Type": "application/json"}
+        mock_response.json.return_value = {"result": "ok"}
+        mock_request.return_value = mock_response
+        codec = JsonCodec()
+        codec.dumps = MagicMock(return_value=b'{"amount": 1}')
+        weclapp = Weclapp(self.base_url, self.api_key, json_codec=codec)
+
+        weclapp.call_method("salesOrder", "createPrepaymentFinalInvoice", entity_id="1",
+                            method="POST", data={"amount": 1})
+
+        codec.dumps.assert_called_once_with({"amount": 1})
+        self.assertEqual(mock_request.call_args[1]["data"], b'{"amount": 1}')
+        self.assertNotIn("json", mock_request.call_args[1])
+
+    @patch('weclappy.requests.Session.request')
+    def test_none_payload_sends_no_body(self, mock_request):
+        """data=None sends no request body instead of the literal null."""
+        mock_response = MagicMock()
+        mock_response.status_code = 200
+        mock_response.headers = {"Content-Type": "application/json"}
+        mock_response.json.return_value = {"id": "1"}
+        mock_request.return_value = mock_response
+
+        self.weclapp.post("salesOrder/id/1/createSalesInvoice", data=None)
+        self.weclapp.put("article", id="1", data=None)
+        self.weclapp.call_method("salesOrder", "createSalesInvoice", entity_id="1", method="POST")
+
+        for call in mock_request.call_args_list:
+            self.assertNotIn("data", call[1])
+            self.assertNotIn("json", call[1])
+
+    @patch('weclappy.requests.Session.request')
+    def test_json_decoded_from_bytes_with_codec(self, mock_request):
+        """JSON bodies are decoded from response bytes by the configured codec."""
+        for codec_name in ("json", None):
+            weclapp = Weclapp(self.base_url, self.api_key, json_codec=codec_name)
+            response = requests.Response()
+            response.status_code = 200
+            response.headers["Content-Type"] = "application/json"
+            response._content = b'{"result": [{"id": "1", "name": "\\u00c4pfel"}]}'
+            mock_request.return_value = response
+
+            result = weclapp.get("article")
+            self.assertEqual(result[0].name, "\u00c4pfel")
+
+    @patch('weclappy.requests.Session.request')
+    def test_invalid_json_raises_api_error(self, mock_request):
+        response = requests.Response()
+        response.status_code = 200
+        response.headers["Content-Type"] = "application/json"
+        response._content = b'{"result": ['
+        mock_request.return_value = response
+
+        with self.assertRaises(WeclappAPIError):
+            self.weclapp.get("article")
+
+    @patch('weclappy.requests.Session.request')
+    def test_whitespace_body_returns_empty_dict(self, mock_request):
+        response = requests.Response()
+        response.status_code = 200
+        response.headers["Content-Type"] = "application/json"
+        response._content = b'  \n'
+        mock_request.return_value = response
+
+        self.assertEqual(self.weclapp.call_method("salesOrder", "noop"), {})
+
+    def test_json_codec_selection(self):
+        from weclappy import JsonCodec, get_json_codec
+
+        self.assertEqual(get_json_codec("json").name, "json")
+        self.assertIsInstance(get_json_codec(), JsonCodec)
+        with self.assertRaises(ValueError):
+            get_json_codec("yaml")
+
+        custom = JsonCodec()
+        self.assertIs(Weclapp(self.base_url, self.api_key, json_codec=custom).json_codec, custom)
+
     def test_weclapp_response_class(self):
         """Test the WeclappResponse class."""
         # Create a sample API response
@@ -1194,6 +1313,213 @@ class TestUploadMethod(unittest.TestCase):
         self.assertIn("image/png", warning_msg)
 
 
+class TestStreamingUpload(unittest.TestCase):
+    """Uploads from paths, file objects and buffers without reading into bytes."""
+
+    def setUp(self):
+        self.base_url = "https://test.weclapp.com/webapp/api/v1"
+        self.weclapp = Weclapp(self.base_url, "test_api_key")
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.path = os.path.join(self.tmp.name, "scan.pdf")
+        with open(self.path, "wb") as fh:
+            fh.write(b"%PDF-1.7 scanned pages")
+
+    @staticmethod
+    def _ok_response():
+        response = MagicMock()
+        response.status_code = 200
+        response.headers = {"Content-Type": "application/json"}
+        response.json.return_value = {"result": {"id": "doc1"}}
+        return response
+
+    @patch('weclappy.requests.Session.request')
+    def test_upload_from_path_streams_file(self, mock_request):
+        sent = {}
+
+        def capture(method, url, data=None, headers=None, **kwargs):
+            sent["closed_during_send"] = data.closed
+            sent["body"] = data.read()
+            sent["headers"] = headers
+            return self._ok_response()
+
+        mock_request.side_effect = capture
+        self.weclapp.upload("document", data=self.path, action="upload",
+                            params={"entityName": "salesOrder", "entityId": "1", "name": "Scan"})
+
+        self.assertFalse(sent["closed_during_send"])
+        self.assertEqual(sent["body"], b"%PDF-1.7 scanned pages")
+        self.assertEqual(sent["headers"]["Content-Type"], "application/pdf")
+        self.assertEqual(sent["headers"]["Content-Length"], "22")
+        self.assertTrue(mock_request.call_args[1]["data"].closed)
+
+    @patch('weclappy.requests.Session.request')
+    def test_upload_from_file_object_uses_remaining_length(self, mock_request):
+        mock_request.return_value = self._ok_response()
+        with open(self.path, "rb") as fh:
+            fh.seek(5)
+            self.weclapp.upload("document", data=fh, action="upload", filename="scan.pdf")
+            self.assertFalse(fh.closed)
+
+        headers = mock_request.call_args[1]["headers"]
+        self.assertEqual(headers["Content-Length"], "17")
+        self.assertIs(mock_request.call_args[1]["data"], fh)
+
+    @patch('weclappy.requests.Session.request')
+    def test_upload_from_memoryview_and_mmap(self, mock_request):
+        import mmap
+
+        mock_request.return_value = self._ok_response()
+        self.weclapp.upload("document", data=memoryview(b"image bytes"), action="upload", filename="a.png")
+        body = mock_request.call_args[1]["data"]
+        self.assertIsInstance(body, memoryview)
+        self.assertEqual(bytes(body), b"image bytes")
+        self.assertEqual(mock_request.call_args[1]["headers"]["Content-Length"], "11")
+
+        sent = {}
+
+        def capture(method, url, data=None, headers=None, **kwargs):
+            sent["body"] = bytes(data)
+            sent["length"] = headers["Content-Length"]
+            return self._ok_response()
+
+        mock_request.side_effect = capture
+        # Closing the mmap fails if the client still holds a view on it.
+        with open(self.path, "rb") as fh, mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            self.weclapp.upload("document", data=mapped, action="upload", filename="scan.pdf")
+        self.assertEqual(sent, {"body": b"%PDF-1.7 scanned pages", "length": "22"})
+
+    def test_streamed_upload_is_rewound_on_retry(self):
+        """A 503 triggers urllib3's retry; the file body is re-sent from its start position."""
+        from http.server import BaseHTTPRequestHandler, HTTPServer
+        import threading
+
+        bodies = []
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                bodies.append(self.rfile.read(int(self.headers["Content-Length"])))
+                status = 503 if len(bodies) == 1 else 200
+                payload = b'{"result": {"id": "doc1"}}'
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, *args):
+                pass
+
+        server = HTTPServer(("127.0.0.1", 0), Handler)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+
+        client = Weclapp(f"http://127.0.0.1:{server.server_port}/webapp/api/v1", "key")
+        with open(self.path, "rb") as fh:
+            fh.seek(9)
+            result = client.upload("document", data=fh, action="upload", filename="scan.pdf")
+
+        self.assertEqual(result, {"result": {"id": "doc1"}})
+        self.assertEqual(bodies, [b"scanned pages", b"scanned pages"])
+
+
+class TestUploadMany(unittest.TestCase):
+    """Parallel bulk uploads with hash-based deduplication."""
+
+    def setUp(self):
+        self.weclapp = Weclapp("https://test.weclapp.com/webapp/api/v1", "test_api_key")
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.path = os.path.join(self.tmp.name, "scan.pdf")
+        with open(self.path, "wb") as fh:
+            fh.write(b"%PDF-1.7 scanned pages")
+
+    @staticmethod
+    def _respond(method, url, data=None, headers=None, params=None, **kwargs):
+        response = MagicMock()
+        if url.endswith("/document") and method == "GET":
+            response.status_code = 200
+            response.headers = {"Content-Type": "application/json"}
+            response.json.return_value = {"result": [{"id": "d1", "name": "existing.png", "documentSize": 3}]}
+            return response
+        if params and params.get("entityId") == "broken":
+            response.status_code = 400
+            response.text = '{"error": "bad request"}'
+            response.raise_for_status.side_effect = requests.exceptions.HTTPError("400", response=response)
+            return response
+        response.status_code = 200
+        response.headers = {"Content-Type": "application/json"}
+        response.json.return_value = {"result": {"id": "new", "mediaType": headers["Content-Type"]}}
+        return response
+
+    @staticmethod
+    def _document(entity_id, data, name):
+        return {
+            "endpoint": "document",
+            "action": "upload",
+            "data": data,
+            "filename": name,
+            "params": {"entityName": "salesOrder", "entityId": entity_id, "name": name},
+        }
+
+    @patch('weclappy.requests.Session.request')
+    def test_uploads_in_order_and_skips_duplicates_in_batch(self, mock_request):
+        mock_request.side_effect = self._respond
+        items = [
+            self._document("1", self.path, "scan.pdf"),
+            self._document("1", b"%PDF-1.7 scanned pages", "copy.pdf"),  # same content and entity
+            self._document("2", self.path, "scan.pdf"),
+            self._document("broken", b"\x89PNG", "photo.png"),
+            {"endpoint": "article", "id": "a1", "action": "uploadArticleImage", "data": io.BytesIO(b"jpg")},
+        ]
+
+        results = self.weclapp.upload_many(items, max_workers=3)
+
+        self.assertEqual([r["status"] for r in results], ["uploaded", "skipped", "uploaded", "failed", "uploaded"])
+        self.assertEqual(results[0]["filename"], "scan.pdf")
+        self.assertEqual(results[0]["content_type"], "application/pdf")
+        self.assertEqual(results[0]["digest"], hashlib.sha256(b"%PDF-1.7 scanned pages").hexdigest())
+        self.assertEqual(results[0]["response"], {"result": {"id": "new", "mediaType": "application/pdf"}})
+        self.assertEqual(results[3]["content_type"], "image/png")
+        self.assertIn("400", results[3]["error"])
+        self.assertEqual(results[4]["size"], 3)
+        self.assertEqual(mock_request.call_count, 4)
+        # The file object was rewound after hashing, so the full body was sent.
+        article_call = [c for c in mock_request.call_args_list if "article" in c[0][1]][0]
+        self.assertEqual(article_call[1]["headers"]["Content-Length"], "3")
+
+    @patch('weclappy.requests.Session.request')
+    def test_index_skips_content_uploaded_in_previous_run(self, mock_request):
+        mock_request.side_effect = self._respond
+        index_path = os.path.join(self.tmp.name, "uploads.json")
+        items = [self._document("1", self.path, "scan.pdf")]
+
+        first = self.weclapp.upload_many(items, index_path=index_path)
+        second = self.weclapp.upload_many(items + [self._document("3", self.path, "scan.pdf")],
+                                          index_path=index_path)
+
+        self.assertEqual(first[0]["status"], "uploaded")
+        self.assertEqual([r["status"] for r in second], ["skipped", "uploaded"])
+        self.assertEqual(mock_request.call_count, 2)
+
+    @patch('weclappy.requests.Session.request')
+    def test_check_documents_skips_existing_name_and_size(self, mock_request):
+        mock_request.side_effect = self._respond
+        items = [
+            self._document("1", b"png", "existing.png"),
+            self._document("1", b"png2", "existing.png"),
+        ]
+
+        results = self.weclapp.upload_many(items, check_documents=True)
+
+        self.assertEqual([r["status"] for r in results], ["skipped", "uploaded"])
+        listing = mock_request.call_args_list[0]
+        self.assertEqual(listing[0][0], "GET")
+        self.assertEqual(listing[1]["params"]["entityId"], "1")
+
+
 class TestDownloadMethod(unittest.TestCase):
     """Unit tests for the Weclapp.download method."""
 
@@ -1280,6 +1606,568 @@ class TestDownloadMethod(unittest.TestCase):
         self.assertEqual(call_args[0][1], "https://test.weclapp.com/webapp/api/v1/someEndpoint/someAction")
 
 
+class TestStreamingDownload(unittest.TestCase):
+    """Streamed downloads: file targets, iterators, hashing and Range resume."""
+
+    def setUp(self):
+        self.base_url = "https://test.weclapp.com/webapp/api/v1"
+        self.weclapp = Weclapp(self.base_url, "test_api_key")
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+    @staticmethod
+    def _stream_response(chunks, status_code=200, content_type="application/pdf", fail_after=False):
+        response = MagicMock()
+        response.status_code = status_code
+        response.headers = {"Content-Type": content_type}
+
+        def iter_content(chunk_size=None):
+            for chunk in chunks:
+                yield chunk
+            if fail_after:
+                raise requests.exceptions.ChunkedEncodingError("connection broken")
+
+        response.iter_content.side_effect = iter_content
+        return response
+
+    @patch('weclappy.requests.Session.request')
+    def test_download_stream_to_path_is_atomic_and_hashed(self, mock_request):
+        mock_request.return_value = self._stream_response([b"PDF ", b"bytes"])
+        target = os.path.join(self.tmp.name, "sub", "invoice.pdf")
+
+        result = self.weclapp.download("document", id="doc1", stream_to=target, hash_algorithm="sha256")
+
+        self.assertTrue(mock_request.call_args[1]["stream"])
+        with open(target, "rb") as fh:
+            self.assertEqual(fh.read(), b"PDF bytes")
+        self.assertFalse(os.path.exists(target + ".part"))
+        self.assertEqual(result["size"], 9)
+        self.assertEqual(result["content_type"], "application/pdf")
+        self.assertEqual(result["digest"], hashlib.sha256(b"PDF bytes").hexdigest())
+        mock_request.return_value.close.assert_called_once()
+
+    @patch('weclappy.requests.Session.request')
+    def test_download_stream_to_file_object(self, mock_request):
+        mock_request.return_value = self._stream_response([b"a", b"", b"bc"])
+        buffer = io.BytesIO()
+
+        result = self.weclapp.download("salesInvoice", id="1", action="downloadLatestSalesInvoicePdf",
+                                       stream_to=buffer)
+
+        self.assertEqual(buffer.getvalue(), b"abc")
+        self.assertEqual(result["size"], 3)
+        self.assertNotIn("digest", result)
+
+    @patch('weclappy.requests.Session.request')
+    def test_iter_download_yields_chunks(self, mock_request):
+        mock_request.return_value = self._stream_response([b"one", b"two"])
+
+        chunks = list(self.weclapp.iter_download("document", id="doc1", chunk_size=3))
+
+        self.assertEqual(chunks, [b"one", b"two"])
+        self.assertEqual(mock_request.call_args[1]["stream"], True)
+        mock_request.return_value.close.assert_called_once()
+
+    @patch('weclappy.requests.Session.request')
+    def test_resume_existing_partial_file_with_range(self, mock_request):
+        target = os.path.join(self.tmp.name, "archive.zip")
+        with open(target + ".part", "wb") as fh:
+            fh.write(b"0123")
+        mock_request.return_value = self._stream_response([b"456789"], status_code=206)
+
+        result = self.weclapp.download("document", id="doc1", stream_to=target, resume=True,
+                                       hash_algorithm="sha256")
+
+        self.assertEqual(mock_request.call_args[1]["headers"], {"Range": "bytes=4-"})
+        with open(target, "rb") as fh:
+            self.assertEqual(fh.read(), b"0123456789")
+        self.assertTrue(result["resumed"])
+        self.assertEqual(result["digest"], hashlib.sha256(b"0123456789").hexdigest())
+
+    @patch('weclappy.requests.Session.request')
+    def test_resume_after_connection_breaks_mid_transfer(self, mock_request):
+        target = os.path.join(self.tmp.name, "big.pdf")
+        mock_request.side_effect = [
+            self._stream_response([b"first-"], fail_after=True),
+            self._stream_response([b"second"], status_code=206),
+        ]
+
+        result = self.weclapp.download("document", id="doc1", stream_to=target, resume=True)
+
+        self.assertEqual(mock_request.call_count, 2)
+        self.assertEqual(mock_request.call_args[1]["headers"], {"Range": "bytes=6-"})
+        with open(target, "rb") as fh:
+            self.assertEqual(fh.read(), b"first-second")
+        self.assertEqual(result["size"], 12)
+
+    @patch('weclappy.requests.Session.request')
+    def test_range_ignored_by_server_restarts_download(self, mock_request):
+        target = os.path.join(self.tmp.name, "doc.pdf")
+        with open(target + ".part", "wb") as fh:
+            fh.write(b"stale")
+        mock_request.return_value = self._stream_response([b"full body"], status_code=200)
+
+        result = self.weclapp.download("document", id="doc1", stream_to=target, resume=True)
+
+        with open(target, "rb") as fh:
+            self.assertEqual(fh.read(), b"full body")
+        self.assertFalse(result["resumed"])
+
+    @patch('weclappy.requests.Session.request')
+    def test_failed_download_without_resume_removes_partial(self, mock_request):
+        target = os.path.join(self.tmp.name, "doc.pdf")
+        mock_request.return_value = self._stream_response([b"partial"], fail_after=True)
+
+        with self.assertRaises(WeclappAPIError):
+            self.weclapp.download("document", id="doc1", stream_to=target)
+
+        self.assertFalse(os.path.exists(target))
+        self.assertFalse(os.path.exists(target + ".part"))
+
+
+class TestDownloadMany(unittest.TestCase):
+    """Parallel bulk downloads into a directory with a skip manifest."""
+
+    def setUp(self):
+        self.weclapp = Weclapp("https://test.weclapp.com/webapp/api/v1", "test_api_key")
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.bodies = {
+            "salesInvoice/id/1/downloadLatestSalesInvoicePdf": (b"invoice one", "application/pdf"),
+            "salesInvoice/id/2/downloadLatestSalesInvoicePdf": (b"invoice two", "application/pdf"),
+            "document/id/d9/download": (b"\x89PNG", "image/png"),
+        }
+
+    def _respond(self, method, url, **kwargs):
+        key = url.split("/v1/", 1)[1]
+        response = MagicMock()
+        if key not in self.bodies:
+            response.status_code = 404
+            response.text = '{"error": "not found"}'
+            response.raise_for_status.side_effect = requests.exceptions.HTTPError("404", response=response)
+            return response
+        body, content_type = self.bodies[key]
+        response.status_code = 200
+        response.headers = {"Content-Type": content_type}
+        response.iter_content.return_value = iter([body])
+        return response
+
+    @patch('weclappy.requests.Session.request')
+    def test_downloads_in_order_with_deterministic_names(self, mock_request):
+        mock_request.side_effect = self._respond
+        targets = [
+            ("salesInvoice", "1", "downloadLatestSalesInvoicePdf"),
+            {"endpoint": "document", "id": "d9"},
+            ("salesInvoice", "404", "downloadLatestSalesInvoicePdf"),
+            {"endpoint": "salesInvoice", "id": "2", "action": "downloadLatestSalesInvoicePdf",
+             "filename": "RE-2.pdf"},
+        ]
+
+        manifest = self.weclapp.download_many(targets, self.tmp.name, max_workers=3)
+
+        self.assertEqual([m["status"] for m in manifest], ["downloaded", "downloaded", "failed", "downloaded"])
+        self.assertEqual(
+            [m["filename"] for m in manifest],
+            ["salesInvoice_1_downloadLatestSalesInvoicePdf.pdf", "document_d9.png", None, "RE-2.pdf"],
+        )
+        with open(os.path.join(self.tmp.name, "RE-2.pdf"), "rb") as fh:
+            self.assertEqual(fh.read(), b"invoice two")
+        self.assertEqual(manifest[0]["digest"], hashlib.sha256(b"invoice one").hexdigest())
+        self.assertIn("404", manifest[2]["error"])
+        self.assertTrue(all(m["seconds"] >= 0 for m in manifest))
+        self.assertFalse([f for f in os.listdir(self.tmp.name) if f.endswith(".part")])
+
+    @unittest.skipIf(os.name == "nt", "POSIX file modes")
+    @patch('weclappy.requests.Session.request')
+    def test_downloaded_files_follow_umask(self, mock_request):
+        mock_request.side_effect = self._respond
+        previous = os.umask(0o022)
+        self.addCleanup(os.umask, previous)
+
+        self.weclapp.download_many([("document", "d9")], self.tmp.name)
+
+        for name in ("document_d9.png", ".weclappy-manifest.json"):
+            mode = os.stat(os.path.join(self.tmp.name, name)).st_mode & 0o777
+            self.assertEqual(mode, 0o644, name)
+
+    @patch('weclappy.requests.Session.request')
+    def test_second_run_skips_unchanged_files(self, mock_request):
+        mock_request.side_effect = self._respond
+        targets = [("salesInvoice", "1", "downloadLatestSalesInvoicePdf"), ("document", "d9")]
+        self.weclapp.download_many(targets, self.tmp.name)
+        self.assertEqual(mock_request.call_count, 2)
+
+        # Tamper with one file: it must be fetched again, the other skipped.
+        with open(os.path.join(self.tmp.name, "document_d9.png"), "wb") as fh:
+            fh.write(b"\x89PNX")
+        manifest = self.weclapp.download_many(targets, self.tmp.name)
+
+        self.assertEqual([m["status"] for m in manifest], ["skipped", "downloaded"])
+        self.assertEqual(mock_request.call_count, 3)
+        with open(os.path.join(self.tmp.name, "document_d9.png"), "rb") as fh:
+            self.assertEqual(fh.read(), b"\x89PNG")
+
+
+class TestDocumentMirror(unittest.TestCase):
+    """Content-addressed document mirror with incremental refresh."""
+
+    def setUp(self):
+        self.weclapp = Weclapp("https://test.weclapp.com/webapp/api/v1", "test_api_key")
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.listings = {
+            ("salesOrder", "1"): [
+                {"id": "d1", "version": "1", "lastModifiedDate": 100, "name": "agb.pdf", "mediaType": "application/pdf"},
+                {"id": "d2", "version": "1", "lastModifiedDate": 100, "name": "o1.pdf", "mediaType": "application/pdf"},
+            ],
+            ("salesOrder", "2"): [
+                {"id": "d3", "version": "1", "lastModifiedDate": 100, "name": "agb.pdf", "mediaType": "application/pdf"},
+            ],
+        }
+        self.contents = {"d1": b"terms", "d2": b"order one", "d3": b"terms"}
+        self.downloads = []
+
+    def _respond(self, method, url, params=None, **kwargs):
+        response = MagicMock()
+        response.status_code = 200
+        if url.endswith("/document"):
+            response.headers = {"Content-Type": "application/json"}
+            response.json.return_value = {
+                "result": self.listings[(params["entityName"], params["entityId"])]
+            }
+            return response
+        doc_id = url.split("/id/")[1].split("/")[0]
+        self.downloads.append(doc_id)
+        response.headers = {"Content-Type": "application/pdf"}
+        response.iter_content.return_value = iter([self.contents[doc_id]])
+        return response
+
+    @patch('weclappy.requests.Session.request')
+    def test_sync_stores_identical_content_once_and_indexes_entities(self, mock_request):
+        from weclappy import DocumentMirror
+
+        mock_request.side_effect = self._respond
+        mirror = DocumentMirror(self.weclapp, self.tmp.name, max_workers=2)
+        stats = mirror.sync([("salesOrder", "1"), ("salesOrder", "2")])
+
+        self.assertEqual(stats["downloaded"], 3)
+        self.assertEqual(stats["deduplicated"], 1)
+        self.assertEqual(mirror.path_for("d1"), mirror.path_for("d3"))
+        self.assertTrue(mirror.path_for("d1").endswith(hashlib.sha256(b"terms").hexdigest()))
+        docs = mirror.documents_for("salesOrder", "1")
+        self.assertEqual([d["id"] for d in docs], ["d1", "d2"])
+        with open(docs[1]["path"], "rb") as fh:
+            self.assertEqual(fh.read(), b"order one")
+        list_params = mock_request.call_args_list[0][1]["params"]
+        self.assertEqual(list_params["properties"], DocumentMirror.LIST_PROPERTIES)
+
+    @patch('weclappy.requests.Session.request')
+    def test_resync_downloads_only_changed_documents(self, mock_request):
+        from weclappy import DocumentMirror
+
+        mock_request.side_effect = self._respond
+        DocumentMirror(self.weclapp, self.tmp.name).sync([("salesOrder", "1"), ("salesOrder", "2")])
+        self.downloads.clear()
+
+        self.listings[("salesOrder", "1")][1].update(version="2", lastModifiedDate=200)
+        self.contents["d2"] = b"order one, revised"
+        self.listings[("salesOrder", "2")] = []
+        mirror = DocumentMirror(self.weclapp, self.tmp.name)
+        stats = mirror.sync([("salesOrder", "1"), ("salesOrder", "2")], prune=True)
+
+        self.assertEqual(self.downloads, ["d2"])
+        self.assertEqual(stats["unchanged"], 1)
+        self.assertEqual(stats["pruned"], 1)  # old "order one" blob
+        self.assertIsNone(mirror.path_for("d3"))
+        with open(mirror.path_for("d2"), "rb") as fh:
+            self.assertEqual(fh.read(), b"order one, revised")
+
+
+class TestDownloadZip(unittest.TestCase):
+    """Parallel downloads streamed into a single ZIP archive."""
+
+    def setUp(self):
+        self.weclapp = Weclapp("https://test.weclapp.com/webapp/api/v1", "test_api_key")
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.bodies = {
+            "salesInvoice/id/1/downloadLatestSalesInvoicePdf": (b"invoice one" * 1000, "application/pdf"),
+            "salesInvoice/id/2/downloadLatestSalesInvoicePdf": (b"invoice two", "application/pdf"),
+            "document/id/d9/download": (b"\x89PNG", "image/png"),
+        }
+
+    def _respond(self, method, url, **kwargs):
+        key = url.split("/v1/", 1)[1]
+        response = MagicMock()
+        if key not in self.bodies:
+            response.status_code = 404
+            response.text = '{"error": "not found"}'
+            response.raise_for_status.side_effect = requests.exceptions.HTTPError("404", response=response)
+            return response
+        body, content_type = self.bodies[key]
+        response.status_code = 200
+        response.headers = {"Content-Type": content_type}
+        response.iter_content.return_value = iter([body[:5], body[5:]])
+        return response
+
+    @patch('weclappy.requests.Session.request')
+    def test_writes_entries_in_input_order(self, mock_request):
+        mock_request.side_effect = self._respond
+        targets = [
+            ("salesInvoice", "1", "downloadLatestSalesInvoicePdf"),
+            ("salesInvoice", "404", "downloadLatestSalesInvoicePdf"),
+            {"endpoint": "document", "id": "d9"},
+            {"endpoint": "salesInvoice", "id": "2", "action": "downloadLatestSalesInvoicePdf",
+             "filename": "invoice.pdf"},
+            {"endpoint": "salesInvoice", "id": "2", "action": "downloadLatestSalesInvoicePdf",
+             "filename": "invoice.pdf"},
+        ]
+        path = os.path.join(self.tmp.name, "documents.zip")
+
+        results = self.weclapp.download_zip(targets, path, max_workers=3, max_in_flight=1, spool_size=16)
+
+        self.assertEqual([r["status"] for r in results], ["added", "failed", "added", "added", "added"])
+        self.assertIn("404", results[1]["error"])
+        expected = [
+            "salesInvoice_1_downloadLatestSalesInvoicePdf.pdf",
+            "document_d9.png",
+            "invoice.pdf",
+            "invoice (2).pdf",
+        ]
+        with zipfile.ZipFile(path) as archive:
+            self.assertEqual(archive.namelist(), expected)
+            self.assertEqual(archive.read(expected[0]), b"invoice one" * 1000)
+            self.assertEqual(archive.read("invoice (2).pdf"), b"invoice two")
+        self.assertEqual(results[0]["size"], 11000)
+        self.assertFalse(os.path.exists(path + ".part"))
+
+    @patch('weclappy.requests.Session.request')
+    def test_spool_disk_error_fails_only_that_entry(self, mock_request):
+        mock_request.side_effect = self._respond
+
+        class FullDiskSpool(tempfile.SpooledTemporaryFile):
+            def rollover(self):
+                raise OSError(28, "No space left on device")
+
+        targets = [("salesInvoice", "1", "downloadLatestSalesInvoicePdf"), ("document", "d9")]
+        path = os.path.join(self.tmp.name, "documents.zip")
+        with patch('weclappy.tempfile.SpooledTemporaryFile', FullDiskSpool):
+            results = self.weclapp.download_zip(targets, path, spool_size=16)
+
+        self.assertEqual([r["status"] for r in results], ["failed", "added"])
+        self.assertIn("No space left", results[0]["error"])
+        with zipfile.ZipFile(path) as archive:
+            self.assertEqual(archive.namelist(), ["document_d9.png"])
+
+    @patch('weclappy.requests.Session.request')
+    def test_writes_to_non_seekable_stream(self, mock_request):
+        mock_request.side_effect = self._respond
+
+        class Sink(io.RawIOBase):
+            def __init__(self):
+                self.data = bytearray()
+
+            def writable(self):
+                return True
+
+            def write(self, b):
+                self.data += b
+                return len(b)
+
+        sink = Sink()
+        results = self.weclapp.download_zip([("document", "d9")], sink)
+
+        self.assertEqual(results[0]["name"], "document_d9.png")
+        with zipfile.ZipFile(io.BytesIO(bytes(sink.data))) as archive:
+            self.assertEqual(archive.read("document_d9.png"), b"\x89PNG")
+
+
+class TestArticleImageCache(unittest.TestCase):
+    """Server-scaled article image variants cached on disk with LRU eviction."""
+
+    def setUp(self):
+        self.weclapp = Weclapp("https://test.weclapp.com/webapp/api/v1", "test_api_key")
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.versions = {"img1": "1", "img2": "1"}
+
+    def _respond(self, method, url, params=None, **kwargs):
+        response = MagicMock()
+        response.status_code = 200
+        response.headers = {"Content-Type": "image/jpeg"}
+        image_id = params["articleImageId"]
+        body = f"{image_id}:{self.versions[image_id]}:{params.get('scaleWidth')}x{params.get('scaleHeight')}"
+        response.iter_content.return_value = iter([body.encode()])
+        return response
+
+    def _articles(self):
+        return [{"id": "a1", "articleImages": [
+            {"id": image_id, "version": version} for image_id, version in self.versions.items()
+        ]}]
+
+    @patch('weclappy.requests.Session.request')
+    def test_get_requests_scaled_variant_once(self, mock_request):
+        mock_request.side_effect = self._respond
+        cache = ArticleImageCache(self.weclapp, self.tmp.name)
+
+        path = cache.get("a1", "img1", width=200, height=100, version="1")
+        again = ArticleImageCache(self.weclapp, self.tmp.name).get("a1", "img1", width=200, height=100, version="1")
+
+        self.assertEqual(path, again)
+        self.assertTrue(path.endswith(".jpg"))
+        with open(path, "rb") as fh:
+            self.assertEqual(fh.read(), b"img1:1:200x100")
+        self.assertEqual(mock_request.call_count, 1)
+        args, kwargs = mock_request.call_args
+        self.assertTrue(args[1].endswith("article/id/a1/downloadArticleImage"))
+        self.assertEqual(kwargs["params"], {"articleImageId": "img1", "scaleWidth": 200, "scaleHeight": 100})
+
+    @patch('weclappy.requests.Session.request')
+    def test_index_written_only_when_it_changes(self, mock_request):
+        mock_request.side_effect = self._respond
+        cache = ArticleImageCache(self.weclapp, self.tmp.name)
+
+        with patch.object(cache, '_write_index', wraps=cache._write_index) as write_index:
+            cache.get("a1", "img1", width=100, version="1")
+            for _ in range(5):
+                cache.get("a1", "img1", width=100, version="1")
+            cache.sync(self._articles(), [(100, None)])  # downloads img2 only
+            cache.sync(self._articles(), [(100, None)])
+
+        self.assertEqual(write_index.call_count, 2)
+        reloaded = ArticleImageCache(self.weclapp, self.tmp.name)
+        self.assertEqual(list(reloaded.entries), ["img1/100x", "img2/100x"])
+
+    @patch('weclappy.requests.Session.request')
+    def test_sync_downloads_only_changed_images(self, mock_request):
+        mock_request.side_effect = self._respond
+        cache = ArticleImageCache(self.weclapp, self.tmp.name)
+        sizes = [(200, 200), (800, None)]
+
+        first = cache.sync(self._articles(), sizes)
+        self.versions["img2"] = "2"
+        second = ArticleImageCache(self.weclapp, self.tmp.name).sync(self._articles(), sizes)
+
+        self.assertEqual((first["variants"], first["downloaded"], first["cached"]), (4, 4, 0))
+        self.assertEqual((second["downloaded"], second["cached"]), (2, 2))
+        self.assertEqual(mock_request.call_count, 6)
+        files = [f for _d, _s, names in os.walk(os.path.join(self.tmp.name, "variants")) for f in names]
+        self.assertEqual(len(files), 4)  # the old img2 variants were replaced
+
+    @patch('weclappy.requests.Session.request')
+    def test_least_recently_used_variants_are_evicted(self, mock_request):
+        mock_request.side_effect = self._respond
+        cache = ArticleImageCache(self.weclapp, self.tmp.name, max_entries=2)
+
+        first = cache.get("a1", "img1", width=100, version="1")
+        cache.get("a1", "img2", width=100, version="1")
+        cache.get("a1", "img1", width=100, version="1")  # img1 becomes most recent
+        cache.get("a1", "img1", width=300, version="1")
+
+        self.assertTrue(os.path.exists(first))
+        self.assertEqual(list(cache.entries), ["img1/100x", "img1/300x"])
+        self.assertEqual(cache.evicted, 1)
+        self.assertEqual(mock_request.call_count, 3)
+
+    @patch('weclappy.requests.Session.request')
+    def test_sync_survives_concurrent_eviction(self, mock_request):
+        mock_request.side_effect = self._respond
+        self.versions = {f"img{n}": "1" for n in range(200)}
+        cache = ArticleImageCache(self.weclapp, self.tmp.name, max_entries=1, max_workers=8)
+
+        stats = cache.sync(self._articles(), [(100, None), (200, None)])
+
+        self.assertEqual((stats["downloaded"], stats["failed"]), (400, []))
+        self.assertEqual(stats["bytes"], sum(len(f"img{n}:1:{w}xNone") for n in range(200) for w in (100, 200)))
+        self.assertEqual(len(cache.entries), 1)
+        self.assertTrue(os.path.exists(os.path.join(self.tmp.name, ArticleImageCache.INDEX_FILENAME)))
+
+
+class TestBandwidthLimit(unittest.TestCase):
+    """Shared bytes-per-second budget for streamed transfers, and transfer stats."""
+
+    @staticmethod
+    def _download_response(chunks):
+        response = MagicMock()
+        response.status_code = 200
+        response.headers = {"Content-Type": "application/pdf"}
+        response.iter_content.return_value = iter(chunks)
+        return response
+
+    @patch('weclappy.time.sleep')
+    @patch('weclappy.requests.Session.request')
+    def test_streamed_download_is_paced(self, mock_request, mock_sleep):
+        mock_request.return_value = self._download_response([b"x" * 10] * 3)
+        client = Weclapp("https://test.weclapp.com/webapp/api/v1", "key", bandwidth_limit=10)
+
+        chunks = list(client.iter_download("document", id="1"))
+
+        self.assertEqual(b"".join(chunks), b"x" * 30)
+        # The first 10 bytes are the one-second burst; the rest waits ~1s + ~2s.
+        waited = sum(call[0][0] for call in mock_sleep.call_args_list)
+        self.assertAlmostEqual(waited, 3.0, delta=0.05)
+        stats = client.transfer_stats()
+        self.assertEqual(stats["bandwidth_limit"], 10)
+        self.assertEqual((stats["download"]["transfers"], stats["download"]["bytes"]), (1, 30))
+        self.assertAlmostEqual(stats["download"]["throttled_seconds"], 3.0, delta=0.05)
+
+    @patch('weclappy.time.sleep')
+    @patch('weclappy.requests.Session.request')
+    def test_no_pacing_without_limit_but_stats_are_recorded(self, mock_request, mock_sleep):
+        mock_request.return_value = self._download_response([b"x" * 10] * 3)
+        client = Weclapp("https://test.weclapp.com/webapp/api/v1", "key")
+
+        client.download("document", id="1", stream_to=io.BytesIO())
+
+        mock_sleep.assert_not_called()
+        self.assertEqual(client.transfer_stats()["download"]["bytes"], 30)
+        self.assertEqual(client.transfer_stats()["upload"]["transfers"], 0)
+
+    def test_limit_can_be_changed_and_cleared(self):
+        client = Weclapp("https://test.weclapp.com/webapp/api/v1", "key", bandwidth_limit=1024)
+        client.set_bandwidth_limit(None)
+        self.assertIsNone(client._transfer_buckets["upload"])
+        with self.assertRaises(ValueError):
+            client.set_bandwidth_limit(-1)
+
+    @patch('weclappy.time.sleep')
+    def test_throttled_upload_is_rewound_on_retry(self, mock_sleep):
+        """A paced buffer body is sized by requests and rewound by urllib3 on retry."""
+        from http.server import BaseHTTPRequestHandler, HTTPServer
+        import threading
+
+        bodies = []
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                bodies.append(self.rfile.read(int(self.headers["Content-Length"])))
+                status = 503 if len(bodies) == 1 else 200
+                payload = b'{"result": {"id": "doc1"}}'
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, *args):
+                pass
+
+        server = HTTPServer(("127.0.0.1", 0), Handler)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+
+        client = Weclapp(f"http://127.0.0.1:{server.server_port}/webapp/api/v1", "key", bandwidth_limit=4096)
+        body = bytes(range(256)) * 64
+        result = client.upload("document", data=body, action="upload", filename="scan.pdf")
+
+        self.assertEqual(result, {"result": {"id": "doc1"}})
+        self.assertEqual(bodies, [body, body])
+        self.assertTrue(mock_sleep.called)
+        self.assertEqual(client.transfer_stats()["upload"]["bytes"], len(body))
+
+
 class TestRequestTimingLogging(unittest.TestCase):
     """Tests for HTTP request timing logging."""
 
@@ -1427,6 +2315,635 @@ class TestRequestTimingLogging(unittest.TestCase):
                     self.assertNotIn("token=", msg)
 
 
+class TestRequestMetrics(unittest.TestCase):
+    """Per-endpoint counters, latency histograms and the Prometheus exporter."""
+
+    def setUp(self):
+        self.base_url = "https://test.weclapp.com/webapp/api/v1"
+        self.weclapp = Weclapp(self.base_url, "test_api_key")
+
+    @staticmethod
+    def _json_response(status_code, payload):
+        response = MagicMock()
+        response.status_code = status_code
+        response.headers = {"Content-Type": "application/json"}
+        response.json.return_value = payload
+        if status_code >= 400:
+            response.text = json.dumps(payload)
+            response.raise_for_status.side_effect = requests.exceptions.HTTPError(
+                str(status_code), response=response
+            )
+        return response
+
+    @patch('weclappy.time.monotonic')
+    @patch('weclappy.requests.Session.request')
+    def test_stats_group_requests_by_endpoint_method_and_status(self, mock_request, mock_monotonic):
+        mock_monotonic.side_effect = [0.0, 0.040, 1.0, 1.300, 2.0, 2.020, 3.0, 3.010, 4.0, 4.080]
+        mock_request.side_effect = [
+            self._json_response(200, {"id": "1"}),
+            self._json_response(200, {"id": "2"}),
+            self._json_response(404, {"error": "not found"}),
+            self._json_response(200, {"result": 1}),
+            self._json_response(200, {"result": [{"id": "1"}]}),
+        ]
+
+        self.weclapp.put("salesOrder", id="1", data={})
+        self.weclapp.put("salesOrder", id="2", data={})
+        with self.assertRaises(WeclappAPIError):
+            self.weclapp.delete("salesOrder", id="3")
+        self.weclapp.get_all("salesOrder", threaded=True)
+
+        stats = self.weclapp.stats()
+        self.assertEqual((stats["requests"], stats["errors"]), (5, 1))
+        self.assertEqual(
+            sorted(stats["endpoints"]),
+            ["DELETE salesOrder/id/{id}", "GET salesOrder", "GET salesOrder/count", "PUT salesOrder/id/{id}"],
+        )
+        by_id = stats["endpoints"]["PUT salesOrder/id/{id}"]
+        self.assertEqual((by_id["requests"], by_id["status"]), (2, {"200": 2}))
+        self.assertTrue(25 <= by_id["latency_ms"]["p50"] <= 250)
+        self.assertTrue(250 <= by_id["latency_ms"]["p99"] <= 500)
+        self.assertAlmostEqual(by_id["latency_ms"]["mean"], 170.0)
+        self.assertEqual(stats["endpoints"]["DELETE salesOrder/id/{id}"]["status"], {"404": 1})
+        self.assertIn("download", stats["transfers"])
+
+    @patch('weclappy.requests.Session.request')
+    def test_bytes_retries_and_rate_limits_are_recorded(self, mock_request):
+        from urllib3.util.retry import RequestHistory
+        response = self._json_response(200, {"id": "1"})
+        response.raw.tell.return_value = 1234
+        response.raw.retries.history = (
+            RequestHistory("POST", "/salesOrder", None, 429, None),
+            RequestHistory("POST", "/salesOrder", None, 503, None),
+        )
+        response.request.headers = {"Content-Length": "17"}
+        mock_request.return_value = response
+
+        self.weclapp.post("salesOrder", data={"x": 1})
+
+        stats = self.weclapp.stats()
+        self.assertEqual(
+            (stats["bytes_in"], stats["bytes_out"], stats["retries"], stats["rate_limited"]),
+            (1234, 17, 2, 1),
+        )
+
+    def test_registry_can_be_shared_and_exported_to_prometheus(self):
+        registry = MetricsRegistry()
+        first = Weclapp(self.base_url, "key", metrics=registry)
+        second = Weclapp("https://other.weclapp.com/webapp/api/v1", "key", metrics=registry)
+        self.assertIs(first.metrics, second.metrics)
+
+        registry.observe("GET", "article", 200, 30.0, bytes_in=10)
+        registry.observe("GET", "article", 200, 3000.0, bytes_in=20)
+        registry.observe("GET", "article", None, 120000.0)
+        text = registry.to_prometheus()
+
+        self.assertIn("# TYPE weclappy_requests_total counter", text)
+        self.assertIn('weclappy_requests_total{method="GET",endpoint="article",status="200"} 2', text)
+        self.assertIn('weclappy_bytes_in_total{method="GET",endpoint="article",status="200"} 30', text)
+        self.assertIn(
+            'weclappy_request_duration_seconds_bucket{method="GET",endpoint="article",status="200",le="0.05"} 1',
+            text,
+        )
+        self.assertIn(
+            'weclappy_request_duration_seconds_bucket{method="GET",endpoint="article",status="200",le="+Inf"} 2',
+            text,
+        )
+        self.assertIn('weclappy_request_duration_seconds_count{method="GET",endpoint="article",status="error"} 1',
+                      text)
+        self.assertEqual(registry.snapshot()["errors"], 1)
+        registry.reset()
+        self.assertEqual(registry.snapshot()["requests"], 0)
+
+    def test_retried_429_is_counted_against_real_server(self):
+        from http.server import BaseHTTPRequestHandler, HTTPServer
+        import threading
+
+        calls = []
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                calls.append(self.path)
+                status = 429 if len(calls) == 1 else 200
+                payload = b'{"result": []}'
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, *args):
+                pass
+
+        server = HTTPServer(("127.0.0.1", 0), Handler)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+
+        client = Weclapp(f"http://127.0.0.1:{server.server_port}/webapp/api/v1", "key")
+        client.get("party")
+
+        stats = client.stats()["endpoints"]["GET party"]
+        self.assertEqual((stats["requests"], stats["retries"], stats["rate_limited"]), (1, 1, 1))
+        self.assertEqual(stats["bytes_in"], len(b'{"result": []}'))
+
+
+class RecordingTracer(Tracer):
+    """Test tracer that keeps every span with its parent and hook calls."""
+
+    class RecordedSpan(Span):
+        def __init__(self, name, parent, attributes):
+            self.name, self.parent, self.attributes = name, parent, dict(attributes or {})
+            self.errors, self.ended = [], False
+
+        def set_attribute(self, key, value):
+            self.attributes[key] = value
+
+        def record_error(self, error):
+            self.errors.append(error)
+
+        def end(self):
+            self.ended = True
+
+    def __init__(self):
+        import threading
+        self.spans = []
+        self.hooks = []
+        self._local = threading.local()
+
+    def start_span(self, name, parent=None, attributes=None):
+        if parent is None:
+            parent = getattr(self._local, "active", None)
+        span = self.RecordedSpan(name, parent, attributes)
+        self.spans.append(span)
+        return span
+
+    def activate(self, span):
+        from contextlib import contextmanager
+
+        @contextmanager
+        def active():
+            previous = getattr(self._local, "active", None)
+            self._local.active = span
+            try:
+                yield span
+            finally:
+                self._local.active = previous
+        return active()
+
+    def before_request(self, span, method, url, kwargs):
+        kwargs.setdefault("headers", {})["X-Trace"] = "t1"
+        self.hooks.append(("before", method))
+
+    def after_response(self, span, response):
+        span.set_attribute("http.status_code", response.status_code)
+        self.hooks.append(("after", response.status_code))
+
+    def on_error(self, span, error):
+        self.hooks.append(("error", type(error).__name__))
+
+
+class TestTracing(unittest.TestCase):
+    """Tracer hooks around requests and spans for get_all jobs."""
+
+    def setUp(self):
+        self.tracer = RecordingTracer()
+        self.weclapp = Weclapp("https://test.weclapp.com/webapp/api/v1", "test_api_key", tracer=self.tracer)
+
+    @staticmethod
+    def _json_response(payload):
+        response = MagicMock()
+        response.status_code = 200
+        response.headers = {"Content-Type": "application/json"}
+        response.json.return_value = payload
+        return response
+
+    @patch('weclappy.requests.Session.request')
+    def test_threaded_get_all_builds_span_tree(self, mock_request):
+        mock_request.side_effect = lambda method, url, **kwargs: (
+            self._json_response({"result": 2}) if url.endswith("/count")
+            else self._json_response({"result": [{"id": str(kwargs["params"]["page"])}]})
+        )
+
+        with patch('weclappy.DEFAULT_PAGE_SIZE', 1):
+            rows = self.weclapp.get_all("salesOrder", threaded=True)
+
+        self.assertEqual(len(rows), 2)
+        by_name = {}
+        for span in self.tracer.spans:
+            by_name.setdefault(span.name, []).append(span)
+        job = by_name["weclapp.get_all"][0]
+        self.assertEqual(job.attributes, {"entity": "salesOrder", "threaded": True})
+        self.assertEqual(sorted(p.attributes["page"] for p in by_name["weclapp.page"]), [1, 2])
+        self.assertTrue(all(p.parent is job for p in by_name["weclapp.page"]))
+        self.assertTrue(all(m.parent is job for m in by_name["weclapp.merge"]))
+        self.assertIs(by_name["weclapp.wrap"][0].parent, job)
+        requests_by_route = {}
+        for span in by_name["weclapp.request"]:
+            requests_by_route.setdefault(span.attributes["http.route"], []).append(span)
+        self.assertIs(requests_by_route["salesOrder/count"][0].parent, job)
+        self.assertEqual({r.parent.name for r in requests_by_route["salesOrder"]}, {"weclapp.page"})
+        self.assertTrue(all(span.ended for span in self.tracer.spans))
+        self.assertEqual(self.tracer.hooks.count(("after", 200)), 3)
+        self.assertEqual(mock_request.call_args[1]["headers"], {"X-Trace": "t1"})
+
+    @patch('weclappy.requests.Session.request')
+    def test_transport_error_calls_on_error_and_marks_job(self, mock_request):
+        mock_request.side_effect = requests.exceptions.ConnectionError("refused")
+
+        with self.assertRaises(WeclappAPIError):
+            self.weclapp.get_all("salesOrder")
+
+        self.assertEqual(self.tracer.hooks, [("before", "GET"), ("error", "ConnectionError")])
+        job = [span for span in self.tracer.spans if span.name == "weclapp.get_all"][0]
+        self.assertIsInstance(job.errors[0], WeclappAPIError)
+
+    @patch('weclappy.requests.Session.request')
+    def test_default_tracer_is_a_no_op(self, mock_request):
+        mock_request.return_value = self._json_response({"result": []})
+        client = Weclapp("https://test.weclapp.com/webapp/api/v1", "test_api_key")
+
+        self.assertEqual(client.get_all("salesOrder"), [])
+        self.assertIs(type(client.tracer), Tracer)
+        self.assertNotIn("headers", mock_request.call_args[1])
+
+    @patch('weclappy.requests.Session.request')
+    def test_open_telemetry_adapter_reports_nested_spans(self, mock_request):
+        try:
+            from opentelemetry.sdk.trace import TracerProvider
+            from opentelemetry.sdk.trace.export import SimpleSpanProcessor
+            from opentelemetry.sdk.trace.export.in_memory_span_exporter import InMemorySpanExporter
+        except ImportError:
+            self.skipTest("opentelemetry-sdk not installed")
+        from weclappy import OpenTelemetryTracer
+
+        exporter = InMemorySpanExporter()
+        provider = TracerProvider()
+        provider.add_span_processor(SimpleSpanProcessor(exporter))
+        mock_request.return_value = self._json_response({"result": [{"id": "1"}]})
+        client = Weclapp("https://test.weclapp.com/webapp/api/v1", "key",
+                         tracer=OpenTelemetryTracer(provider.get_tracer("test")))
+
+        with provider.get_tracer("test").start_as_current_span("nightly-export") as root:
+            client.get_all("salesOrder")
+
+        spans = {span.name: span for span in exporter.get_finished_spans()}
+        self.assertEqual(spans["weclapp.get_all"].parent.span_id, root.get_span_context().span_id)
+        self.assertEqual(spans["weclapp.request"].parent.span_id, spans["weclapp.page"].context.span_id)
+        self.assertEqual(spans["weclapp.request"].attributes["http.status_code"], 200)
+        self.assertEqual(spans["weclapp.request"].attributes["http.route"], "salesOrder")
+
+
+class TestChromeTraceProfiler(unittest.TestCase):
+    """Per-page phase timeline of get_all, exported as a Chrome trace."""
+
+    def setUp(self):
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+        import threading
+        from urllib.parse import parse_qs, urlparse
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                url = urlparse(self.path)
+                if url.path.endswith("/count"):
+                    payload = {"result": 3}
+                else:
+                    page = int(parse_qs(url.query)["page"][0])
+                    payload = {"result": [{"id": str(page)}]}
+                body = json.dumps(payload).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        self.weclapp = Weclapp(f"http://127.0.0.1:{server.server_port}/webapp/api/v1", "key")
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+    @patch('builtins.print')
+    def test_profile_writes_trace_and_summary(self, mock_print):
+        path = os.path.join(self.tmp.name, "trace.json")
+
+        with patch('weclappy.DEFAULT_PAGE_SIZE', 1), self.weclapp.profile(path) as profiler:
+            rows = self.weclapp.get_all("salesOrder", threaded=True, max_workers=2)
+
+        self.assertEqual(sorted(row.id for row in rows), ["1", "2", "3"])
+        self.assertIs(type(self.weclapp.tracer), Tracer)
+        summary = profiler.summary()
+        self.assertEqual((summary["pages"], summary["requests"]), (3, 4))
+        for phase in ChromeTraceProfiler.PHASES:
+            self.assertGreaterEqual(summary[phase], 0.0)
+        self.assertGreater(summary["network"], 0.0)
+        self.assertGreater(summary["wall"], 0.0)
+
+        with open(path, encoding="utf-8") as fh:
+            trace = json.load(fh)
+        names = [event["name"] for event in trace["traceEvents"]]
+        self.assertEqual(names.count("weclapp.page"), 3)
+        self.assertEqual(names.count("queue"), 3)
+        self.assertEqual(names.count("decode"), 4)
+        self.assertEqual(names.count("merge"), 3)
+        self.assertEqual(names.count("wrap"), 1)
+        self.assertTrue(all(event["ph"] == "X" and event["dur"] >= 0 for event in trace["traceEvents"]))
+        printed = mock_print.call_args[0][0]
+        self.assertIn("3 pages, 4 requests", printed)
+        self.assertIn("decode", printed)
+
+    def test_phases_are_ordered_within_a_request(self):
+        profiler = ChromeTraceProfiler()
+        self.weclapp.tracer = profiler
+        self.weclapp.get_all("salesOrder")
+
+        request = [span for span in profiler.spans if span.name == "weclapp.request"][0]
+        events = request.events
+        self.assertLessEqual(request.start_time, events["first_byte"])
+        self.assertLessEqual(events["first_byte"], events["body_read"])
+        self.assertLessEqual(events["body_read"], events["json_parsed"])
+        self.assertLessEqual(events["json_parsed"], request.end_time)
+        self.assertEqual(request.attributes["http.status_code"], 200)
+
+
+class TestConnectionPoolTelemetry(unittest.TestCase):
+    """Pool checkouts, reuse, churn and auto-sizing against a keep-alive server."""
+
+    def setUp(self):
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+        import threading
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                body = b'{"result": []}'
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_HEAD(self):
+                self.send_response(200)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+
+            def log_message(self, *args):
+                pass
+
+        server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        server.daemon_threads = True
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        self.base_url = f"http://127.0.0.1:{server.server_port}/webapp/api/v1"
+
+    def _client(self, **kwargs):
+        client = Weclapp(self.base_url, "key", **kwargs)
+        self.addCleanup(client.session.close)
+        return client
+
+    def test_sequential_requests_reuse_one_connection(self):
+        client = self._client()
+        for _ in range(3):
+            client.get("party")
+
+        pool = client.stats()["pool"]
+        self.assertEqual((pool["checkouts"], pool["connections_opened"], pool["connections_reused"]), (3, 1, 2))
+        self.assertEqual(pool["connections_discarded"], 0)
+        self.assertGreater(pool["connect_seconds"], 0)
+        self.assertEqual(pool["maxsize"], 100)
+        self.assertIn("weclappy_pool_connections_opened_total 1", client.metrics.to_prometheus())
+
+    @patch('weclappy.logger')
+    def test_undersized_pool_discards_connections_and_warns(self, mock_logger):
+        from concurrent.futures import ThreadPoolExecutor
+
+        client = self._client(pool_maxsize=1)
+        client._reserve_connections(4)
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            list(executor.map(lambda _: client.get("party"), range(12)))
+
+        pool = client.stats()["pool"]
+        self.assertEqual(pool["checkouts"], 12)
+        self.assertEqual(pool["connections_opened"] - pool["connections_discarded"], 1)
+        mock_logger.warning.assert_any_call(
+            "max_workers=4 exceeds pool_maxsize=1; connections beyond the pool size are discarded after each request"
+        )
+
+    def test_auto_pool_grows_and_keeps_idle_connections(self):
+        client = self._client(pool_maxsize="auto")
+        self.assertEqual(client.stats()["pool"]["maxsize"], 10)
+        client.get("party")
+
+        client._reserve_connections(25)
+        client.get("party")
+
+        pool = client.stats()["pool"]
+        self.assertEqual(pool["maxsize"], 25)
+        self.assertEqual((pool["connections_opened"], pool["connections_reused"]), (1, 1))
+        connection_pool = client.session.get_adapter(self.base_url).poolmanager.connection_from_url(self.base_url)
+        self.assertEqual(connection_pool.pool.maxsize, 25)
+
+    def test_auto_pool_replaces_pools_it_cannot_grow_in_place(self):
+        from weclappy import _InstrumentedPoolMixin
+
+        client = self._client(pool_maxsize="auto")
+        client.get("party")
+        adapter = client.session.get_adapter(self.base_url)
+        old_manager = adapter.poolmanager
+
+        with patch.object(_InstrumentedPoolMixin, "grow", return_value=False):
+            client._reserve_connections(25)
+        client.get("party")
+
+        self.assertIsNot(adapter.poolmanager, old_manager)
+        self.assertEqual(client.stats()["pool"]["maxsize"], 25)
+        connection_pool = adapter.poolmanager.connection_from_url(self.base_url)
+        self.assertEqual(connection_pool.pool.maxsize, 25)
+        self.assertIsNotNone(connection_pool.metrics)
+
+    def test_blocking_pool_records_wait_time(self):
+        from concurrent.futures import ThreadPoolExecutor
+
+        client = self._client(pool_maxsize=1, pool_block=True)
+        with ThreadPoolExecutor(max_workers=3) as executor:
+            list(executor.map(lambda _: client.get("party"), range(6)))
+
+        pool = client.stats()["pool"]
+        self.assertEqual((pool["connections_opened"], pool["connections_discarded"]), (1, 0))
+        self.assertGreaterEqual(pool["wait_seconds"], 0)
+
+    def test_warmup_opens_idle_connections_for_first_requests(self):
+        client = self._client(pool_maxsize=2)
+        client.warmup(connections=3).join()
+
+        pool = client.stats()["pool"]
+        self.assertEqual((pool["connections_opened"], pool["connections_reused"]), (2, 0))
+        client.get("party")
+        pool = client.stats()["pool"]
+        self.assertEqual((pool["connections_opened"], pool["connections_reused"]), (2, 1))
+
+    def test_warmup_without_pool_checkout_sends_head_request(self):
+        client = self._client(pool_maxsize=2)
+        with patch("weclappy._has_pool_checkout", return_value=False):
+            self.assertEqual(client._warm_connections(2), 1)
+
+        client.get("party")
+        pool = client.stats()["pool"]
+        self.assertEqual((pool["connections_opened"], pool["connections_reused"]), (1, 1))
+
+    @patch('weclappy.logger')
+    def test_warmup_failure_is_logged_not_raised(self, mock_logger):
+        client = Weclapp("http://127.0.0.1:1/webapp/api/v1", "key")
+        self.addCleanup(client.session.close)
+
+        self.assertEqual(client._warm_connections(2), 0)
+        mock_logger.debug.assert_called_once()
+
+
+class TestLazyImport(unittest.TestCase):
+    """requests and urllib3 are imported when the first client is created."""
+
+    def test_import_defers_requests_until_first_client(self):
+        import subprocess
+        import sys
+
+        code = (
+            "import sys, weclappy\n"
+            "print('requests' in sys.modules)\n"
+            "weclappy.Weclapp('http://127.0.0.1:1', 'key')\n"
+            "print('requests' in sys.modules, weclappy._InstrumentedHTTPAdapter.__module__)\n"
+        )
+        root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        output = subprocess.run(
+            [sys.executable, "-c", code], cwd=root, capture_output=True, text=True, check=True
+        ).stdout
+        self.assertEqual(output.split(), ["False", "True", "weclappy"])
+
+    def test_http_classes_are_defined_once(self):
+        import weclappy
+
+        first = Weclapp("http://127.0.0.1:1", "key")
+        second = Weclapp("http://127.0.0.1:1", "key")
+        self.addCleanup(first.session.close)
+        self.addCleanup(second.session.close)
+
+        self.assertTrue(weclappy._http_loaded)
+        self.assertIs(type(first._adapter), type(second._adapter))
+        self.assertIs(type(first._adapter), weclappy._InstrumentedHTTPAdapter)
+
+
+class TestRecordReplay(unittest.TestCase):
+    """Recording real responses to a cassette and replaying them offline."""
+
+    def setUp(self):
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+        import threading
+        from urllib.parse import parse_qs, urlparse
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                url = urlparse(self.path)
+                if url.path.endswith("/count"):
+                    payload = {"result": 3}
+                elif url.path.endswith("/downloadArticleImage"):
+                    self._send(b"\x89PNG" + b"x" * 5000, "image/png")
+                    return
+                else:
+                    page = int(parse_qs(url.query)["page"][0])
+                    payload = {"result": [{"id": str(page), "name": f"Article {page}"}]}
+                self._send(json.dumps(payload).encode(), "application/json")
+
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers["Content-Length"]))
+                self._send(json.dumps({"id": "new", "echo": json.loads(body)}).encode(), "application/json")
+
+            def _send(self, body, content_type):
+                self.send_response(200)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        self.base_url = f"http://127.0.0.1:{server.server_port}/webapp/api/v1"
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.cassette = os.path.join(self.tmp.name, "export.cassette.gz")
+
+    def record(self):
+        with RecordingTransport(self.cassette) as recorder:
+            client = Weclapp(self.base_url, "key", transport=recorder)
+            with patch('weclappy.DEFAULT_PAGE_SIZE', 1):
+                rows = client.get_all("article", threaded=True, max_workers=3)
+            created = client.post("article", {"name": "New"})
+            image = io.BytesIO()
+            client.download("article", id="1", action="downloadArticleImage", stream_to=image)
+        self.assertEqual(recorder.recorded, 6)
+        return rows, created, image.getvalue()
+
+    def test_replay_matches_recording_without_network(self):
+        rows, created, image = self.record()
+
+        replay = ReplayTransport(self.cassette, latency_scale=0)
+        self.assertEqual(len(replay), 6)
+        # Different host: nothing listens there, so any real request would fail.
+        client = Weclapp("http://127.0.0.1:9/webapp/api/v1", "key", transport=replay)
+        for _ in range(2):
+            with patch('weclappy.DEFAULT_PAGE_SIZE', 1):
+                replayed = client.get_all("article", threaded=True, max_workers=3)
+            self.assertEqual(sorted(replayed, key=lambda row: row.id), sorted(rows, key=lambda row: row.id))
+            self.assertEqual(client.post("article", {"name": "New"}), created)
+            image_copy = io.BytesIO()
+            client.download("article", id="1", action="downloadArticleImage", stream_to=image_copy)
+            self.assertEqual(image_copy.getvalue(), image)
+        self.assertEqual(replay.replayed, 12)
+        self.assertEqual(client.stats()["requests"], 12)
+        self.assertGreater(client.stats()["bytes_in"], 10000)
+
+    def test_unrecorded_request_raises_api_error(self):
+        self.record()
+        client = Weclapp(self.base_url, "key", transport=ReplayTransport(self.cassette, latency_scale=0))
+
+        with self.assertRaises(WeclappAPIError) as ctx:
+            client.post("article", {"name": "Other"})
+        self.assertIn("No recorded response for POST /webapp/api/v1/article", str(ctx.exception))
+
+    @patch('weclappy.time.sleep')
+    def test_latency_scale(self, mock_sleep):
+        self.record()
+        replay = ReplayTransport(self.cassette, latency_scale=0.5)
+        recorded = replay._interactions
+        client = Weclapp(self.base_url, "key", transport=replay)
+
+        client.post("article", {"name": "New"})
+
+        (post,) = [items[0] for key, items in recorded.items() if key.startswith("POST")]
+        mock_sleep.assert_called_once_with(post["elapsed_ms"] * 0.5 / 1000)
+
+    def test_rejects_other_files(self):
+        with open(self.cassette, "wb") as fh:
+            fh.write(gzip.compress(b'{"format": "something"}\n'))
+        with self.assertRaises(ValueError):
+            ReplayTransport(self.cassette)
+
+
 class TestWeclappEntity(unittest.TestCase):
     """Unit tests for the WeclappEntity dynamic model."""
 
@@ -1674,6 +3191,213 @@ class TestWeclappEntity(unittest.TestCase):
         cas_by_def = {ca["attributeDefinitionId"]: ca for ca in payload["customAttributes"]}
         self.assertEqual(cas_by_def["def-1"]["stringValue"], "T-2")
 
+    def test_custom_attribute_plan_uses_attribute_type_value_field(self):
+        """The compiled plan reads the typed-value field implied by attributeType;
+        a None there is not replaced by a stale value from another field."""
+        from weclappy import WeclappEntity
+
+        attr_defs = {
+            "def-1": {"id": "def-1", "attributeKey": "weight", "attributeType": "DECIMAL"},
+            "def-2": {"id": "def-2", "attributeKey": "color", "attributeType": "LIST"},
+            "def-3": {"id": "def-3", "attributeKey": "legacy", "attributeType": "UNKNOWN"},
+        }
+        entity = WeclappEntity.from_row(
+            {
+                "id": "x",
+                "customAttributes": [
+                    {"attributeDefinitionId": "def-1", "stringValue": None, "numberValue": "1.5"},
+                    # Cleared LIST value with a stale stringValue left behind.
+                    {"attributeDefinitionId": "def-2", "stringValue": "red", "selectedValueId": None},
+                    # Unknown type: scan every typed-value field.
+                    {"attributeDefinitionId": "def-3", "booleanValue": True},
+                ],
+            },
+            attribute_definitions=attr_defs,
+        )
+        self.assertEqual(entity.weight, "1.5")
+        self.assertIsNone(entity.color)
+        self.assertIs(entity.legacy, True)
+        self.assertEqual(entity._custom_attr_index["weight"][1], "numberValue")
+        self.assertEqual(entity._custom_attr_index["color"][1], "selectedValueId")
+        self.assertEqual(entity._custom_attr_index["legacy"][1], "booleanValue")
+
+    def test_from_row_sees_definitions_added_in_place(self):
+        from weclappy import WeclappEntity
+
+        definitions = {"def-1": {"id": "def-1", "attributeKey": "color", "attributeType": "STRING"}}
+        row = {"id": "1", "customAttributes": [{"attributeDefinitionId": "def-2", "stringValue": "v"}]}
+        self.assertNotIn("size", WeclappEntity.from_row(row, attribute_definitions=definitions))
+
+        definitions["def-2"] = {"id": "def-2", "attributeKey": "size", "attributeType": "STRING"}
+        self.assertEqual(WeclappEntity.from_row(row, attribute_definitions=definitions).size, "v")
+
+    def test_wrap_rows_compiles_attribute_plan_once(self):
+        """The client compiles one plan per definitions map and reuses it across pages."""
+        from weclappy import WeclappEntity
+
+        weclapp = Weclapp("https://test.weclapp.com/webapp/api/v1", "test_api_key")
+        weclapp._attribute_definitions_by_id = {
+            "def-1": {"id": "def-1", "attributeKey": "tracking_id", "attributeType": "STRING"},
+        }
+        rows = [
+            {"id": str(i), "customAttributes": [{"attributeDefinitionId": "def-1", "stringValue": f"T-{i}"}]}
+            for i in range(3)
+        ]
+        first = weclapp._wrap_rows(rows, None, None)
+        plan = weclapp._attribute_plan
+        second = weclapp._wrap_rows(rows, None, None)
+
+        self.assertIsNotNone(plan)
+        self.assertIs(weclapp._attribute_plan, plan)
+        self.assertEqual([e.tracking_id for e in first], ["T-0", "T-1", "T-2"])
+        self.assertEqual(second[2].tracking_id, "T-2")
+        self.assertIsInstance(second[0], WeclappEntity)
+
+
+class TestAttributeDefinitionCache(unittest.TestCase):
+    """customAttributeDefinition cache: single-flight, persistence, TTL and refresh."""
+
+    base_url = "https://test.weclapp.com/webapp/api/v1"
+
+    def _rows(self, def_id="def-1"):
+        return [{"id": "1", "customAttributes": [{"attributeDefinitionId": def_id, "stringValue": "v"}]}]
+
+    def _fake_send(self, definitions, calls):
+        def send(method, url, params=None, **kwargs):
+            calls.append((url, dict(params or {})))
+            if url.endswith("/count"):
+                return {"result": len(definitions)}
+            page, size = params["page"], params["pageSize"]
+            return {"result": definitions[(page - 1) * size:page * size]}
+        return send
+
+    def test_definitions_loaded_once_across_threads(self):
+        import threading
+        import time as time_module
+
+        weclapp = Weclapp(self.base_url, "key")
+        calls = []
+        send = self._fake_send([{"id": "def-1", "attributeKey": "color"}], calls)
+
+        def slow_send(*args, **kwargs):
+            time_module.sleep(0.05)
+            return send(*args, **kwargs)
+
+        weclapp._send_request = slow_send
+        results = []
+        threads = [
+            threading.Thread(target=lambda: results.append(weclapp._wrap_rows(self._rows(), None, None)))
+            for _ in range(5)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual([r[0].color for r in results], ["v"] * 5)
+
+    def test_named_attributes_never_load_definitions(self):
+        weclapp = Weclapp(self.base_url, "key")
+        weclapp._send_request = MagicMock(side_effect=AssertionError("no API call expected"))
+        rows = [
+            {"id": "1", "customAttributes": [{"attributeDefinitionId": "def-1", "internalName": "color",
+                                              "stringValue": "v"}]},
+            {"id": "2", "orderItems": [{"id": "i1"}]},
+        ]
+
+        entities = weclapp._wrap_rows(rows, None, None)
+
+        self.assertEqual(entities[0].color, "v")
+        self.assertIsNone(weclapp._attribute_definitions_by_id)
+
+    def test_cold_client_loads_definitions_once_for_unnamed_items(self):
+        weclapp = Weclapp(self.base_url, "key")
+        calls = []
+        weclapp._send_request = self._fake_send([{"id": "def-1", "attributeKey": "color"}], calls)
+
+        first = weclapp._wrap_rows(self._rows(), None, None)[0]
+        unknown = weclapp._wrap_rows(self._rows("def-2"), None, None)[0]
+
+        self.assertEqual(first.color, "v")
+        self.assertEqual(len(calls), 2)  # the cold load, then one refresh for def-2
+        self.assertNotIn("color", unknown)
+
+    def test_failed_definition_load_is_retried_on_next_read(self):
+        weclapp = Weclapp(self.base_url, "key")
+        calls = []
+        send = self._fake_send([{"id": "def-1", "attributeKey": "color"}], calls)
+        weclapp._send_request = MagicMock(side_effect=WeclappAPIError("unavailable"))
+
+        with self.assertLogs("weclappy", level="WARNING"):
+            failed = weclapp._wrap_rows(self._rows(), None, None)[0]
+        self.assertNotIn("color", failed)
+        self.assertIsNone(weclapp._attribute_definitions_by_id)
+
+        weclapp._send_request = send
+        self.assertEqual(weclapp._wrap_rows(self._rows(), None, None)[0].color, "v")
+        self.assertEqual(len(calls), 1)
+
+    def test_definition_pages_fetched_in_parallel_after_count(self):
+        weclapp = Weclapp(self.base_url, "key")
+        definitions = [{"id": f"def-{n}", "attributeKey": f"a{n}"} for n in range(5)]
+        calls = []
+        weclapp._send_request = self._fake_send(definitions, calls)
+
+        with patch('weclappy.DEFAULT_PAGE_SIZE', 2):
+            weclapp._wrap_rows(self._rows(), None, None)
+        cache = weclapp._attribute_definitions_by_id
+
+        self.assertEqual(len(cache), 5)
+        self.assertTrue(calls[1][0].endswith("customAttributeDefinition/count"))
+        self.assertEqual(sorted(c[1]["page"] for c in calls if "page" in c[1]), [1, 2, 3])
+
+    def test_definitions_persisted_per_tenant_for_warm_start(self):
+        import tempfile
+
+        with tempfile.TemporaryDirectory() as cache_dir:
+            cold = Weclapp(self.base_url, "key", attribute_definition_cache_dir=cache_dir)
+            cold._send_request = self._fake_send([{"id": "def-1", "attributeKey": "color"}], [])
+            cold._wrap_rows(self._rows(), None, None)
+
+            warm = Weclapp(self.base_url, "key", attribute_definition_cache_dir=cache_dir)
+            warm._send_request = MagicMock(side_effect=AssertionError("no API call expected"))
+            entity = warm._wrap_rows(self._rows(), None, None)[0]
+            self.assertEqual(entity.color, "v")
+
+            other_tenant = Weclapp("https://other.weclapp.com/webapp/api/v1", "key",
+                                   attribute_definition_cache_dir=cache_dir)
+            self.assertIsNone(other_tenant._read_persisted_attribute_definitions())
+
+    def test_expired_cache_is_refreshed(self):
+        weclapp = Weclapp(self.base_url, "key", attribute_definition_ttl=60)
+        calls = []
+        weclapp._send_request = self._fake_send([{"id": "def-1", "attributeKey": "color"}], calls)
+        weclapp._wrap_rows(self._rows(), None, None)
+        weclapp._wrap_rows(self._rows(), None, None)
+        self.assertEqual(len(calls), 1)
+
+        weclapp._attribute_definitions_loaded_at -= 61
+        weclapp._wrap_rows(self._rows(), None, None)
+        self.assertEqual(len(calls), 2)
+
+    def test_unknown_definition_id_triggers_single_refresh(self):
+        weclapp = Weclapp(self.base_url, "key")
+        definitions = [{"id": "def-1", "attributeKey": "color"}]
+        calls = []
+        weclapp._send_request = self._fake_send(definitions, calls)
+        weclapp._wrap_rows(self._rows(), None, None)
+
+        definitions.append({"id": "def-2", "attributeKey": "size"})
+        entity = weclapp._wrap_rows(self._rows("def-2"), None, None)[0]
+        self.assertEqual(entity.size, "v")
+        self.assertEqual(len(calls), 2)
+
+        # An id the API does not know either must not refresh on every page.
+        weclapp._wrap_rows(self._rows("def-404"), None, None)
+        weclapp._wrap_rows(self._rows("def-404"), None, None)
+        self.assertEqual(len(calls), 3)
+
 
 class TestWeclappEntityNested(unittest.TestCase):
     """Phase 5: recursive wrapping of nested entity values."""
@@ -1,20 +1,33 @@
+import base64
+import gzip
+import hashlib
 import json
 import math
 import logging
+import mmap
 import os
+import queue
+import re
+import shutil
+import tempfile
+import threading
 import time
+import zipfile
+from collections import OrderedDict, deque
+from contextlib import contextmanager
 from concurrent.futures import ThreadPoolExecutor, as_completed
-from typing import TYPE_CHECKING, Any, Dict, List, Optional, Union, overload
-from urllib.parse import urljoin, urlparse
+from typing import IO, TYPE_CHECKING, Any, Dict, Iterator, List, Optional, Union, overload
+from urllib.parse import parse_qsl, urlencode, urljoin, urlparse, urlsplit
 from dataclasses import dataclass
+from datetime import timedelta
 
-import requests
-from requests.adapters import HTTPAdapter
-from urllib3.util.retry import Retry
-
+# requests and urllib3 are imported by _load_http() when the first client
+# (or transport) is created; they are most of the import time.
 if TYPE_CHECKING:
     from typing import Literal
 
+    import requests
+
 logger = logging.getLogger(__name__)
 
 # MIME type mapping from file extensions
@@ -59,6 +72,13 @@ MIME_TYPES: Dict[str, str] = {
 }
 
 
+# Preferred file extension per MIME type (first extension listed above wins).
+EXTENSIONS_BY_MIME_TYPE: Dict[str, str] = {}
+for _ext, _mime in MIME_TYPES.items():
+    EXTENSIONS_BY_MIME_TYPE.setdefault(_mime, _ext)
+del _ext, _mime
+
+
 def infer_content_type(filename: Optional[str]) -> Optional[str]:
     """Infer MIME type from filename extension.
 
@@ -73,11 +93,146 @@ def infer_content_type(filename: Optional[str]) -> Optional[str]:
     ext = os.path.splitext(filename)[1].lower()
     return MIME_TYPES.get(ext)
 
+def _mkstemp(dir: str, prefix: str = '', suffix: str = '') -> tuple:
+    """Like ``tempfile.mkstemp``, but the file mode follows the umask as with ``open()``.
+
+    ``mkstemp`` creates files with mode 0600, and temp files here are renamed
+    into place as the final downloads, manifests and indexes, which other
+    users (e.g. a web server) may need to read.
+
+    :return: ``(fd, path)`` of the new file, opened for writing.
+    """
+    flags = os.O_WRONLY | os.O_CREAT | os.O_EXCL | getattr(os, 'O_BINARY', 0)
+    while True:
+        path = os.path.join(dir, f"{prefix}tmp{os.urandom(6).hex()}{suffix}")
+        try:
+            return os.open(path, flags, 0o666), path
+        except FileExistsError:
+            continue
+
+
+class JsonCodec:
+    """JSON encoder/decoder used for request and response bodies.
+
+    ``loads`` accepts the raw response bytes; ``dumps`` returns bytes ready to
+    send. The base class uses the standard library. Subclass it (or pass any
+    object with ``name``, ``loads`` and ``dumps``) to plug in another codec.
+    """
+
+    name = 'json'
+
+    def loads(self, data: Union[bytes, bytearray, memoryview]) -> Any:
+        return json.loads(data)
+
+    def dumps(self, obj: Any) -> bytes:
+        return json.dumps(obj).encode('utf-8')
+
+
+class _OrjsonCodec(JsonCodec):
+    name = 'orjson'
+
+    def __init__(self):
+        import orjson
+        self._orjson = orjson
+
+    def loads(self, data):
+        return self._orjson.loads(data)
+
+    def dumps(self, obj):
+        return self._orjson.dumps(obj, option=self._orjson.OPT_NON_STR_KEYS)
+
+
+class _MsgspecCodec(JsonCodec):
+    name = 'msgspec'
+
+    def __init__(self):
+        import msgspec
+        self._decoder = msgspec.json.Decoder()
+        self._encoder = msgspec.json.Encoder()
+
+    def loads(self, data):
+        return self._decoder.decode(data)
+
+    def dumps(self, obj):
+        return self._encoder.encode(obj)
+
+
+class _UjsonCodec(JsonCodec):
+    name = 'ujson'
+
+    def __init__(self):
+        import ujson
+        self._ujson = ujson
+
+    def loads(self, data):
+        return self._ujson.loads(data)
+
+    def dumps(self, obj):
+        return self._ujson.dumps(obj, ensure_ascii=False).encode('utf-8')
+
+
+# Preference order when no codec is requested explicitly.
+_JSON_CODECS = {
+    'orjson': _OrjsonCodec,
+    'msgspec': _MsgspecCodec,
+    'ujson': _UjsonCodec,
+    'json': JsonCodec,
+}
+
+
+def get_json_codec(name: Optional[str] = None) -> JsonCodec:
+    """Return a JSON codec by name, or the fastest installed one.
+
+    Args:
+        name: One of 'orjson', 'msgspec', 'ujson' or 'json'. If omitted, the
+            first importable codec in that order is used.
+
+    Returns:
+        A JsonCodec instance.
+
+    Raises:
+        ValueError: If the name is unknown.
+        ImportError: If the named codec is not installed.
+    """
+    if name is not None:
+        if name not in _JSON_CODECS:
+            raise ValueError(
+                f"Unknown JSON codec '{name}'. Choose one of: {', '.join(_JSON_CODECS)}"
+            )
+        return _JSON_CODECS[name]()
+    for codec_cls in _JSON_CODECS.values():
+        try:
+            return codec_cls()
+        except ImportError:
+            continue
+    return JsonCodec()
+
+
 DEFAULT_PAGE_SIZE = 1000
 DEFAULT_MAX_WORKERS = 10
 DEFAULT_REQUEST_TIMEOUT = 120  # seconds; weclapp may queue requests up to ~30s before 429
 DEFAULT_BACKOFF_FACTOR = 0.3  # exponential backoff between retries (seconds)
 SLOW_REQUEST_THRESHOLD_MS = 2000
+DEFAULT_CHUNK_SIZE = 256 * 1024  # bytes per read for streamed transfers
+DEFAULT_RESUME_ATTEMPTS = 3  # Range re-requests after a streamed download breaks off
+DOWNLOAD_MANIFEST_FILENAME = '.weclappy-manifest.json'
+DEFAULT_ZIP_SPOOL_SIZE = 8 * 1024 * 1024  # bytes kept in memory per pending ZIP entry
+
+# customAttributeDefinition.attributeType -> typed-value field populated on
+# entity-level customAttributes. Used to compile flattening plans.
+CUSTOM_ATTRIBUTE_TYPE_FIELDS: Dict[str, str] = {
+    'BOOLEAN': 'booleanValue',
+    'DATE': 'dateValue',
+    'DECIMAL': 'numberValue',
+    'INTEGER': 'numberValue',
+    'STRING': 'stringValue',
+    'LARGE_TEXT': 'stringValue',
+    'URL': 'stringValue',
+    'ENTITY': 'entityId',
+    'REFERENCE': 'entityId',
+    'LIST': 'selectedValueId',
+    'MULTISELECT_LIST': 'selectedValues',
+}
 
 class WeclappAPIError(Exception):
     """Custom exception for Weclapp API errors.
@@ -277,6 +432,983 @@ class WeclappResponse:
         )
 
 
+class _CustomAttributePlan:
+    """Precompiled customAttribute flattening plan for one definition set.
+
+    Maps ``attributeDefinitionId`` to ``(name, value_field)`` where ``name`` is
+    the definition's ``attributeKey`` (or ``internalName``) and ``value_field``
+    is the typed-value field implied by ``attributeType`` (``None`` if the type
+    is unknown). Entries are compiled on first lookup and memoized, so a plan
+    built once per client is shared by every row and nesting level of a page.
+    """
+
+    __slots__ = ('definitions', 'missing', '_compiled')
+
+    def __init__(self, attribute_definitions: Optional[Dict[str, Dict[str, Any]]]):
+        self.definitions = attribute_definitions if attribute_definitions is not None else {}
+        # Definition ids seen on unnamed items but absent from ``definitions``.
+        self.missing: set = set()
+        self._compiled: Dict[Any, Optional[tuple]] = {}
+
+    def lookup(self, attr_def_id: Any) -> Optional[tuple]:
+        """Return ``(name, value_field)`` for a definition id, or ``None``."""
+        if not self.definitions:
+            return None
+        compiled = self._compiled
+        try:
+            return compiled[attr_def_id]
+        except KeyError:
+            pass
+        entry = None
+        defn = self.definitions.get(attr_def_id)
+        if isinstance(defn, dict):
+            name = defn.get('attributeKey') or defn.get('internalName')
+            if name:
+                entry = (name, CUSTOM_ATTRIBUTE_TYPE_FIELDS.get(defn.get('attributeType')))
+        compiled[attr_def_id] = entry
+        return entry
+
+
+_EMPTY_ATTRIBUTE_PLAN = _CustomAttributePlan(None)
+_MISSING = object()
+
+
+class MetricsRegistry:
+    """Dependency-free, thread-safe request metrics.
+
+    Every request sent by a :class:`Weclapp` client is recorded per method,
+    endpoint and status: a request counter, a latency histogram, bytes sent
+    and received, urllib3 retries and 429 responses. Endpoints are relative
+    to the API base path with entity ids replaced by ``{id}``
+    (``salesOrder/id/{id}/createSalesInvoice``); failed requests without an
+    HTTP response have status ``'error'``.
+
+    Percentiles are estimated from the histogram buckets by linear
+    interpolation, so they are exact to within one bucket.
+
+    Connection pool counters (see :data:`POOL_COUNTERS`) are recorded by the
+    client's HTTP adapter and reported under 'pool'.
+    """
+
+    LATENCY_BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000, 60000)
+    POOL_COUNTERS = {
+        'checkouts': 'Connections taken from the pool for a request.',
+        'connections_reused': 'Checkouts that got an already connected socket.',
+        'connections_opened': 'New TCP (and TLS) connections.',
+        'connections_discarded': 'Connections closed because the pool was full.',
+        'connect_seconds': 'Time spent connecting, including TLS handshakes.',
+        'wait_seconds': 'Time spent waiting for a connection from the pool.',
+    }
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._series: Dict[tuple, Dict[str, Any]] = {}
+        self._pool: Dict[str, float] = dict.fromkeys(self.POOL_COUNTERS, 0)
+
+    def record_pool(self, **amounts: float) -> None:
+        """Add to connection pool counters, e.g. ``record_pool(checkouts=1)``."""
+        with self._lock:
+            for name, amount in amounts.items():
+                self._pool[name] += amount
+
+    def observe(
+        self,
+        method: str,
+        endpoint: str,
+        status: Union[int, str, None],
+        duration_ms: float,
+        bytes_in: int = 0,
+        bytes_out: int = 0,
+        retries: int = 0,
+        rate_limited: int = 0,
+    ) -> None:
+        """Record one request."""
+        key = (method, endpoint, 'error' if status is None else str(status))
+        bucket = self._bucket_index(duration_ms)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = {
+                    'requests': 0,
+                    'duration_ms': 0.0,
+                    'buckets': [0] * (len(self.LATENCY_BUCKETS_MS) + 1),
+                    'bytes_in': 0,
+                    'bytes_out': 0,
+                    'retries': 0,
+                    'rate_limited': 0,
+                }
+            series['requests'] += 1
+            series['duration_ms'] += duration_ms
+            series['buckets'][bucket] += 1
+            series['bytes_in'] += bytes_in
+            series['bytes_out'] += bytes_out
+            series['retries'] += retries
+            series['rate_limited'] += rate_limited
+
+    def reset(self) -> None:
+        with self._lock:
+            self._series.clear()
+            self._pool = dict.fromkeys(self.POOL_COUNTERS, 0)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Totals plus a per-endpoint breakdown.
+
+        :return: Dict with 'requests', 'errors' (status ``>= 400`` or no
+            response), 'retries', 'rate_limited', 'bytes_in', 'bytes_out',
+            'latency_ms' ('mean', 'p50', 'p95', 'p99') and 'endpoints', which
+            maps ``"METHOD endpoint"`` to the same fields plus 'status'
+            (counts by status), and 'pool' with the connection pool counters.
+        """
+        with self._lock:
+            series = {key: dict(value, buckets=list(value['buckets'])) for key, value in self._series.items()}
+            pool = dict(self._pool)
+        endpoints: Dict[str, Dict[str, Any]] = {}
+        for (method, endpoint, status), value in sorted(series.items()):
+            merged = endpoints.setdefault(f"{method} {endpoint}", self._empty_summary())
+            self._merge(merged, status, value)
+        total = self._empty_summary()
+        for (_method, _endpoint, status), value in series.items():
+            self._merge(total, status, value)
+        result = self._finish(total)
+        del result['status']
+        result['endpoints'] = {name: self._finish(summary) for name, summary in endpoints.items()}
+        result['pool'] = pool
+        return result
+
+    def to_prometheus(self, prefix: str = 'weclappy') -> str:
+        """Render the metrics in the Prometheus text exposition format."""
+        with self._lock:
+            series = sorted(
+                (key, dict(value, buckets=list(value['buckets']))) for key, value in self._series.items()
+            )
+            pool = dict(self._pool)
+        lines = []
+
+        def family(name: str, kind: str, help_text: str) -> str:
+            full = f"{prefix}_{name}"
+            lines.append(f"# HELP {full} {help_text}")
+            lines.append(f"# TYPE {full} {kind}")
+            return full
+
+        def labels(method: str, endpoint: str, status: str, **extra: str) -> str:
+            pairs = dict(method=method, endpoint=endpoint, status=status, **extra)
+            return ','.join(
+                '{}="{}"'.format(
+                    name, value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+                )
+                for name, value in pairs.items()
+            )
+
+        for field, help_text in (
+            ('requests', 'Requests sent to the weclapp API.'),
+            ('bytes_in', 'Response bytes received.'),
+            ('bytes_out', 'Request body bytes sent.'),
+            ('retries', 'Retries performed by urllib3.'),
+            ('rate_limited', 'HTTP 429 responses, including retried ones.'),
+        ):
+            name = family(f"{field}_total", 'counter', help_text)
+            for (method, endpoint, status), value in series:
+                lines.append(f"{name}{{{labels(method, endpoint, status)}}} {value[field]}")
+
+        name = family('request_duration_seconds', 'histogram', 'Request latency in seconds.')
+        for (method, endpoint, status), value in series:
+            cumulative = 0
+            bounds = [f"{bound / 1000:g}" for bound in self.LATENCY_BUCKETS_MS] + ['+Inf']
+            for bound, count in zip(bounds, value['buckets']):
+                cumulative += count
+                lines.append(f"{name}_bucket{{{labels(method, endpoint, status, le=bound)}}} {cumulative}")
+            lines.append(f"{name}_sum{{{labels(method, endpoint, status)}}} {value['duration_ms'] / 1000:g}")
+            lines.append(f"{name}_count{{{labels(method, endpoint, status)}}} {value['requests']}")
+
+        for field, help_text in self.POOL_COUNTERS.items():
+            name = family(f"pool_{field}_total", 'counter', help_text)
+            lines.append(f"{name} {pool[field]:g}")
+        return '\n'.join(lines) + '\n'
+
+    def _bucket_index(self, duration_ms: float) -> int:
+        for index, bound in enumerate(self.LATENCY_BUCKETS_MS):
+            if duration_ms <= bound:
+                return index
+        return len(self.LATENCY_BUCKETS_MS)
+
+    def _empty_summary(self) -> Dict[str, Any]:
+        return {
+            'requests': 0, 'errors': 0, 'retries': 0, 'rate_limited': 0,
+            'bytes_in': 0, 'bytes_out': 0, 'duration_ms': 0.0,
+            'buckets': [0] * (len(self.LATENCY_BUCKETS_MS) + 1), 'status': {},
+        }
+
+    @staticmethod
+    def _merge(summary: Dict[str, Any], status: str, value: Dict[str, Any]) -> None:
+        for field in ('requests', 'retries', 'rate_limited', 'bytes_in', 'bytes_out', 'duration_ms'):
+            summary[field] += value[field]
+        summary['buckets'] = [a + b for a, b in zip(summary['buckets'], value['buckets'])]
+        summary['status'][status] = summary['status'].get(status, 0) + value['requests']
+        if status == 'error' or int(status) >= 400:
+            summary['errors'] += value['requests']
+
+    def _finish(self, summary: Dict[str, Any]) -> Dict[str, Any]:
+        buckets = summary.pop('buckets')
+        duration_ms = summary.pop('duration_ms')
+        count = summary['requests']
+        summary['latency_ms'] = {
+            'mean': duration_ms / count if count else 0.0,
+            'p50': self._percentile(buckets, 0.50),
+            'p95': self._percentile(buckets, 0.95),
+            'p99': self._percentile(buckets, 0.99),
+        }
+        return summary
+
+    def _percentile(self, buckets: List[int], quantile: float) -> float:
+        total = sum(buckets)
+        if not total:
+            return 0.0
+        rank = quantile * total
+        seen = 0
+        for index, count in enumerate(buckets):
+            if count and seen + count >= rank:
+                lower = self.LATENCY_BUCKETS_MS[index - 1] if index else 0.0
+                if index == len(self.LATENCY_BUCKETS_MS):
+                    return float(lower)
+                upper = self.LATENCY_BUCKETS_MS[index]
+                return lower + (upper - lower) * (rank - seen) / count
+            seen += count
+        return float(self.LATENCY_BUCKETS_MS[-1])
+
+
+class Span:
+    """A traced operation. This base class is the no-op span.
+
+    Spans are returned by :meth:`Tracer.start_span` and are also context
+    managers; leaving the ``with`` block does not end them, :meth:`end` does.
+    """
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        pass
+
+    def add_event(self, name: str, timestamp: Optional[float] = None) -> None:
+        """Record a point in time; ``timestamp`` is a ``time.perf_counter()`` value."""
+
+    def record_error(self, error: BaseException) -> None:
+        pass
+
+    def end(self) -> None:
+        pass
+
+    def __enter__(self) -> 'Span':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        return None
+
+
+_NOOP_SPAN = Span()
+
+
+class Tracer:
+    """Tracing hooks called by :class:`Weclapp`. This base class is the no-op
+    default; subclass it and override what you need.
+
+    The client opens spans for its operations and for every HTTP request:
+
+    - ``weclapp.get_all`` (attributes ``entity``, ``threaded``), with children
+      ``weclapp.page`` (``page``), ``weclapp.merge`` (``page``) and
+      ``weclapp.wrap`` (``rows``);
+    - ``weclapp.request`` (``http.method``, ``http.route``) for every request,
+      a child of whichever span is active in the calling thread.
+
+    Threaded page spans get a ``queued`` event (when the page was submitted
+    to the pool). Buffered request spans get ``first_byte`` (headers
+    received), ``body_read`` and, for JSON bodies, ``json_parsed`` events.
+
+    Page spans of threaded ``get_all`` run on pool threads and get their
+    parent explicitly; everything else uses the thread's active span, set by
+    :meth:`activate`. Around each request the client calls
+    :meth:`before_request`, then :meth:`after_response` (any HTTP status) or
+    :meth:`on_error` (no response), then ends the span.
+    """
+
+    def start_span(
+        self, name: str, parent: Optional[Span] = None, attributes: Optional[Dict[str, Any]] = None
+    ) -> Span:
+        """Start a span; ``parent=None`` means the span active in this thread."""
+        return _NOOP_SPAN
+
+    def activate(self, span: Span):
+        """Context manager making ``span`` the active span of this thread."""
+        return span
+
+    def before_request(self, span: Span, method: str, url: str, kwargs: Dict[str, Any]) -> None:
+        """Called before sending; ``kwargs`` (headers, params, ...) may be modified."""
+
+    def after_response(self, span: Span, response) -> None:
+        """Called with the ``requests.Response`` of a request, whatever its status."""
+
+    def on_error(self, span: Span, error: BaseException) -> None:
+        """Called when a request failed without a response."""
+
+
+_NOOP_TRACER = Tracer()
+
+
+class OpenTelemetryTracer(Tracer):
+    """:class:`Tracer` adapter that reports spans to OpenTelemetry.
+
+    Requires ``opentelemetry-api`` (imported on construction only). Spans join
+    the application's current OpenTelemetry context, so weclapp calls show up
+    inside your own job traces.
+
+    Example::
+
+        client = Weclapp(base_url, api_key, tracer=OpenTelemetryTracer())
+    """
+
+    def __init__(self, tracer: Any = None) -> None:
+        """
+        :param tracer: An OpenTelemetry ``Tracer``; defaults to
+            ``trace.get_tracer("weclappy")``.
+        :raises ImportError: if ``opentelemetry-api`` is not installed.
+        """
+        try:
+            from opentelemetry import trace
+        except ImportError as exc:
+            raise ImportError(
+                "OpenTelemetryTracer requires opentelemetry-api: pip install opentelemetry-api"
+            ) from exc
+        self._trace = trace
+        self._tracer = tracer or trace.get_tracer("weclappy")
+        # perf_counter -> epoch nanoseconds, for event timestamps.
+        self._epoch_offset_ns = time.time_ns() - int(time.perf_counter() * 1e9)
+
+    def start_span(self, name, parent=None, attributes=None):
+        context = (
+            self._trace.set_span_in_context(parent.otel_span)
+            if isinstance(parent, _OpenTelemetrySpan) else None
+        )
+        attributes = {key: value for key, value in (attributes or {}).items() if value is not None}
+        return _OpenTelemetrySpan(self, self._tracer.start_span(name, context=context, attributes=attributes))
+
+    def activate(self, span):
+        if isinstance(span, _OpenTelemetrySpan):
+            return self._trace.use_span(span.otel_span, end_on_exit=False)
+        return span
+
+    def after_response(self, span, response):
+        span.set_attribute('http.status_code', response.status_code)
+        if response.status_code >= 400:
+            span.otel_span.set_status(self._trace.Status(self._trace.StatusCode.ERROR))
+
+    def on_error(self, span, error):
+        span.record_error(error)
+
+
+class _OpenTelemetrySpan(Span):
+    def __init__(self, owner: OpenTelemetryTracer, otel_span: Any) -> None:
+        self.owner = owner
+        self.otel_span = otel_span
+
+    def set_attribute(self, key, value):
+        if value is not None:
+            self.otel_span.set_attribute(key, value)
+
+    def add_event(self, name, timestamp=None):
+        if timestamp is None:
+            self.otel_span.add_event(name)
+        else:
+            self.otel_span.add_event(name, timestamp=self.owner._epoch_offset_ns + int(timestamp * 1e9))
+
+    def record_error(self, error):
+        self.otel_span.record_exception(error)
+        self.otel_span.set_status(self.owner._trace.Status(self.owner._trace.StatusCode.ERROR, str(error)))
+
+    def end(self):
+        self.otel_span.end()
+
+
+class ChromeTraceProfiler(Tracer):
+    """Opt-in :class:`Tracer` that records a timeline of ``get_all`` jobs.
+
+    Every span is recorded with its thread and timestamps. :meth:`write`
+    saves a Chrome trace (``chrome://tracing``, https://ui.perfetto.dev),
+    where request spans are split into their phases. :meth:`summary` adds up
+    the time per phase:
+
+    - ``queue``: threaded page waiting for a pool worker;
+    - ``network``: request sent until the response headers arrived;
+    - ``body``: reading the response body;
+    - ``decode``: JSON decoding;
+    - ``merge``: merging a page into the job result;
+    - ``wrap``: wrapping rows as ``WeclappEntity``.
+
+    Example::
+
+        with client.profile("export-trace.json") as profiler:
+            client.get_all("salesOrder", threaded=True)
+    """
+
+    PHASES = ('queue', 'network', 'body', 'decode', 'merge', 'wrap')
+
+    def __init__(self) -> None:
+        self.spans: List['_ProfiledSpan'] = []
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._origin = time.perf_counter()
+
+    def start_span(self, name, parent=None, attributes=None):
+        if parent is None:
+            parent = getattr(self._local, 'active', None)
+        span = _ProfiledSpan(name, parent, attributes)
+        with self._lock:
+            self.spans.append(span)
+        return span
+
+    @contextmanager
+    def activate(self, span):
+        previous = getattr(self._local, 'active', None)
+        self._local.active = span
+        try:
+            yield span
+        finally:
+            self._local.active = previous
+
+    def after_response(self, span, response):
+        span.set_attribute('http.status_code', response.status_code)
+
+    def on_error(self, span, error):
+        span.record_error(error)
+
+    def phases(self) -> List[tuple]:
+        """``(phase, thread_id, start, end, span)`` for every recorded phase."""
+        phases = []
+        for span in list(self.spans):
+            if span.end_time is None:
+                continue
+            events = span.events
+            if span.name == 'weclapp.page' and 'queued' in events:
+                phases.append(('queue', span.thread_id, events['queued'], span.start_time, span))
+            elif span.name == 'weclapp.request':
+                first_byte = events.get('first_byte')
+                body_read = events.get('body_read')
+                if body_read is None:
+                    phases.append(('network', span.thread_id, span.start_time, span.end_time, span))
+                    continue
+                first_byte = first_byte if first_byte is not None else body_read
+                phases.append(('network', span.thread_id, span.start_time, first_byte, span))
+                phases.append(('body', span.thread_id, first_byte, body_read, span))
+                if 'json_parsed' in events:
+                    phases.append(('decode', span.thread_id, body_read, events['json_parsed'], span))
+            elif span.name in ('weclapp.merge', 'weclapp.wrap'):
+                phases.append((span.name.split('.', 1)[1], span.thread_id, span.start_time, span.end_time, span))
+        return phases
+
+    def summary(self) -> Dict[str, Any]:
+        """Seconds per phase, plus 'requests', 'pages' and 'wall' (summed
+        duration of the recorded ``get_all`` jobs). Phases of parallel pages
+        overlap, so their sum can exceed the wall time."""
+        totals: Dict[str, Any] = {phase: 0.0 for phase in self.PHASES}
+        for phase, _thread_id, start, end, _span in self.phases():
+            totals[phase] += max(end - start, 0.0)
+        finished = [span for span in self.spans if span.end_time is not None]
+        totals['requests'] = sum(1 for span in finished if span.name == 'weclapp.request')
+        totals['pages'] = sum(1 for span in finished if span.name == 'weclapp.page')
+        totals['wall'] = sum(
+            span.end_time - span.start_time for span in finished if span.name == 'weclapp.get_all'
+        )
+        return totals
+
+    def format_summary(self) -> str:
+        """The :meth:`summary` as a small text table."""
+        totals = self.summary()
+        busy = sum(totals[phase] for phase in self.PHASES) or 1.0
+        lines = [
+            f"get_all wall time {totals['wall'] * 1000:.1f}ms, "
+            f"{totals['pages']} pages, {totals['requests']} requests",
+            f"{'phase':<8} {'total ms':>10} {'share':>6}",
+        ]
+        for phase in self.PHASES:
+            lines.append(f"{phase:<8} {totals[phase] * 1000:>10.1f} {totals[phase] / busy:>6.1%}")
+        return '\n'.join(lines)
+
+    def to_chrome_trace(self) -> Dict[str, Any]:
+        """Trace Event Format dict: one complete (``"X"``) event per span
+        and per request phase, on the thread that ran it."""
+        pid = os.getpid()
+        events = []
+
+        def micros(value: float) -> float:
+            return round((value - self._origin) * 1e6, 3)
+
+        for span in list(self.spans):
+            if span.end_time is None:
+                continue
+            args = {key: value for key, value in span.attributes.items() if value is not None}
+            if span.error is not None:
+                args['error'] = span.error
+            events.append({
+                'name': span.name, 'cat': 'weclappy', 'ph': 'X', 'pid': pid, 'tid': span.thread_id,
+                'ts': micros(span.start_time), 'dur': round((span.end_time - span.start_time) * 1e6, 3),
+                'args': args,
+            })
+        for phase, thread_id, start, end, span in self.phases():
+            events.append({
+                'name': phase, 'cat': 'phase', 'ph': 'X', 'pid': pid, 'tid': thread_id,
+                'ts': micros(start), 'dur': round(max(end - start, 0.0) * 1e6, 3),
+                'args': {key: span.attributes[key] for key in ('page', 'http.route') if key in span.attributes},
+            })
+        events.sort(key=lambda event: (event['tid'], event['ts']))
+        return {'traceEvents': events, 'displayTimeUnit': 'ms'}
+
+    def write(self, path: Union[str, 'os.PathLike[str]']) -> None:
+        """Write the Chrome trace JSON to ``path``."""
+        with open(path, 'w', encoding='utf-8') as fh:
+            json.dump(self.to_chrome_trace(), fh)
+
+
+class _ProfiledSpan(Span):
+    def __init__(self, name: str, parent: Optional[Span], attributes: Optional[Dict[str, Any]]) -> None:
+        self.name = name
+        self.parent = parent
+        self.attributes = dict(attributes or {})
+        self.thread_id = threading.get_ident()
+        self.start_time = time.perf_counter()
+        self.end_time: Optional[float] = None
+        self.events: Dict[str, float] = {}
+        self.error: Optional[str] = None
+
+    def set_attribute(self, key, value):
+        self.attributes[key] = value
+
+    def add_event(self, name, timestamp=None):
+        self.events[name] = time.perf_counter() if timestamp is None else timestamp
+
+    def record_error(self, error):
+        self.error = f"{type(error).__name__}: {error}"
+
+    def end(self):
+        self.end_time = time.perf_counter()
+
+
+class Transport:
+    """Sends the client's HTTP requests; the hook at the ``session.request`` boundary.
+
+    Every request the client makes (JSON calls, streamed transfers and the
+    threaded ``get_all`` count) goes through :meth:`request`. The default
+    sends it with the client's session. Subclass it to record, replay or
+    rewrite traffic, and pass the instance as ``Weclapp(transport=...)``.
+    """
+
+    def request(self, session: 'requests.Session', method: str, url: str, **kwargs: Any) -> 'requests.Response':
+        return session.request(method, url, **kwargs)
+
+
+_CASSETTE_FORMAT = 'weclappy-cassette'
+
+
+def _interaction_key(method: str, url: str, kwargs: Dict[str, Any]) -> str:
+    """``METHOD path?sorted-query body-digest``: matches a request independent of host and parameter order."""
+    _load_http()
+    prepared = requests.models.PreparedRequest()
+    prepared.prepare_url(url, kwargs.get('params'))
+    parts = urlsplit(prepared.url)
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+    body = kwargs.get('data')
+    if kwargs.get('json') is not None:
+        body = json.dumps(kwargs['json'], sort_keys=True)
+    if isinstance(body, str):
+        body = body.encode('utf-8')
+    # File-like and iterable bodies (uploads) are not hashed, so reading the
+    # key never consumes them.
+    digest = hashlib.sha256(body).hexdigest()[:16] if isinstance(body, (bytes, bytearray)) else '-'
+    return f"{method.upper()} {parts.path}?{query} {digest}"
+
+
+class RecordingTransport(Transport):
+    """Record responses to a gzip-compressed cassette for :class:`ReplayTransport`.
+
+    Each response body is read in full before it is returned (streamed
+    downloads included), then stored with its status, headers and the time
+    the request took. Interactions are appended as they complete; call
+    :meth:`close` (or use the transport as a context manager) to finish the
+    file. Failed requests (connection errors, timeouts) are not recorded.
+
+    :param path: Cassette file to create, e.g. ``'export.cassette.gz'``.
+    :param inner: Transport that sends the requests (default: the session).
+    """
+
+    def __init__(self, path: Union[str, 'os.PathLike[str]'], inner: Optional[Transport] = None) -> None:
+        self.path = path
+        self.inner = inner or Transport()
+        self.recorded = 0
+        self._lock = threading.Lock()
+        self._file = gzip.open(path, 'wt', encoding='utf-8')
+        self._file.write(json.dumps({'format': _CASSETTE_FORMAT, 'version': 1}) + '\n')
+
+    def request(self, session, method, url, **kwargs):
+        key = _interaction_key(method, url, kwargs)
+        start = time.perf_counter()
+        response = self.inner.request(session, method, url, **kwargs)
+        content = response.content
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        request_length = response.request.headers.get('Content-Length') if response.request is not None else None
+        line = json.dumps({
+            'key': key,
+            'url': url,
+            'status': response.status_code,
+            'reason': response.reason,
+            'headers': dict(response.headers),
+            'body': base64.b64encode(content or b'').decode('ascii'),
+            'request_length': int(request_length) if request_length and request_length.isdigit() else 0,
+            'elapsed_ms': round(elapsed_ms, 3),
+        })
+        with self._lock:
+            self._file.write(line + '\n')
+            self.recorded += 1
+        return response
+
+    def close(self) -> None:
+        with self._lock:
+            self._file.close()
+
+    def __enter__(self) -> 'RecordingTransport':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+class ReplayTransport(Transport):
+    """Answer requests from a cassette written by :class:`RecordingTransport`.
+
+    Requests are matched on method, path, query parameters (in any order)
+    and body, so the host may differ from the recording and threaded pages
+    can arrive in any order. Repeated identical requests get the recorded
+    responses in order and start over once they run out, so one cassette can
+    be replayed any number of times. A request with no recording raises
+    ``requests.exceptions.ConnectionError``, which the client reports as a
+    ``WeclappAPIError``.
+
+    :param path: Cassette file to read.
+    :param latency_scale: Multiplier for the recorded request durations:
+        ``1.0`` replays them as recorded, ``0.5`` at half, ``0`` without delay.
+    """
+
+    def __init__(self, path: Union[str, 'os.PathLike[str]'], latency_scale: float = 1.0) -> None:
+        if latency_scale < 0:
+            raise ValueError("latency_scale must not be negative")
+        _load_http()
+        self.path = path
+        self.latency_scale = latency_scale
+        self.replayed = 0
+        self._interactions: Dict[str, List[Dict[str, Any]]] = {}
+        self._cursors: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        with gzip.open(path, 'rt', encoding='utf-8') as fh:
+            header = json.loads(fh.readline() or '{}')
+            if header.get('format') != _CASSETTE_FORMAT:
+                raise ValueError(f"{path} is not a weclappy cassette")
+            for line in fh:
+                interaction = json.loads(line)
+                interaction['body'] = base64.b64decode(interaction['body'])
+                self._interactions.setdefault(interaction['key'], []).append(interaction)
+
+    def __len__(self) -> int:
+        return sum(len(interactions) for interactions in self._interactions.values())
+
+    def _match_key(self, method: str, url: str, kwargs: Dict[str, Any]) -> str:
+        """Key a request is looked up by; subclasses that match more loosely
+        also regroup ``_interactions`` by the same key."""
+        return _interaction_key(method, url, kwargs)
+
+    def request(self, session, method, url, **kwargs):
+        key = self._match_key(method, url, kwargs)
+        with self._lock:
+            candidates = self._interactions.get(key)
+            if not candidates:
+                raise requests.exceptions.ConnectionError(f"No recorded response for {key} in {self.path}")
+            position = self._cursors.get(key, 0)
+            self._cursors[key] = (position + 1) % len(candidates)
+            self.replayed += 1
+        interaction = candidates[position]
+        delay = interaction['elapsed_ms'] * self.latency_scale / 1000
+        if delay:
+            time.sleep(delay)
+
+        prepared = requests.models.PreparedRequest()
+        prepared.prepare_method(method)
+        prepared.prepare_url(url, kwargs.get('params'))
+        prepared.prepare_headers({'Content-Length': str(interaction['request_length'])})
+        response = requests.Response()
+        response.status_code = interaction['status']
+        response.reason = interaction['reason']
+        response.headers = requests.structures.CaseInsensitiveDict(interaction['headers'])
+        # The recorded body is already decoded; drop the wire encoding headers.
+        response.headers.pop('Content-Encoding', None)
+        response._content = interaction['body']
+        response._content_consumed = True
+        response.encoding = requests.utils.get_encoding_from_headers(response.headers)
+        response.url = prepared.url
+        response.request = prepared
+        response.elapsed = timedelta(seconds=delay)
+        return response
+
+
+class _TokenBucket:
+    """Thread-safe token bucket pacing transfers to ``rate`` bytes per second.
+
+    Callers reserve bytes up front and sleep off any debt outside the lock,
+    so concurrent transfers share the budget and queue fairly. Up to one
+    second of budget can be spent as a burst.
+    """
+
+    def __init__(self, rate: float) -> None:
+        if rate <= 0:
+            raise ValueError("bandwidth limit must be a positive number of bytes per second")
+        self.rate = float(rate)
+        self._tokens = self.rate
+        self._updated = time.perf_counter()
+        self._lock = threading.Lock()
+
+    def consume(self, amount: int) -> float:
+        """Take ``amount`` bytes from the budget; returns the seconds slept."""
+        with self._lock:
+            now = time.perf_counter()
+            self._tokens = min(self.rate, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= amount
+            delay = -self._tokens / self.rate if self._tokens < 0 else 0.0
+        if delay:
+            time.sleep(delay)
+        return delay
+
+
+class _ThrottledReader:
+    """Read-only file-like wrapper that paces an upload body through ``pace``.
+
+    Wraps a binary file object or a byte buffer. ``tell``/``seek`` are
+    supported so requests can size the body and urllib3 can rewind it for
+    retries.
+    """
+
+    def __init__(self, source: Any, pace) -> None:
+        self._pace = pace
+        if hasattr(source, 'read') and not isinstance(source, mmap.mmap):
+            self._file = source
+            self._view = None
+        else:
+            self._file = None
+            self._view = source if isinstance(source, memoryview) else memoryview(source)
+            self._position = 0
+
+    def read(self, size: int = -1) -> bytes:
+        if self._file is not None:
+            chunk = self._file.read(size)
+        else:
+            end = self._view.nbytes if size is None or size < 0 else self._position + size
+            chunk = bytes(self._view[self._position:end])
+            self._position += len(chunk)
+        if chunk:
+            self._pace(len(chunk))
+        return chunk
+
+    def tell(self) -> int:
+        return self._file.tell() if self._file is not None else self._position
+
+    def seek(self, offset: int, whence: int = os.SEEK_SET) -> int:
+        if self._file is not None:
+            return self._file.seek(offset, whence)
+        base = {os.SEEK_SET: 0, os.SEEK_CUR: self._position, os.SEEK_END: self._view.nbytes}[whence]
+        self._position = min(max(base + offset, 0), self._view.nbytes)
+        return self._position
+
+
+class _InstrumentedPoolMixin:
+    """Connection pool that records checkouts, reuse, discards and wait time."""
+
+    metrics: Optional[MetricsRegistry] = None
+
+    def _new_conn(self):
+        conn = super()._new_conn()
+        conn.weclappy_metrics = self.metrics
+        return conn
+
+    def _get_conn(self, timeout=None):
+        start = time.perf_counter()
+        conn = super()._get_conn(timeout)
+        if self.metrics is not None:
+            self.metrics.record_pool(
+                checkouts=1,
+                connections_reused=int(getattr(conn, 'sock', None) is not None),
+                wait_seconds=time.perf_counter() - start,
+            )
+        return conn
+
+    def _put_conn(self, conn) -> None:
+        pool = self.pool
+        if conn is not None and pool is not None and pool.full() and self.metrics is not None:
+            self.metrics.record_pool(connections_discarded=1)
+        super()._put_conn(conn)
+
+    def grow(self, maxsize: int) -> bool:
+        """Raise the pool size in place, keeping the idle connections.
+
+        urllib3 1.26 and 2.x keep idle connections and free slots in a
+        ``queue.LifoQueue`` at ``self.pool``. Returns ``False`` if this
+        urllib3 stores them differently, so the caller can replace the pool.
+        """
+        pool = getattr(self, 'pool', _MISSING)
+        if pool is None:
+            return True
+        if not isinstance(pool, queue.LifoQueue) or not isinstance(getattr(pool, 'queue', None), list):
+            return False
+        with pool.mutex:
+            extra = maxsize - pool.maxsize
+            if extra <= 0:
+                return True
+            pool.maxsize = maxsize
+            # Free slots go to the bottom of the LIFO queue, so idle
+            # connections are still handed out first.
+            pool.queue[:0] = [None] * extra
+            pool.not_empty.notify(extra)
+        return True
+
+
+def _has_pool_checkout(pool: Any) -> bool:
+    """Whether ``pool`` has urllib3's private ``_get_conn``/``_put_conn`` (1.26 and 2.x do)."""
+    return all(
+        any(name in vars(cls) for cls in type(pool).__mro__ if cls is not _InstrumentedPoolMixin)
+        for name in ('_get_conn', '_put_conn')
+    )
+
+
+class _InstrumentedConnectionMixin:
+    """Connection that records how often and how long it connects."""
+
+    weclappy_metrics: Optional[MetricsRegistry] = None
+
+    def connect(self) -> None:
+        start = time.perf_counter()
+        super().connect()
+        if self.weclappy_metrics is not None:
+            self.weclappy_metrics.record_pool(
+                connections_opened=1, connect_seconds=time.perf_counter() - start
+            )
+
+
+_HTTP_NAMES = frozenset({
+    'requests', 'Retry', '_InstrumentedHTTPConnection', '_InstrumentedHTTPSConnection',
+    '_InstrumentedHTTPConnectionPool', '_InstrumentedHTTPSConnectionPool',
+    '_InstrumentedPoolManager', '_InstrumentedHTTPAdapter',
+})
+_http_lock = threading.Lock()
+_http_loaded = False
+
+
+def _load_http() -> None:
+    """Import requests and urllib3 and define the instrumented adapter classes.
+
+    Runs once, on first use, so ``import weclappy`` stays cheap for code
+    that never sends a request. The names become module globals, also
+    reachable as ``weclappy.<name>`` before that through ``__getattr__``.
+    """
+    global _http_loaded, requests, Retry, _InstrumentedHTTPConnection, _InstrumentedHTTPSConnection
+    global _InstrumentedHTTPConnectionPool, _InstrumentedHTTPSConnectionPool
+    global _InstrumentedPoolManager, _InstrumentedHTTPAdapter
+    if _http_loaded:
+        return
+    with _http_lock:
+        if _http_loaded:
+            return
+        import requests
+        from requests.adapters import HTTPAdapter
+        from urllib3 import PoolManager
+        from urllib3.connection import HTTPConnection, HTTPSConnection
+        from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+        from urllib3.util.retry import Retry
+
+        class _InstrumentedHTTPConnection(_InstrumentedConnectionMixin, HTTPConnection):
+            pass
+
+        class _InstrumentedHTTPSConnection(_InstrumentedConnectionMixin, HTTPSConnection):
+            pass
+
+        class _InstrumentedHTTPConnectionPool(_InstrumentedPoolMixin, HTTPConnectionPool):
+            ConnectionCls = _InstrumentedHTTPConnection
+
+        class _InstrumentedHTTPSConnectionPool(_InstrumentedPoolMixin, HTTPSConnectionPool):
+            ConnectionCls = _InstrumentedHTTPSConnection
+
+        class _InstrumentedPoolManager(PoolManager):
+            def __init__(self, *args: Any, metrics: MetricsRegistry, **kwargs: Any) -> None:
+                super().__init__(*args, **kwargs)
+                self.metrics = metrics
+                # Grown size; kept out of connection_pool_kw, which is part of the pool key.
+                self.maxsize = kwargs.get('maxsize', 1)
+                self.pool_classes_by_scheme = {
+                    'http': _InstrumentedHTTPConnectionPool,
+                    'https': _InstrumentedHTTPSConnectionPool,
+                }
+
+            def _new_pool(self, scheme, host, port, request_context=None):
+                if request_context is None:
+                    request_context = self.connection_pool_kw
+                request_context = dict(request_context, maxsize=self.maxsize)
+                pool = super()._new_pool(scheme, host, port, request_context)
+                pool.metrics = self.metrics
+                return pool
+
+            def grow(self, maxsize: int) -> bool:
+                """Grow existing pools in place; ``False`` if any could not be grown."""
+                self.maxsize = maxsize
+                grown = True
+                for key in list(self.pools.keys()):
+                    pool = self.pools.get(key)
+                    if pool is not None and not pool.grow(maxsize):
+                        grown = False
+                return grown
+
+        class _InstrumentedHTTPAdapter(HTTPAdapter):
+            """``HTTPAdapter`` whose connection pools report to a ``MetricsRegistry``
+            and can be grown without dropping idle connections. Proxied requests use
+            requests' regular proxy pools and are not instrumented."""
+
+            def __init__(self, metrics: MetricsRegistry, **kwargs: Any) -> None:
+                self.metrics = metrics
+                super().__init__(**kwargs)
+
+            def init_poolmanager(self, connections, maxsize, block=False, **pool_kwargs):
+                self._pool_connections = connections
+                self._pool_maxsize = maxsize
+                self._pool_block = block
+                self.poolmanager = _InstrumentedPoolManager(
+                    num_pools=connections, maxsize=maxsize, block=block, metrics=self.metrics, **pool_kwargs
+                )
+
+            @property
+            def pool_maxsize(self) -> int:
+                return self._pool_maxsize
+
+            def grow(self, maxsize: int) -> None:
+                """Raise the per-host pool size for new and existing pools."""
+                if maxsize <= self._pool_maxsize:
+                    return
+                self._pool_maxsize = maxsize
+                if not self.poolmanager.grow(maxsize):
+                    # Start over with pools of the new size; the old pools
+                    # close their idle connections.
+                    old = self.poolmanager
+                    self.init_poolmanager(self._pool_connections, maxsize, block=self._pool_block)
+                    old.clear()
+
+        _http_loaded = True
+
+
+def __getattr__(name: str) -> Any:
+    if name in _HTTP_NAMES:
+        _load_http()
+        return globals()[name]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
 class WeclappEntity(dict):
     """A weclapp entity with attribute-style access.
 
@@ -348,7 +1480,9 @@ class WeclappEntity(dict):
         :param attribute_definitions: Map of ``attributeDefinitionId`` to the
             full definition dict (must contain ``attributeKey``). weclapp does
             not include ``internalName`` on entity-level customAttributes, so
-            this map is used to derive flattened field names.
+            this map is used to derive flattened field names. A precompiled
+            ``_CustomAttributePlan`` is accepted as well and is passed down to
+            nested values unchanged.
         """
         if isinstance(row, WeclappEntity):
             return row
@@ -358,17 +1492,18 @@ class WeclappEntity(dict):
                 "input row is too deeply nested or cyclic."
             )
 
+        plan = cls._attribute_plan(attribute_definitions)
         entity = cls(row)
         object.__setattr__(entity, '_original_keys', set(entity.keys()))
 
         if referenced_entities:
             object.__setattr__(entity, '_referenced_entities', referenced_entities)
-        if attribute_definitions:
-            object.__setattr__(entity, '_attribute_definitions', attribute_definitions)
+        if plan.definitions:
+            object.__setattr__(entity, '_attribute_definitions', plan.definitions)
 
         custom_attributes = entity.get('customAttributes')
         if isinstance(custom_attributes, list):
-            cls._flatten_custom_attributes(entity, custom_attributes, attribute_definitions)
+            cls._flatten_custom_attributes(entity, custom_attributes, plan)
 
         if additional_properties_for_row:
             cls._merge_additional_properties(entity, additional_properties_for_row)
@@ -376,24 +1511,37 @@ class WeclappEntity(dict):
         # Recursively wrap nested dict / list-of-dict values. The raw
         # customAttributes list is metadata (definitions + values), not entities,
         # so it stays untouched and is fully owned by the flatten/round-trip pass.
-        for key in list(entity.keys()):
-            if key == 'customAttributes':
+        for key, current in list(entity.items()):
+            if key == 'customAttributes' or not isinstance(current, (dict, list)):
                 continue
-            current = entity[key]
             wrapped = cls._wrap_nested_value(
-                current, referenced_entities, attribute_definitions, _depth + 1
+                current, referenced_entities, plan, _depth + 1
             )
             if wrapped is not current:
                 dict.__setitem__(entity, key, wrapped)
 
         return entity
 
+    @classmethod
+    def _attribute_plan(cls, attribute_definitions: Any) -> _CustomAttributePlan:
+        """Return a flattening plan for ``attribute_definitions``.
+
+        Plans are passed through unchanged. A raw definitions map gets a new
+        plan, shared by the row and its nested values; ``Weclapp`` passes the
+        plan it compiled once per definition set instead.
+        """
+        if isinstance(attribute_definitions, _CustomAttributePlan):
+            return attribute_definitions
+        if not attribute_definitions:
+            return _EMPTY_ATTRIBUTE_PLAN
+        return _CustomAttributePlan(attribute_definitions)
+
     @classmethod
     def _wrap_nested_value(
         cls,
         value: Any,
         referenced_entities: Optional[Dict[str, Dict[str, Any]]],
-        attribute_definitions: Optional[Dict[str, Dict[str, Any]]],
+        attribute_definitions: Any,
         depth: int,
     ) -> Any:
         """Wrap dicts (and dicts inside lists) as ``WeclappEntity``; pass scalars through."""
@@ -426,26 +1574,38 @@ class WeclappEntity(dict):
         cls,
         entity: 'WeclappEntity',
         custom_attributes: List[Any],
-        attribute_definitions: Optional[Dict[str, Dict[str, Any]]] = None,
+        attribute_definitions: Any = None,
     ) -> None:
+        plan = cls._attribute_plan(attribute_definitions)
+        compiled_entries = plan._compiled
+        lookup = plan.lookup
+        extract = cls._extract_custom_attribute_value
+        setitem = dict.__setitem__
         index = entity._custom_attr_index
+        unnamed = 0
         for position, item in enumerate(custom_attributes):
             if not isinstance(item, dict):
                 continue
+            attr_def_id = item.get('attributeDefinitionId')
+            compiled = compiled_entries.get(attr_def_id, _MISSING)
+            if compiled is _MISSING:
+                compiled = lookup(attr_def_id) if attr_def_id else None
             name = item.get('internalName')
             if not name:
-                attr_def_id = item.get('attributeDefinitionId')
-                if attr_def_id and attribute_definitions:
-                    defn = attribute_definitions.get(attr_def_id)
-                    if defn:
-                        name = defn.get('attributeKey') or defn.get('internalName')
-            if not name:
-                logger.debug(
-                    "customAttribute at position %d has no resolvable name; skipping flatten",
-                    position,
-                )
-                continue
-            value, value_field = cls._extract_custom_attribute_value(item)
+                if compiled is None:
+                    unnamed += 1
+                    if attr_def_id and plan is not _EMPTY_ATTRIBUTE_PLAN:
+                        plan.missing.add(attr_def_id)
+                    continue
+                name = compiled[0]
+            # The definition's attributeType names the value field; a None
+            # there is the value, even if a stale stringValue is left over.
+            # Only items with an unknown type scan every typed-value field.
+            value_field = compiled[1] if compiled is not None else None
+            if value_field is not None:
+                value = item.get(value_field)
+            else:
+                value, value_field = extract(item)
             if name in entity:
                 logger.warning(
                     "customAttribute name '%s' collides with existing field; "
@@ -453,8 +1613,13 @@ class WeclappEntity(dict):
                     name,
                 )
                 continue
-            dict.__setitem__(entity, name, value)
-            index[name] = (position, value_field, item.get('attributeDefinitionId'))
+            setitem(entity, name, value)
+            index[name] = (position, value_field, attr_def_id)
+        if unnamed:
+            logger.debug(
+                "%d customAttribute(s) have no resolvable name; skipping flatten",
+                unnamed,
+            )
 
     @classmethod
     def _extract_custom_attribute_value(cls, item: Dict[str, Any]):
@@ -597,8 +1762,16 @@ class Weclapp:
         base_url: str,
         api_key: str,
         pool_connections: int = 100,
-        pool_maxsize: int = 100,
-        slow_threshold_ms: int = SLOW_REQUEST_THRESHOLD_MS
+        pool_maxsize: Union[int, str] = 100,
+        slow_threshold_ms: int = SLOW_REQUEST_THRESHOLD_MS,
+        attribute_definition_cache_dir: Optional[str] = None,
+        attribute_definition_ttl: Optional[float] = None,
+        json_codec: Union[str, JsonCodec, None] = None,
+        bandwidth_limit: Optional[float] = None,
+        metrics: Optional[MetricsRegistry] = None,
+        tracer: Optional[Tracer] = None,
+        pool_block: bool = False,
+        transport: Optional[Transport] = None
     ) -> None:
         """
         Initialize the Weclapp client.
@@ -606,15 +1779,67 @@ class Weclapp:
         :param base_url: Base URL for the API, e.g. 'https://myorg.weclapp.com/webapp/api/v1/'.
         :param api_key: Authentication token / API key for the Weclapp instance.
         :param pool_connections: Total number of connection pools to maintain (default=100).
-        :param pool_maxsize: Maximum number of connections per pool (default=100).
+        :param pool_maxsize: Maximum number of connections per pool (default=100),
+            or ``'auto'`` to start at ``DEFAULT_MAX_WORKERS`` and grow to the
+            largest ``max_workers`` used by this client's parallel methods.
+        :param slow_threshold_ms: Requests at or above this duration log with ``[API_SLOW]``.
+        :param attribute_definition_cache_dir: Optional directory for persisting the
+            customAttributeDefinition cache per tenant, so new clients start warm.
+        :param attribute_definition_ttl: Optional max age in seconds of the
+            customAttributeDefinition cache. ``None`` keeps it for the client lifetime.
+        :param json_codec: JSON codec for request and response bodies: a name
+            ('orjson', 'msgspec', 'ujson', 'json') or a ``JsonCodec`` instance.
+            Defaults to the fastest installed codec.
+        :param bandwidth_limit: Optional bytes per second for streamed uploads
+            and downloads, per direction, shared by all threads using this
+            client. See :meth:`set_bandwidth_limit`.
+        :param metrics: Registry that records every request; pass one
+            ``MetricsRegistry`` to several clients to aggregate them. A new
+            registry is created by default.
+        :param tracer: Optional ``Tracer`` receiving spans for requests and
+            ``get_all`` jobs, e.g. ``OpenTelemetryTracer()``. Tracing is off
+            by default.
+        :param pool_block: Wait for a free pooled connection instead of opening
+            (and later discarding) an extra one when the pool is exhausted.
         """
         self.base_url = base_url.rstrip('/') + '/'
+        self._base_path = urlparse(self.base_url).path
+        self.metrics = metrics if metrics is not None else MetricsRegistry()
+        self.tracer = tracer if tracer is not None else _NOOP_TRACER
+        self.transport = transport
         self.slow_threshold_ms = slow_threshold_ms
+        self.json_codec = (
+            get_json_codec(json_codec)
+            if json_codec is None or isinstance(json_codec, str)
+            else json_codec
+        )
+        self.attribute_definition_cache_dir = attribute_definition_cache_dir
+        self.attribute_definition_ttl = attribute_definition_ttl
         # Lazy cache: {attributeDefinitionId: definition_dict}. Populated on
         # first wrapped read so customAttribute flattening can resolve
         # internalName via attributeDefinition.attributeKey (weclapp does not
         # ship internalName on entity-level customAttributes).
         self._attribute_definitions_by_id: Optional[Dict[str, Dict[str, Any]]] = None
+        self._attribute_definitions_loaded_at = 0.0
+        # time.monotonic() of the last failed fetch, so threads that queued
+        # behind it do not repeat it.
+        self._attribute_definitions_failed_at = float('-inf')
+        # Loads are single-flight: concurrent readers wait for one fetch.
+        self._attribute_definitions_lock = threading.Lock()
+        # Unknown definition ids that already triggered a refresh.
+        self._attribute_definition_misses: set = set()
+        # Flattening plan compiled from the cached definitions; rebuilt only
+        # when the definitions map itself is replaced.
+        self._attribute_plan: Optional[_CustomAttributePlan] = None
+        # Transfer pacing and totals per direction ('upload', 'download').
+        self._transfer_lock = threading.Lock()
+        self._transfer_buckets: Dict[str, Optional[_TokenBucket]] = {}
+        self._transfer_totals = {
+            direction: {'transfers': 0, 'bytes': 0, 'seconds': 0.0, 'throttled_seconds': 0.0}
+            for direction in ('upload', 'download')
+        }
+        self.set_bandwidth_limit(bandwidth_limit)
+        _load_http()
         self.session = requests.Session()
         self.session.headers.update({
             "Content-Type": "application/json",
@@ -629,16 +1854,202 @@ class Weclapp:
             allowed_methods=["HEAD", "GET", "OPTIONS", "POST", "PUT", "DELETE"],
         )
 
-        # Create an adapter with bigger pool size
-        adapter = HTTPAdapter(
+        # Create an adapter with bigger pool size; its pools report
+        # connection reuse, churn and wait time to self.metrics.
+        self.pool_autosize = pool_maxsize == 'auto'
+        self._pool_warned_for = 0
+        self._adapter = _InstrumentedHTTPAdapter(
+            self.metrics,
             max_retries=retry_strategy,
             pool_connections=pool_connections,
-            pool_maxsize=pool_maxsize,
+            pool_maxsize=DEFAULT_MAX_WORKERS if self.pool_autosize else pool_maxsize,
+            pool_block=pool_block,
         )
 
         # Mount the adapter
-        self.session.mount("http://", adapter)
-        self.session.mount("https://", adapter)
+        self.session.mount("http://", self._adapter)
+        self.session.mount("https://", self._adapter)
+
+    def _reserve_connections(self, workers: int) -> None:
+        """Make room in the connection pool for ``workers`` parallel requests.
+
+        With ``pool_maxsize='auto'`` the pool grows; otherwise a pool smaller
+        than ``workers`` is reported once, since the extra connections are
+        opened and discarded for every request.
+        """
+        if workers <= self._adapter.pool_maxsize:
+            return
+        if self.pool_autosize:
+            logger.debug(f"Growing connection pool to {workers} connections")
+            self._adapter.grow(workers)
+        elif workers > self._pool_warned_for:
+            self._pool_warned_for = workers
+            logger.warning(
+                f"max_workers={workers} exceeds pool_maxsize={self._adapter.pool_maxsize}; "
+                f"connections beyond the pool size are discarded after each request"
+            )
+
+    def warmup(self, connections: int = 1) -> threading.Thread:
+        """Open pooled connections to the API host in a background thread.
+
+        Resolves the host and completes the TCP (and TLS) handshake of up to
+        ``connections`` connections, then leaves them idle in the pool, so
+        the first requests skip that latency. Call it right after creating
+        the client, before other startup work. Requests sent meanwhile open
+        their own connection if none is ready yet. Failures are only logged
+        at debug level; the first request reports them as usual. Hosts
+        reached through a proxy are not warmed. The warmup's checkouts and
+        connects are counted in ``stats()['pool']``.
+
+        :param connections: Connections to open, at most the pool size.
+        :return: The started daemon thread; ``join()`` it to wait for the warmup.
+        """
+        thread = threading.Thread(
+            target=self._warm_connections, args=(connections,), name='weclappy-warmup', daemon=True
+        )
+        thread.start()
+        return thread
+
+    def _warm_connections(self, connections: int) -> int:
+        """Open up to ``connections`` idle pooled connections; return how many were opened."""
+        url = self.base_url
+        settings = self.session.merge_environment_settings(url, {}, None, None, None)
+        if requests.utils.select_proxy(url, settings['proxies']):
+            logger.debug(f"Not warming connections to {url}: requests go through a proxy")
+            return 0
+        adapter = self.session.get_adapter(url)
+        request = self.session.prepare_request(requests.Request('GET', url))
+        held = []
+        opened = 0
+        try:
+            # The same pool lookup as HTTPAdapter.send, so the request uses these connections.
+            if hasattr(adapter, 'get_connection_with_tls_context'):
+                pool = adapter.get_connection_with_tls_context(
+                    request, settings['verify'], settings['proxies'], settings['cert']
+                )
+            else:
+                pool = adapter.get_connection(url, settings['proxies'])
+            adapter.cert_verify(pool, url, settings['verify'], settings['cert'])
+            if not _has_pool_checkout(pool):
+                # Without urllib3's checkout API, warm one connection with a HEAD request.
+                self.session.request('HEAD', url, timeout=DEFAULT_REQUEST_TIMEOUT, allow_redirects=False).close()
+                return 1
+            for _ in range(min(connections, adapter._pool_maxsize)):
+                # Hold every connection until the end so each checkout opens a new one.
+                conn = pool._get_conn(timeout=1)
+                held.append(conn)
+                if getattr(conn, 'sock', None) is None:
+                    try:
+                        conn.connect()
+                    except Exception:
+                        conn.close()
+                        raise
+                    opened += 1
+        except Exception as e:
+            logger.debug(f"Connection warmup to {url} failed: {e}")
+        finally:
+            for conn in held:
+                pool._put_conn(conn)
+        return opened
+
+    @contextmanager
+    def profile(self, path: Union[str, 'os.PathLike[str]', None] = None, print_summary: bool = True):
+        """Record a :class:`ChromeTraceProfiler` timeline for the ``with`` body.
+
+        The profiler replaces :attr:`tracer` until the block exits, so only
+        use it while no other code traces this client. On exit the trace is
+        written to ``path`` (if given) and the phase summary is printed.
+
+        :param path: Optional Chrome trace / Perfetto JSON output file.
+        :param print_summary: Print :meth:`ChromeTraceProfiler.format_summary`.
+        :return: Context manager yielding the profiler.
+        """
+        profiler = ChromeTraceProfiler()
+        previous, self.tracer = self.tracer, profiler
+        try:
+            yield profiler
+        finally:
+            self.tracer = previous
+            if path is not None:
+                profiler.write(path)
+            if print_summary:
+                print(profiler.format_summary())
+
+    def stats(self) -> Dict[str, Any]:
+        """Request metrics of this client.
+
+        :return: :meth:`MetricsRegistry.snapshot` (totals, latency percentiles,
+            a per-endpoint breakdown and connection pool counters, plus the
+            current pool 'maxsize') and 'transfers' from :meth:`transfer_stats`.
+        """
+        stats = dict(self.metrics.snapshot(), transfers=self.transfer_stats())
+        stats['pool'] = dict(stats['pool'], maxsize=self._adapter.pool_maxsize)
+        return stats
+
+    def set_bandwidth_limit(self, bytes_per_second: Optional[float]) -> None:
+        """Set or clear the transfer budget for this client.
+
+        The budget applies separately to uploads and downloads and is shared
+        by every thread using the client (including :meth:`download_many`,
+        :meth:`upload_many`, :meth:`download_zip` and the mirrors). Streamed
+        download chunks and upload body reads are paced with a token bucket
+        that allows one second of burst. Buffered downloads
+        (:meth:`download` without ``stream_to``) are not paced.
+
+        :param bytes_per_second: Budget per direction, or ``None`` for no limit.
+        """
+        self.bandwidth_limit = bytes_per_second
+        self._transfer_buckets = {
+            direction: _TokenBucket(bytes_per_second) if bytes_per_second else None
+            for direction in ('upload', 'download')
+        }
+
+    def transfer_stats(self) -> Dict[str, Any]:
+        """Totals of upload and download transfers made by this client.
+
+        :return: Dict with 'bandwidth_limit' and, per direction ('upload',
+            'download'), 'transfers', 'bytes', 'seconds', 'bytes_per_second'
+            (average while transferring) and 'throttled_seconds' (time spent
+            waiting for the bandwidth budget).
+        """
+        with self._transfer_lock:
+            stats: Dict[str, Any] = {'bandwidth_limit': self.bandwidth_limit}
+            for direction, totals in self._transfer_totals.items():
+                seconds = totals['seconds']
+                stats[direction] = dict(
+                    totals, bytes_per_second=totals['bytes'] / seconds if seconds else 0.0
+                )
+            return stats
+
+    def _pace(self, direction: str, amount: int) -> None:
+        bucket = self._transfer_buckets.get(direction)
+        if bucket is not None:
+            waited = bucket.consume(amount)
+            if waited:
+                with self._transfer_lock:
+                    self._transfer_totals[direction]['throttled_seconds'] += waited
+
+    def _record_transfer(self, direction: str, amount: int, seconds: float) -> None:
+        with self._transfer_lock:
+            totals = self._transfer_totals[direction]
+            totals['transfers'] += 1
+            totals['bytes'] += amount
+            totals['seconds'] += seconds
+
+    def _iter_body(self, response, chunk_size: int) -> Iterator[bytes]:
+        """Yield the non-empty chunks of a streamed response, paced by the
+        download budget and counted in :meth:`transfer_stats`."""
+        start = time.perf_counter()
+        received = 0
+        try:
+            for chunk in response.iter_content(chunk_size=chunk_size):
+                if not chunk:
+                    continue
+                self._pace('download', len(chunk))
+                received += len(chunk)
+                yield chunk
+        finally:
+            self._record_transfer('download', received, time.perf_counter() - start)
 
     def _check_response(self, response):
         """Check if the response is valid and raise an exception if not.
@@ -662,6 +2073,34 @@ class Weclapp:
                 error_message = f"{error_message}\nResponse body: {response_text}"
             raise WeclappAPIError(error_message, response=response, response_text=response_text) from e
 
+    def _decode_json(self, response) -> Any:
+        """Decode a JSON body straight from the response bytes with ``json_codec``.
+
+        Falls back to ``response.json()`` when the body is not a bytes buffer.
+        Decode errors are raised as ``requests.exceptions.JSONDecodeError``
+        (a ``ValueError`` and ``RequestException``), matching ``response.json()``.
+        """
+        content = response.content
+        if not isinstance(content, (bytes, bytearray, memoryview)):
+            return response.json()
+        try:
+            return self.json_codec.loads(content)
+        except ValueError as exc:
+            raise requests.exceptions.JSONDecodeError(str(exc), '', 0) from exc
+
+    def _encode_json(self, data: Any) -> bytes:
+        """Serialize a request payload with ``json_codec``.
+
+        ``WeclappEntity`` values are converted with ``to_payload()`` first.
+        """
+        if isinstance(data, WeclappEntity):
+            data = data.to_payload()
+        return self.json_codec.dumps(data)
+
+    def _json_body(self, data: Any) -> Dict[str, Any]:
+        """Request kwargs for a JSON payload; ``None`` sends no body."""
+        return {} if data is None else {"data": self._encode_json(data)}
+
     def _send_request(self, method: str, url: str, **kwargs) -> Union[Dict[str, Any], bytes]:
         """
         Send an HTTP request and return parsed content.
@@ -679,23 +2118,34 @@ class Weclapp:
         """
         kwargs.setdefault("timeout", DEFAULT_REQUEST_TIMEOUT)
         path = urlparse(url).path
+        span = self._start_request_span(method, url, path, kwargs)
+        sent_at = time.perf_counter() if span is not _NOOP_SPAN else 0.0
         start = time.monotonic()
         status_code = None
         error = None
         try:
-            response = self.session.request(method, url, **kwargs)
+            response = self._session_request(method, url, **kwargs)
             status_code = response.status_code
+            if span is not _NOOP_SPAN:
+                self._mark_response_events(span, sent_at, response)
             self._check_response(response)
 
-            # If no content or 204 No Content, return an empty dict
-            if response.status_code == 204 or not response.content.strip():
+            # If no content or 204 No Content, return an empty dict. Only a
+            # body that starts with whitespace is stripped, to avoid copying
+            # every JSON page just to test for emptiness.
+            content = response.content
+            if response.status_code == 204 or not content or (
+                content[:1].isspace() and not content.strip()
+            ):
                 return {}
 
             content_type = response.headers.get("Content-Type", "")
 
             # Handle JSON content
             if "application/json" in content_type:
-                return response.json()
+                decoded = self._decode_json(response)
+                span.add_event('json_parsed')
+                return decoded
 
             # Handle binary downloads (PDF, images, archives, etc.)
             binary_prefixes = (
@@ -718,44 +2168,183 @@ class Weclapp:
 
             # Attempt JSON parse if not purely recognized, otherwise return text
             try:
-                return response.json()
+                return self._decode_json(response)
             except ValueError:
                 return {"content": response.text, "content_type": content_type}
 
         except requests.exceptions.RequestException as e:
             error = e
-            logger.error(f"HTTP {method} request failed for {url}: {e}")
-            # Use response.text if available for error details
-            response_text = None
-            response_obj = None
-            if hasattr(e, 'response') and e.response is not None:
-                response_obj = e.response
-                response_text = e.response.text
-            elif 'response' in locals() and response is not None:
-                response_obj = response
-                response_text = response.text
-            error_message = f"HTTP {method} request failed for {url}: {e}"
-            if response_text:
-                error_message = f"{error_message}\nResponse body: {response_text}"
-            raise WeclappAPIError(
-                error_message, response=response_obj, response_text=response_text
+            raise self._request_failed_error(
+                method, url, e, response if 'response' in locals() else None
             ) from e
         finally:
             duration_ms = (time.monotonic() - start) * 1000
-            if error is not None:
-                logger.warning(
-                    f"[API] Weclapp {method} {path} -> ERROR ({duration_ms:.0f}ms) "
-                    f"{type(error).__name__}: {error}"
-                )
-            elif status_code is not None:
-                if duration_ms >= self.slow_threshold_ms:
-                    logger.warning(
-                        f"[API_SLOW] Weclapp {method} {path} -> {status_code} ({duration_ms:.0f}ms)"
-                    )
-                else:
-                    logger.info(
-                        f"[API] Weclapp {method} {path} -> {status_code} ({duration_ms:.0f}ms)"
-                    )
+            self._record_request(
+                method, path, status_code, duration_ms, error,
+                response if 'response' in locals() else None, span,
+            )
+
+    def _request_failed_error(
+        self, method: str, url: str, exc: Exception, response=None
+    ) -> 'WeclappAPIError':
+        """Build the ``WeclappAPIError`` for a failed ``requests`` call and log it."""
+        logger.error(f"HTTP {method} request failed for {url}: {exc}")
+        # Use response.text if available for error details
+        response_text = None
+        response_obj = None
+        if getattr(exc, 'response', None) is not None:
+            response_obj = exc.response
+            response_text = exc.response.text
+        elif response is not None:
+            response_obj = response
+            response_text = response.text
+        error_message = f"HTTP {method} request failed for {url}: {exc}"
+        if response_text:
+            error_message = f"{error_message}\nResponse body: {response_text}"
+        return WeclappAPIError(error_message, response=response_obj, response_text=response_text)
+
+    def _record_request(
+        self,
+        method: str,
+        path: str,
+        status_code: Optional[int],
+        duration_ms: float,
+        error: Optional[BaseException] = None,
+        response=None,
+        span: Span = _NOOP_SPAN,
+    ) -> None:
+        """Emit the ``[API]`` / ``[API_SLOW]`` timing line for one request,
+        record it in :attr:`metrics` and finish its tracing span."""
+        self.metrics.observe(
+            method, self._endpoint_label(path), status_code, duration_ms,
+            *self._response_counters(response, status_code),
+        )
+        if span is not _NOOP_SPAN:
+            if error is not None:
+                self.tracer.on_error(span, error)
+            elif response is not None:
+                self.tracer.after_response(span, response)
+            span.end()
+        if error is not None:
+            logger.warning(
+                f"[API] Weclapp {method} {path} -> ERROR ({duration_ms:.0f}ms) "
+                f"{type(error).__name__}: {error}"
+            )
+        elif status_code is not None:
+            if duration_ms >= self.slow_threshold_ms:
+                logger.warning(
+                    f"[API_SLOW] Weclapp {method} {path} -> {status_code} ({duration_ms:.0f}ms)"
+                )
+            else:
+                logger.info(
+                    f"[API] Weclapp {method} {path} -> {status_code} ({duration_ms:.0f}ms)"
+                )
+
+    def _start_request_span(self, method: str, url: str, path: str, kwargs: Dict[str, Any]) -> Span:
+        """Open the ``weclapp.request`` span and run ``before_request``."""
+        if self.tracer is _NOOP_TRACER:
+            return _NOOP_SPAN
+        span = self.tracer.start_span('weclapp.request', None, {
+            'http.method': method,
+            'http.route': self._endpoint_label(path),
+        })
+        self.tracer.before_request(span, method, url, kwargs)
+        return span
+
+    @staticmethod
+    def _mark_response_events(span: Span, sent_at: float, response) -> None:
+        """Add ``first_byte`` (headers received, from ``response.elapsed``) and
+        ``body_read`` events to a request span."""
+        body_read = time.perf_counter()
+        elapsed = getattr(response, 'elapsed', None)
+        if isinstance(elapsed, timedelta):
+            span.add_event('first_byte', min(sent_at + elapsed.total_seconds(), body_read))
+        span.add_event('body_read', body_read)
+
+    @contextmanager
+    def _span(self, name: str, parent: Optional[Span] = None, **attributes: Any):
+        """Run the ``with`` body in an active span that records errors and ends on exit."""
+        span = self.tracer.start_span(name, parent, attributes)
+        with self.tracer.activate(span):
+            try:
+                yield span
+            except BaseException as exc:
+                span.record_error(exc)
+                raise
+            finally:
+                span.end()
+
+    def _endpoint_label(self, path: str) -> str:
+        """``/webapp/api/v1/salesOrder/id/42/download`` -> ``salesOrder/id/{id}/download``."""
+        if path.startswith(self._base_path):
+            path = path[len(self._base_path):]
+        parts = path.strip('/').split('/')
+        for index in range(1, len(parts)):
+            if parts[index - 1] == 'id':
+                parts[index] = '{id}'
+        return '/'.join(parts)
+
+    @staticmethod
+    def _response_counters(response, status_code: Optional[int]) -> tuple:
+        """``(bytes_in, bytes_out, retries, rate_limited)`` of a finished request.
+
+        Bytes in are read from the wire (before decompression); bytes out are
+        the request's ``Content-Length``. Retries and 429s come from the
+        urllib3 retry history of the final response.
+        """
+        if response is None:
+            return 0, 0, 0, 0
+        raw = getattr(response, 'raw', None)
+        bytes_in = getattr(raw, 'tell', lambda: None)()
+        if not isinstance(bytes_in, int):
+            content = getattr(response, '_content', None)
+            bytes_in = len(content) if isinstance(content, bytes) else 0
+        request = getattr(response, 'request', None)
+        length = request.headers.get('Content-Length') if request is not None else None
+        bytes_out = int(length) if isinstance(length, str) and length.isdigit() else 0
+        history = getattr(getattr(raw, 'retries', None), 'history', ())
+        if not isinstance(history, tuple):
+            history = ()
+        rate_limited = sum(1 for entry in history if entry.status == 429) + (status_code == 429)
+        return bytes_in, bytes_out, len(history), rate_limited
+
+    def _session_request(self, method: str, url: str, **kwargs) -> 'requests.Response':
+        """Send one request through ``transport``, or the session if none is set."""
+        if self.transport is None:
+            return self.session.request(method, url, **kwargs)
+        return self.transport.request(self.session, method, url, **kwargs)
+
+    @contextmanager
+    def _stream_request(self, method: str, url: str, **kwargs):
+        """Send a request with ``stream=True`` and yield the open response.
+
+        The body is not read up front; the caller iterates it inside the
+        ``with`` block. Non-2xx statuses and transport errors (also while the
+        body is being read) raise ``WeclappAPIError``. The ``[API]`` line is
+        logged once the transfer completes, so its duration covers the body.
+        """
+        kwargs.setdefault("timeout", DEFAULT_REQUEST_TIMEOUT)
+        path = urlparse(url).path
+        span = self._start_request_span(method, url, path, kwargs)
+        start = time.monotonic()
+        status_code = None
+        error = None
+        response = None
+        try:
+            try:
+                response = self._session_request(method, url, stream=True, **kwargs)
+                status_code = response.status_code
+                self._check_response(response)
+                yield response
+            except requests.exceptions.RequestException as e:
+                # A half-read streamed body can't be re-read for error details.
+                error = e
+                raise self._request_failed_error(method, url, e) from e
+        finally:
+            if response is not None:
+                response.close()
+            duration_ms = (time.monotonic() - start) * 1000
+            self._record_request(method, path, status_code, duration_ms, error, response, span)
 
     def _wrap_rows(
         self,
@@ -766,74 +2355,206 @@ class Weclapp:
         """Wrap raw result rows as WeclappEntity, slicing additionalProperties per row."""
         if not rows:
             return []
-        ap_global = additional_properties_global or {}
         ref_map = referenced_entities or {}
-        attr_defs = self._ensure_attribute_definitions(rows)
+        cache = self._ensure_attribute_definitions()
+        # A cold client wraps with an empty plan that only records the
+        # definition ids of unnamed items; definitions are loaded below if any.
+        cold = cache is None
+        plan = _CustomAttributePlan({}) if cold else self._attribute_plan_for(cache)
+        ap_columns = [
+            (name, values, len(values))
+            for name, values in (additional_properties_global or {}).items()
+            if isinstance(values, list)
+        ]
+        from_row = WeclappEntity.from_row
         wrapped: List[WeclappEntity] = []
+        append = wrapped.append
         for index, row in enumerate(rows):
-            per_row: Dict[str, Any] = {}
-            for name, values in ap_global.items():
-                if isinstance(values, list) and index < len(values):
-                    per_row[name] = values[index]
-            wrapped.append(WeclappEntity.from_row(row, per_row, ref_map, attr_defs))
+            per_row = {
+                name: values[index] for name, values, size in ap_columns if index < size
+            } if ap_columns else None
+            append(from_row(row, per_row, ref_map, plan))
+
+        # A definition created after the cache was loaded shows up as an
+        # unknown id; refresh once per new id and re-wrap the page.
+        unknown = plan.missing - self._attribute_definition_misses
+        if (cold and plan.missing) or (unknown and plan is self._attribute_plan):
+            self._attribute_definition_misses.update(unknown)
+            if cold:
+                self._load_attribute_definitions(stale=None)
+            else:
+                logger.info(
+                    "Unknown customAttributeDefinition id(s) %s; refreshing definitions",
+                    sorted(unknown),
+                )
+                self._load_attribute_definitions(stale=plan.definitions)
+            # A cold load that failed leaves the cache unset; keep this page
+            # as wrapped and let the next read retry.
+            loaded = self._attribute_definitions_by_id
+            if loaded is not None and loaded is not plan.definitions:
+                return self._wrap_rows(rows, additional_properties_global, referenced_entities)
         return wrapped
 
-    def _ensure_attribute_definitions(
-        self, rows: List[Dict[str, Any]]
-    ) -> Dict[str, Dict[str, Any]]:
-        """Lazily fetch and cache all customAttributeDefinitions on first need.
+    def _attribute_plan_for(
+        self, attribute_definitions: Dict[str, Dict[str, Any]]
+    ) -> _CustomAttributePlan:
+        """Return the flattening plan for a definitions map, compiling it once."""
+        plan = self._attribute_plan
+        if plan is None or plan.definitions is not attribute_definitions:
+            plan = _CustomAttributePlan(attribute_definitions)
+            if attribute_definitions is self._attribute_definitions_by_id:
+                self._attribute_plan = plan
+        return plan
+
+    def _ensure_attribute_definitions(self) -> Optional[Dict[str, Dict[str, Any]]]:
+        """Return the customAttributeDefinition cache, refreshing it once expired.
+
+        ``None`` until the cache is first loaded. :meth:`_wrap_rows` loads it
+        only when a wrapped customAttribute item lacks ``internalName``, the
+        only case where definitions are needed to derive flattened field
+        names. The cache is kept until ``attribute_definition_ttl`` expires
+        (or for the client lifetime) and refreshed when an unknown
+        ``attributeDefinitionId`` appears.
+        """
+        cache = self._attribute_definitions_by_id
+        if cache is not None and self._attribute_definitions_expired():
+            return self._load_attribute_definitions(stale=cache)
+        return cache
 
-        Triggered when at least one row (or any nested dict inside it) carries a
-        non-empty ``customAttributes`` list whose items lack ``internalName`` —
-        the only case where the cache is needed to derive flattened field
-        names. Cached for the lifetime of the client.
+    def refresh_attribute_definitions(self) -> Dict[str, Dict[str, Any]]:
+        """Reload customAttributeDefinitions from the API, bypassing all caches.
+
+        :return: Map of ``attributeDefinitionId`` to definition dict.
         """
-        if self._attribute_definitions_by_id is not None:
-            return self._attribute_definitions_by_id
-        if not self._rows_need_attribute_definitions(rows):
-            return {}
+        return self._load_attribute_definitions(stale=self._attribute_definitions_by_id, force=True)
 
-        cache: Dict[str, Dict[str, Any]] = {}
-        try:
-            page = 1
-            while True:
-                params = {'page': page, 'pageSize': DEFAULT_PAGE_SIZE}
-                url = urljoin(self.base_url, 'customAttributeDefinition')
-                data = self._send_request("GET", url, params=params)
-                results = data.get('result', []) if isinstance(data, dict) else []
-                for defn in results:
-                    if isinstance(defn, dict) and 'id' in defn:
-                        cache[defn['id']] = defn
-                if len(results) < DEFAULT_PAGE_SIZE:
-                    break
-                page += 1
-        except WeclappAPIError as exc:
-            logger.warning(
-                "Failed to fetch customAttributeDefinitions; "
-                "customAttribute flattening will skip unnamed entries: %s",
-                exc,
-            )
-            cache = {}
+    def _attribute_definitions_expired(self) -> bool:
+        ttl = self.attribute_definition_ttl
+        return ttl is not None and time.time() - self._attribute_definitions_loaded_at > ttl
+
+    def _load_attribute_definitions(
+        self,
+        stale: Optional[Dict[str, Dict[str, Any]]],
+        force: bool = False,
+    ) -> Dict[str, Dict[str, Any]]:
+        """Single-flight (re)load of the definition cache.
+
+        ``stale`` is the cache the caller saw. If another thread replaced it
+        while this one waited for the lock, the fresh cache is returned
+        without another fetch. A cold client first tries the on-disk cache.
+        A failed fetch is not cached: a cold client returns ``{}`` and tries
+        again on the next load, unless the fetch failed while this call was
+        waiting for the lock.
+        """
+        requested_at = time.monotonic()
+        with self._attribute_definitions_lock:
+            current = self._attribute_definitions_by_id
+            if current is not None and current is not stale and not force:
+                return current
+            if current is None and not force and self._attribute_definitions_failed_at >= requested_at:
+                return {}
+            if current is None and not force:
+                persisted = self._read_persisted_attribute_definitions()
+                if persisted is not None:
+                    cache, loaded_at = persisted
+                    self._set_attribute_definitions(cache, loaded_at)
+                    return cache
+
+            try:
+                cache = self._fetch_attribute_definitions()
+            except WeclappAPIError as exc:
+                logger.warning(
+                    "Failed to fetch customAttributeDefinitions; "
+                    "customAttribute flattening will skip unnamed entries: %s",
+                    exc,
+                )
+                self._attribute_definitions_failed_at = time.monotonic()
+                if current is None:
+                    return {}
+                # Keep serving a stale cache; retry after the next TTL window.
+                self._set_attribute_definitions(current, time.time())
+                return current
+
+            self._set_attribute_definitions(cache, time.time())
+            self._write_persisted_attribute_definitions(cache)
+            return cache
+
+    def _set_attribute_definitions(
+        self, cache: Dict[str, Dict[str, Any]], loaded_at: float
+    ) -> None:
         self._attribute_definitions_by_id = cache
+        self._attribute_definitions_loaded_at = loaded_at
+        self._attribute_plan = _CustomAttributePlan(cache)
+
+    def _fetch_attribute_definitions(self) -> Dict[str, Dict[str, Any]]:
+        """Page through ``customAttributeDefinition``; pages after the first run in parallel."""
+        url = urljoin(self.base_url, 'customAttributeDefinition')
+
+        def fetch_page(page: int) -> List[Any]:
+            params = {'page': page, 'pageSize': DEFAULT_PAGE_SIZE}
+            data = self._send_request("GET", url, params=params)
+            return data.get('result', []) if isinstance(data, dict) else []
+
+        pages = [fetch_page(1)]
+        if len(pages[0]) >= DEFAULT_PAGE_SIZE:
+            count_url = urljoin(self.base_url, 'customAttributeDefinition/count')
+            count_data = self._send_request("GET", count_url)
+            total = count_data.get('result', 0) if isinstance(count_data, dict) else 0
+            total_pages = max(math.ceil(total / DEFAULT_PAGE_SIZE), 2)
+            with ThreadPoolExecutor(max_workers=min(DEFAULT_MAX_WORKERS, total_pages - 1)) as executor:
+                pages.extend(executor.map(fetch_page, range(2, total_pages + 1)))
+
+        cache: Dict[str, Dict[str, Any]] = {}
+        for results in pages:
+            for defn in results:
+                if isinstance(defn, dict) and 'id' in defn:
+                    cache[defn['id']] = defn
         return cache
 
-    @classmethod
-    def _rows_need_attribute_definitions(cls, rows: Any) -> bool:
-        """True if any customAttribute in the response lacks internalName."""
-        if isinstance(rows, dict):
-            cas = rows.get('customAttributes')
-            if isinstance(cas, list):
-                for item in cas:
-                    if isinstance(item, dict) and not item.get('internalName'):
-                        return True
-            for v in rows.values():
-                if isinstance(v, (dict, list)) and cls._rows_need_attribute_definitions(v):
-                    return True
-        elif isinstance(rows, list):
-            for item in rows:
-                if cls._rows_need_attribute_definitions(item):
-                    return True
-        return False
+    def _attribute_definitions_cache_path(self) -> Optional[str]:
+        """Per-tenant cache file, keyed by a digest of the base URL."""
+        if not self.attribute_definition_cache_dir:
+            return None
+        tenant = hashlib.sha256(self.base_url.encode('utf-8')).hexdigest()[:16]
+        return os.path.join(
+            self.attribute_definition_cache_dir, f"customAttributeDefinitions-{tenant}.json"
+        )
+
+    def _read_persisted_attribute_definitions(self):
+        path = self._attribute_definitions_cache_path()
+        if path is None or not os.path.exists(path):
+            return None
+        try:
+            with open(path, 'r', encoding='utf-8') as fh:
+                stored = json.load(fh)
+            loaded_at = float(stored['fetched_at'])
+            definitions = stored['definitions']
+        except (OSError, ValueError, KeyError, TypeError) as exc:
+            logger.warning("Ignoring unreadable customAttributeDefinition cache %s: %s", path, exc)
+            return None
+        ttl = self.attribute_definition_ttl
+        if ttl is not None and time.time() - loaded_at > ttl:
+            return None
+        cache = {defn['id']: defn for defn in definitions if isinstance(defn, dict) and 'id' in defn}
+        return cache, loaded_at
+
+    def _write_persisted_attribute_definitions(self, cache: Dict[str, Dict[str, Any]]) -> None:
+        path = self._attribute_definitions_cache_path()
+        if path is None:
+            return
+        stored = {
+            'base_url': self.base_url,
+            'fetched_at': self._attribute_definitions_loaded_at,
+            'definitions': list(cache.values()),
+        }
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            fd, tmp_path = _mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+            with os.fdopen(fd, 'w', encoding='utf-8') as fh:
+                json.dump(stored, fh)
+            os.replace(tmp_path, path)
+        except OSError as exc:
+            logger.warning("Could not persist customAttributeDefinition cache to %s: %s", path, exc)
 
     @staticmethod
     def _not_found_error(endpoint: str, id_value: str, url: str) -> 'WeclappAPIError':
@@ -945,6 +2666,19 @@ class Weclapp:
         :return: List of records, or a WeclappResponse object if return_weclapp_response is True.
         :raises WeclappAPIError: on request failure.
         """
+        with self._span('weclapp.get_all', entity=entity, threaded=threaded) as job_span:
+            return self._get_all(job_span, entity, params, limit, threaded, max_workers, return_weclapp_response)
+
+    def _get_all(
+        self,
+        job_span: Span,
+        entity: str,
+        params: Optional[Dict[str, Any]],
+        limit: Optional[int],
+        threaded: bool,
+        max_workers: int,
+        return_weclapp_response: bool,
+    ) -> Union[List[Any], WeclappResponse]:
         params = params.copy() if params is not None else {}
         results: List[Any] = []
         all_response_data = {}
@@ -964,25 +2698,28 @@ class Weclapp:
                 url = urljoin(self.base_url, entity)
                 logger.info(f"Fetching page {params['page']} for {entity}")
                 logger.debug(f"GET {url} with params {params}")
-                data = self._send_request("GET", url, params=params)
+                with self._span('weclapp.page', page=params['page']):
+                    data = self._send_request("GET", url, params=params)
                 current_page = data.get('result', [])
-                results.extend(current_page)
-
-                # Collect additional properties and referenced entities if present
-                if 'additionalProperties' in data and data['additionalProperties']:
-                    # For additionalProperties, we need to extend each property array
-                    # as there should be one entry per record
-                    for prop_name, prop_values in data['additionalProperties'].items():
-                        if prop_name not in all_additional_properties:
-                            all_additional_properties[prop_name] = []
-                        all_additional_properties[prop_name].extend(prop_values)
-
-                if 'referencedEntities' in data and data['referencedEntities']:
-                    # For referencedEntities, we need to merge lists within each entity type
-                    for entity_type, entities_list in data['referencedEntities'].items():
-                        if entity_type not in all_referenced_entities:
-                            all_referenced_entities[entity_type] = []
-                        all_referenced_entities[entity_type].extend(entities_list)
+
+                with self._span('weclapp.merge', page=params['page']):
+                    results.extend(current_page)
+
+                    # Collect additional properties and referenced entities if present
+                    if 'additionalProperties' in data and data['additionalProperties']:
+                        # For additionalProperties, we need to extend each property array
+                        # as there should be one entry per record
+                        for prop_name, prop_values in data['additionalProperties'].items():
+                            if prop_name not in all_additional_properties:
+                                all_additional_properties[prop_name] = []
+                            all_additional_properties[prop_name].extend(prop_values)
+
+                    if 'referencedEntities' in data and data['referencedEntities']:
+                        # For referencedEntities, we need to merge lists within each entity type
+                        for entity_type, entities_list in data['referencedEntities'].items():
+                            if entity_type not in all_referenced_entities:
+                                all_referenced_entities[entity_type] = []
+                            all_referenced_entities[entity_type].extend(entities_list)
 
                 if len(current_page) < params['pageSize'] or (limit is not None and len(results) >= limit):
                     break
@@ -1004,11 +2741,12 @@ class Weclapp:
                 all_response_data['referencedEntities'] = all_referenced_entities
 
             response = WeclappResponse.from_api_response(all_response_data)
-            wrapped = self._wrap_rows(
-                response.result,
-                response.additional_properties,
-                response.referenced_entities,
-            )
+            with self._span('weclapp.wrap', rows=len(response.result)):
+                wrapped = self._wrap_rows(
+                    response.result,
+                    response.additional_properties,
+                    response.referenced_entities,
+                )
             if return_weclapp_response:
                 return WeclappResponse(
                     result=wrapped,
@@ -1026,35 +2764,33 @@ class Weclapp:
             url = urljoin(self.base_url, count_endpoint)
             logger.debug(f"GET {url} with params {params}")
             count_path = urlparse(url).path
+            count_kwargs: Dict[str, Any] = {'params': params, 'timeout': DEFAULT_REQUEST_TIMEOUT}
+            count_span = self._start_request_span("GET", url, count_path, count_kwargs)
+            count_sent_at = time.perf_counter() if count_span is not _NOOP_SPAN else 0.0
             count_start = time.monotonic()
             count_status = None
             count_error = None
+            count_response = None
             try:
-                response = self.session.request(
-                    "GET", url, params=params, timeout=DEFAULT_REQUEST_TIMEOUT
+                count_response = self._session_request("GET", url, **count_kwargs)
+                count_status = count_response.status_code
+                if count_span is not _NOOP_SPAN:
+                    self._mark_response_events(count_span, count_sent_at, count_response)
+                self._check_response(count_response)
+                total_count = (
+                    self._decode_json(count_response).get('result', 0)
+                    if count_response.status_code == 200 else 0
                 )
-                count_status = response.status_code
-                self._check_response(response)
-                total_count = response.json().get('result', 0) if response.status_code == 200 else 0
+                count_span.add_event('json_parsed')
             except requests.exceptions.RequestException as e:
                 count_error = e
                 raise
             finally:
                 count_duration_ms = (time.monotonic() - count_start) * 1000
-                if count_error is not None:
-                    logger.warning(
-                        f"[API] Weclapp GET {count_path} -> ERROR ({count_duration_ms:.0f}ms) "
-                        f"{type(count_error).__name__}: {count_error}"
-                    )
-                elif count_status is not None:
-                    if count_duration_ms >= self.slow_threshold_ms:
-                        logger.warning(
-                            f"[API_SLOW] Weclapp GET {count_path} -> {count_status} ({count_duration_ms:.0f}ms)"
-                        )
-                    else:
-                        logger.info(
-                            f"[API] Weclapp GET {count_path} -> {count_status} ({count_duration_ms:.0f}ms)"
-                        )
+                self._record_request(
+                    "GET", count_path, count_status, count_duration_ms, count_error,
+                    count_response, count_span,
+                )
 
             if total_count == 0:
                 logger.info(f"No records found for entity '{entity}'")
@@ -1080,7 +2816,7 @@ class Weclapp:
             all_additional_properties = {}
             all_referenced_entities = {}
 
-            def fetch_page(page_number: int) -> Dict[str, Any]:
+            def fetch_page(page_number: int, queued_at: float) -> Dict[str, Any]:
                 # Fetch a single page and return the full response data.
                 page_params = params.copy()
                 page_params['page'] = page_number
@@ -1088,33 +2824,40 @@ class Weclapp:
                 url = urljoin(self.base_url, entity)
                 logger.info(f"[Threaded] Fetching page {page_number} of {total_pages} for {entity}")
                 logger.debug(f"GET {url} with params {page_params}")
-                data = self._send_request("GET", url, params=page_params)
+                with self._span('weclapp.page', parent=job_span, page=page_number) as page_span:
+                    page_span.add_event('queued', queued_at)
+                    data = self._send_request("GET", url, params=page_params)
                 return data
 
+            self._reserve_connections(max_workers)
             with ThreadPoolExecutor(max_workers=max_workers) as executor:
-                future_to_page = {executor.submit(fetch_page, page): page for page in range(1, total_pages + 1)}
+                future_to_page = {
+                    executor.submit(fetch_page, page, time.perf_counter()): page
+                    for page in range(1, total_pages + 1)
+                }
                 for future in as_completed(future_to_page):
                     page_number = future_to_page[future]
                     try:
                         page_data = future.result()
-                        page_results = page_data.get('result', [])
-                        results.extend(page_results)
-
-                        # Collect additional properties and referenced entities if present
-                        if 'additionalProperties' in page_data and page_data['additionalProperties']:
-                            # For additionalProperties, we need to extend each property array
-                            # as there should be one entry per record
-                            for prop_name, prop_values in page_data['additionalProperties'].items():
-                                if prop_name not in all_additional_properties:
-                                    all_additional_properties[prop_name] = []
-                                all_additional_properties[prop_name].extend(prop_values)
-
-                        if 'referencedEntities' in page_data and page_data['referencedEntities']:
-                            # For referencedEntities, we need to merge lists within each entity type
-                            for entity_type, entities_list in page_data['referencedEntities'].items():
-                                if entity_type not in all_referenced_entities:
-                                    all_referenced_entities[entity_type] = []
-                                all_referenced_entities[entity_type].extend(entities_list)
+                        with self._span('weclapp.merge', page=page_number):
+                            page_results = page_data.get('result', [])
+                            results.extend(page_results)
+
+                            # Collect additional properties and referenced entities if present
+                            if 'additionalProperties' in page_data and page_data['additionalProperties']:
+                                # For additionalProperties, we need to extend each property array
+                                # as there should be one entry per record
+                                for prop_name, prop_values in page_data['additionalProperties'].items():
+                                    if prop_name not in all_additional_properties:
+                                        all_additional_properties[prop_name] = []
+                                    all_additional_properties[prop_name].extend(prop_values)
+
+                            if 'referencedEntities' in page_data and page_data['referencedEntities']:
+                                # For referencedEntities, we need to merge lists within each entity type
+                                for entity_type, entities_list in page_data['referencedEntities'].items():
+                                    if entity_type not in all_referenced_entities:
+                                        all_referenced_entities[entity_type] = []
+                                    all_referenced_entities[entity_type].extend(entities_list)
 
                     except Exception as e:
                         logger.error(f"Error fetching page {page_number} for {entity}: {e}")
@@ -1137,11 +2880,12 @@ class Weclapp:
                 all_response_data['referencedEntities'] = all_referenced_entities
 
             response = WeclappResponse.from_api_response(all_response_data)
-            wrapped = self._wrap_rows(
-                response.result,
-                response.additional_properties,
-                response.referenced_entities,
-            )
+            with self._span('weclapp.wrap', rows=len(response.result)):
+                wrapped = self._wrap_rows(
+                    response.result,
+                    response.additional_properties,
+                    response.referenced_entities,
+                )
             if return_weclapp_response:
                 return WeclappResponse(
                     result=wrapped,
@@ -1160,6 +2904,9 @@ class Weclapp:
         """
         Perform a POST request to the given endpoint.
 
+        The payload is serialized with the client's ``json_codec``;
+        ``WeclappEntity`` values are sent as ``to_payload()``.
+
         :param endpoint: API endpoint.
         :param data: Data to post.
         :param params: Optional query parameters (e.g., dryRun).
@@ -1168,7 +2915,7 @@ class Weclapp:
         """
         url = urljoin(self.base_url, endpoint)
         logger.debug(f"POST {url} - Data: {data} - Params: {params}")
-        request_kwargs: Dict[str, Any] = {"json": data}
+        request_kwargs = self._json_body(data)
         if params is not None:
             request_kwargs["params"] = params
         return self._send_request("POST", url, **request_kwargs)
@@ -1177,6 +2924,9 @@ class Weclapp:
         """
         Perform a PUT request to the given endpoint.
 
+        The payload is serialized with the client's ``json_codec``;
+        ``WeclappEntity`` values are sent as ``to_payload()``.
+
         :param endpoint: API endpoint.
         :param data: Data to put.
         :param params: Query parameters.
@@ -1187,7 +2937,7 @@ class Weclapp:
         params.setdefault("ignoreMissingProperties", True)
         url = urljoin(self.base_url, f"{endpoint}/id/{id}")
         logger.debug(f"PUT {url} - Data: {data} - Params: {params}")
-        return self._send_request("PUT", url, json=data, params=params)
+        return self._send_request("PUT", url, params=params, **self._json_body(data))
 
     def delete(
         self,
@@ -1229,7 +2979,7 @@ class Weclapp:
         :param action: The action/method to perform (e.g., 'downloadLatestSalesInvoicePdf' or 'createPrepaymentFinalInvoice').
         :param entity_id: (Optional) ID of the entity if needed.
         :param method: HTTP method ('GET' or 'POST' supported).
-        :param data: (Optional) JSON payload for POST requests.
+        :param data: (Optional) JSON payload for POST requests, serialized with ``json_codec``.
         :param params: (Optional) Query parameters for GET requests.
         :return: JSON response (dict) or empty dict for 204, or downloaded file content if PDF/binary.
         """
@@ -1241,12 +2991,12 @@ class Weclapp:
             raise ValueError("Only GET and POST methods are supported by call_method().")
 
         # Reuse the unified request approach
-        return self._send_request(method, url, json=data, params=params)
+        return self._send_request(method, url, params=params, **self._json_body(data))
 
     def upload(
         self,
         endpoint: str,
-        data: bytes,
+        data: Union[bytes, bytearray, memoryview, mmap.mmap, str, 'os.PathLike[str]', IO[bytes]],
         id: Optional[str] = None,
         action: Optional[str] = None,
         params: Optional[Dict[str, Any]] = None,
@@ -1261,15 +3011,23 @@ class Weclapp:
         - If only action is provided: {endpoint}/{action}
         - Otherwise: {endpoint}
 
+        ``data`` can be bytes, a file path, a binary file object, or a
+        ``memoryview`` / ``mmap`` buffer. Paths and file objects are streamed
+        from disk with a known ``Content-Length`` rather than read into memory;
+        buffers are sent without copying. File objects are sent from their
+        current position, and urllib3 rewinds them to that position when it
+        retries the request. A path is opened and closed by this method; a
+        caller-supplied file object is left open.
+
         Content type is determined in order of priority:
         1. Explicit content_type parameter (highest priority)
-        2. Inferred from filename extension
+        2. Inferred from filename extension (or from the path, if no filename is given)
         3. Falls back to 'application/octet-stream'
 
         A warning is logged if content_type and filename extension suggest different types.
 
         :param endpoint: API endpoint (e.g., 'document', 'article').
-        :param data: Binary data to upload.
+        :param data: Bytes, a file path, a binary file object, or a memoryview/mmap buffer.
         :param id: Optional entity ID for entity-specific uploads.
         :param action: Optional action name (e.g., 'upload', 'uploadArticleImage').
         :param params: Query parameters (e.g., entityName, entityId, name for document upload).
@@ -1280,38 +3038,283 @@ class Weclapp:
         """
         params = params.copy() if params is not None else {}
 
-        # Determine content type
-        inferred_type = infer_content_type(filename)
-        effective_content_type = content_type or inferred_type or 'application/octet-stream'
+        owned_file = None
+        body = None
+        if isinstance(data, (str, os.PathLike)):
+            path = os.fspath(data)
+            filename = filename or os.path.basename(path)
+            owned_file = data = open(path, 'rb')
 
-        # Warn if explicit content_type differs from inferred type
-        if content_type and inferred_type and content_type != inferred_type:
-            logger.warning(
-                f"Content type mismatch: explicit '{content_type}' differs from "
-                f"inferred '{inferred_type}' for filename '{filename}'"
-            )
+        try:
+            # Determine content type
+            inferred_type = infer_content_type(filename)
+            effective_content_type = content_type or inferred_type or 'application/octet-stream'
 
-        # Build URL based on parameters
-        if id is not None and action is not None:
-            path = f"{endpoint}/id/{id}/{action}"
-        elif action is not None:
-            path = f"{endpoint}/{action}"
-        else:
-            path = endpoint
+            # Warn if explicit content_type differs from inferred type
+            if content_type and inferred_type and content_type != inferred_type:
+                logger.warning(
+                    f"Content type mismatch: explicit '{content_type}' differs from "
+                    f"inferred '{inferred_type}' for filename '{filename}'"
+                )
 
-        url = urljoin(self.base_url, path)
-        logger.debug(f"UPLOAD {url} - Content-Type: {effective_content_type} - Params: {params}")
+            # Build URL based on parameters
+            if id is not None and action is not None:
+                path = f"{endpoint}/id/{id}/{action}"
+            elif action is not None:
+                path = f"{endpoint}/{action}"
+            else:
+                path = endpoint
+
+            url = urljoin(self.base_url, path)
+            logger.debug(f"UPLOAD {url} - Content-Type: {effective_content_type} - Params: {params}")
+
+            # Send request with binary data
+            headers = {"Content-Type": effective_content_type}
+            body, length = self._upload_body(data)
+            send_body = body
+            if self._transfer_buckets.get('upload') is not None:
+                send_body = _ThrottledReader(body, lambda amount: self._pace('upload', amount))
+            if length is not None and not isinstance(send_body, (bytes, bytearray)):
+                headers["Content-Length"] = str(length)
+            start = time.perf_counter()
+            try:
+                return self._send_request("POST", url, data=send_body, headers=headers, params=params)
+            finally:
+                self._record_transfer('upload', length or 0, time.perf_counter() - start)
+        finally:
+            if owned_file is not None:
+                owned_file.close()
+            # Release our byte view so the caller can close an mmap afterwards.
+            if isinstance(body, memoryview) and body is not data:
+                body.release()
+
+    @staticmethod
+    def _upload_body(data: Any):
+        """Return ``(body, content_length)`` for an upload without copying the data.
+
+        Buffers (``memoryview``, ``mmap``) are sent as a flat byte view; file
+        objects are streamed and their length is the bytes remaining from the
+        current position, or ``None`` (chunked transfer) if it can't be told.
+        """
+        if isinstance(data, (bytes, bytearray)):
+            return data, len(data)
+        if hasattr(data, 'read') and not isinstance(data, mmap.mmap):
+            try:
+                position = data.tell()
+                try:
+                    size = os.fstat(data.fileno()).st_size
+                except (AttributeError, OSError, ValueError):
+                    data.seek(0, os.SEEK_END)
+                    size = data.tell()
+                    data.seek(position)
+                return data, max(size - position, 0)
+            except (AttributeError, OSError, ValueError):
+                return data, None
+        view = data if isinstance(data, memoryview) else memoryview(data)
+        if view.format != 'B' or view.ndim != 1:
+            view = view.cast('B')
+        return view, view.nbytes
+
+    def upload_many(
+        self,
+        items: List[Dict[str, Any]],
+        max_workers: int = DEFAULT_MAX_WORKERS,
+        index_path: Union[str, 'os.PathLike[str]', None] = None,
+        check_documents: bool = False,
+        hash_algorithm: str = 'sha256'
+    ) -> List[Dict[str, Any]]:
+        """
+        Upload many files in parallel, skipping content that is already attached.
+
+        Each item is a dict of :meth:`upload` keyword arguments, e.g.
+        ``{'endpoint': 'document', 'action': 'upload', 'data': 'scan.pdf',
+        'params': {'entityName': 'salesOrder', 'entityId': '123', 'name': 'scan.pdf'}}``.
+        Content types are inferred from ``filename`` (or the path) with
+        :func:`infer_content_type` unless ``content_type`` is given.
+
+        Every item is hashed first. An item is skipped when the same content
+        was already uploaded to the same target, where the target is the
+        endpoint, id, action and params except ``name`` and ``description``:
+
+        - earlier in the same call;
+        - in a previous run recorded in the JSON index at ``index_path``;
+        - with ``check_documents``, for ``document`` uploads only: the
+          entity already has a document with the same ``name`` and size. The
+          ``document`` listing carries no content hash, so this is a name and
+          size match.
+
+        Items that can't be hashed (non-seekable streams) are always uploaded.
+
+        :param items: Upload keyword argument dicts.
+        :param max_workers: Maximum parallel hashing and upload workers.
+        :param index_path: Optional JSON file recording uploaded digests per
+            target; read before and written after the run.
+        :param check_documents: Check existing documents of the target entity.
+        :param hash_algorithm: ``hashlib`` algorithm for content digests.
+        :return: One result per item, in input order, with 'endpoint', 'id',
+            'action', 'filename', 'status' ('uploaded', 'skipped' or 'failed'),
+            'content_type', 'size', 'digest', 'response', 'seconds' and 'error'.
+        """
+        items = [dict(item) for item in items]
+        index_path = os.fspath(index_path) if index_path is not None else None
+        recorded = self._read_manifest(index_path) if index_path else {}
+        results = [self._upload_result(item) for item in items]
+        if not items:
+            return results
+
+        def digest(position: int) -> None:
+            start = time.perf_counter()
+            try:
+                results[position]['digest'], results[position]['size'] = self._upload_digest(
+                    items[position]['data'], hash_algorithm
+                )
+            except OSError as exc:
+                results[position].update(status='failed', error=str(exc))
+            results[position]['seconds'] = time.perf_counter() - start
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            list(executor.map(digest, range(len(items))))
+
+        keys = [self._upload_key(item, result, hash_algorithm) for item, result in zip(items, results)]
+        existing = self._existing_documents(items, results, max_workers) if check_documents else {}
+
+        pending: List[int] = []
+        claimed: set = set()
+        for position, (item, result, key) in enumerate(zip(items, results, keys)):
+            if result['status'] == 'failed':
+                continue
+            if key is not None and (key in claimed or key in recorded):
+                result['status'] = 'skipped'
+                continue
+            params = item.get('params') or {}
+            entity = (params.get('entityName'), params.get('entityId'))
+            if (params.get('name'), result['size']) in existing.get(entity, ()):
+                result['status'] = 'skipped'
+                continue
+            if key is not None:
+                claimed.add(key)
+            pending.append(position)
+
+        def run(position: int) -> None:
+            item, result = items[position], results[position]
+            start = time.perf_counter()
+            try:
+                result['response'] = self.upload(**item)
+                result['status'] = 'uploaded'
+            except (WeclappAPIError, OSError) as exc:
+                logger.error(f"Bulk upload failed for {item['endpoint']} {result['filename']}: {exc}")
+                result.update(status='failed', error=str(exc))
+            result['seconds'] += time.perf_counter() - start
+
+        if pending:
+            self._reserve_connections(max_workers)
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                list(executor.map(run, pending))
+
+        if index_path:
+            for result, key in zip(results, keys):
+                if key is not None and result['status'] == 'uploaded':
+                    recorded[key] = {'filename': result['filename'], 'size': result['size']}
+            self._write_manifest(index_path, recorded)
+        return results
+
+    @staticmethod
+    def _upload_result(item: Dict[str, Any]) -> Dict[str, Any]:
+        data = item['data']
+        filename = item.get('filename')
+        if filename is None and isinstance(data, (str, os.PathLike)):
+            filename = os.path.basename(os.fspath(data))
+        return {
+            'endpoint': item['endpoint'],
+            'id': item.get('id'),
+            'action': item.get('action'),
+            'filename': filename,
+            'status': None,
+            'content_type': item.get('content_type') or infer_content_type(filename)
+            or 'application/octet-stream',
+            'size': None,
+            'digest': None,
+            'response': None,
+            'seconds': 0.0,
+            'error': None,
+        }
 
-        # Send request with binary data
-        headers = {"Content-Type": effective_content_type}
-        return self._send_request("POST", url, data=data, headers=headers, params=params)
+    @staticmethod
+    def _upload_digest(data: Any, hash_algorithm: str):
+        """Return ``(digest, size)`` of upload data, or ``(None, None)`` for
+        streams that can't be rewound. File objects are read from and
+        restored to their current position."""
+        if isinstance(data, (str, os.PathLike)):
+            path = os.fspath(data)
+            return Weclapp._file_hasher(path, hash_algorithm).hexdigest(), os.path.getsize(path)
+        if hasattr(data, 'read') and not isinstance(data, mmap.mmap):
+            try:
+                position = data.tell()
+            except (AttributeError, OSError, ValueError):
+                return None, None
+            hasher = hashlib.new(hash_algorithm)
+            size = 0
+            for chunk in iter(lambda: data.read(DEFAULT_CHUNK_SIZE), b''):
+                hasher.update(chunk)
+                size += len(chunk)
+            data.seek(position)
+            return hasher.hexdigest(), size
+        view = memoryview(data)
+        return hashlib.new(hash_algorithm, view).hexdigest(), view.nbytes
+
+    @staticmethod
+    def _upload_key(item: Dict[str, Any], result: Dict[str, Any], hash_algorithm: str) -> Optional[str]:
+        if result['digest'] is None:
+            return None
+        params = {
+            name: value for name, value in (item.get('params') or {}).items()
+            if name not in ('name', 'description')
+        }
+        query = '&'.join(f"{name}={params[name]}" for name in sorted(params))
+        target = f"{item['endpoint']}/{item.get('id') or ''}/{item.get('action') or ''}?{query}"
+        return f"{target}#{hash_algorithm}:{result['digest']}"
+
+    def _existing_documents(
+        self, items: List[Dict[str, Any]], results: List[Dict[str, Any]], max_workers: int
+    ) -> Dict[tuple, set]:
+        """``(name, documentSize)`` pairs of the documents already attached to
+        each entity targeted by a ``document`` upload."""
+        entities = []
+        for item, result in zip(items, results):
+            params = item.get('params') or {}
+            entity = (params.get('entityName'), params.get('entityId'))
+            if (item['endpoint'] == 'document' and result['status'] != 'failed'
+                    and all(entity) and entity not in entities):
+                entities.append(entity)
+
+        def list_entity(entity: tuple) -> set:
+            try:
+                documents = self.get_all('document', params={
+                    'entityName': entity[0],
+                    'entityId': entity[1],
+                    'properties': 'id,name,documentSize',
+                })
+            except WeclappAPIError as exc:
+                logger.warning(f"Listing documents of {entity[0]} {entity[1]} failed: {exc}")
+                return set()
+            return {(doc.get('name'), doc.get('documentSize')) for doc in documents}
+
+        if not entities:
+            return {}
+        self._reserve_connections(max_workers)
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            return dict(zip(entities, executor.map(list_entity, entities)))
 
     def download(
         self,
         endpoint: str,
         id: Optional[str] = None,
         action: Optional[str] = None,
-        params: Optional[Dict[str, Any]] = None
+        params: Optional[Dict[str, Any]] = None,
+        stream_to: Union[str, 'os.PathLike[str]', IO[bytes], None] = None,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        hash_algorithm: Optional[str] = None,
+        resume: bool = False
     ) -> Dict[str, Any]:
         """
         Download binary data from a weclapp endpoint.
@@ -1322,17 +3325,73 @@ class Weclapp:
         - If only action is provided: {endpoint}/{action}
         - Otherwise: {endpoint}
 
+        Without ``stream_to`` the body is buffered and returned in memory. With
+        ``stream_to`` it is streamed in ``chunk_size`` pieces with constant
+        memory:
+
+        - A path is written atomically: chunks go to ``<path>.part``, which is
+          renamed over ``path`` once the transfer is complete.
+        - A writable binary file object receives the chunks directly.
+
         :param endpoint: API endpoint (e.g., 'document', 'salesInvoice').
         :param id: Optional entity ID.
         :param action: Optional action name (e.g., 'downloadLatestSalesInvoicePdf').
         :param params: Query parameters.
+        :param stream_to: Optional target path or writable binary file object.
+        :param chunk_size: Bytes per read when streaming.
+        :param hash_algorithm: Optional ``hashlib`` algorithm name (e.g. 'sha256')
+            computed over the streamed bytes.
+        :param resume: For path targets only. Continue an existing ``<path>.part``
+            with a ``Range`` request, and re-request the missing range if the
+            connection breaks off mid-transfer (up to ``DEFAULT_RESUME_ATTEMPTS``
+            times). The partial file is kept on failure so a later call can resume.
         :return: Dict with 'content' (bytes) and 'content_type' keys for binary data,
-                 or regular dict for JSON responses.
+                 or regular dict for JSON responses. When streaming, a dict with
+                 'content_type', 'size', 'path' (for path targets), 'resumed' and,
+                 if requested, 'digest'.
+        :raises WeclappAPIError: on request failure.
+        """
+        params = params.copy() if params is not None else {}
+        url = self._download_url(endpoint, id, action)
+        logger.debug(f"DOWNLOAD {url} - Params: {params}")
+
+        if stream_to is None:
+            return self._send_request("GET", url, params=params)
+        if isinstance(stream_to, (str, os.PathLike)):
+            return self._download_to_path(
+                url, params, os.fspath(stream_to), chunk_size, hash_algorithm, resume
+            )
+        return self._download_to_file(url, params, stream_to, chunk_size, hash_algorithm)
+
+    def iter_download(
+        self,
+        endpoint: str,
+        id: Optional[str] = None,
+        action: Optional[str] = None,
+        params: Optional[Dict[str, Any]] = None,
+        chunk_size: int = DEFAULT_CHUNK_SIZE
+    ) -> Iterator[bytes]:
+        """
+        Stream binary data from a weclapp endpoint as an iterator of chunks.
+
+        URLs are built like :meth:`download`. The request is sent on the first
+        ``next()``; closing the iterator early releases the connection.
+
+        :param endpoint: API endpoint (e.g., 'document', 'salesInvoice').
+        :param id: Optional entity ID.
+        :param action: Optional action name.
+        :param params: Query parameters.
+        :param chunk_size: Maximum bytes per yielded chunk.
+        :return: Iterator of ``bytes`` chunks.
         :raises WeclappAPIError: on request failure.
         """
         params = params.copy() if params is not None else {}
+        url = self._download_url(endpoint, id, action)
+        logger.debug(f"DOWNLOAD (stream) {url} - Params: {params}")
+        with self._stream_request("GET", url, params=params) as response:
+            yield from self._iter_body(response, chunk_size)
 
-        # Build URL based on parameters
+    def _download_url(self, endpoint: str, id: Optional[str], action: Optional[str]) -> str:
         if id is not None and action is not None:
             path = f"{endpoint}/id/{id}/{action}"
         elif id is not None:
@@ -1341,8 +3400,913 @@ class Weclapp:
             path = f"{endpoint}/{action}"
         else:
             path = endpoint
+        return urljoin(self.base_url, path)
 
-        url = urljoin(self.base_url, path)
-        logger.debug(f"DOWNLOAD {url} - Params: {params}")
+    def _download_to_file(
+        self,
+        url: str,
+        params: Dict[str, Any],
+        fileobj: IO[bytes],
+        chunk_size: int,
+        hash_algorithm: Optional[str],
+    ) -> Dict[str, Any]:
+        hasher = hashlib.new(hash_algorithm) if hash_algorithm else None
+        size = 0
+        with self._stream_request("GET", url, params=params) as response:
+            content_type = response.headers.get("Content-Type", "")
+            for chunk in self._iter_body(response, chunk_size):
+                fileobj.write(chunk)
+                size += len(chunk)
+                if hasher is not None:
+                    hasher.update(chunk)
+        result: Dict[str, Any] = {"content_type": content_type, "size": size, "resumed": False}
+        if hasher is not None:
+            result["digest"] = hasher.hexdigest()
+        return result
+
+    def _download_to_path(
+        self,
+        url: str,
+        params: Dict[str, Any],
+        path: str,
+        chunk_size: int,
+        hash_algorithm: Optional[str],
+        resume: bool,
+    ) -> Dict[str, Any]:
+        part_path = path + '.part'
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        if not resume and os.path.exists(part_path):
+            os.remove(part_path)
+
+        resumed = False
+        attempts = 0
+        while True:
+            offset = os.path.getsize(part_path) if os.path.exists(part_path) else 0
+            headers = {"Range": f"bytes={offset}-"} if offset else None
+            try:
+                with self._stream_request("GET", url, params=params, headers=headers) as response:
+                    if offset and response.status_code != 206:
+                        # Server ignored the range; start over.
+                        offset = 0
+                    resumed = resumed or bool(offset)
+                    content_type = response.headers.get("Content-Type", "")
+                    hasher = None
+                    if hash_algorithm:
+                        hasher = (
+                            self._file_hasher(part_path, hash_algorithm, chunk_size)
+                            if offset else hashlib.new(hash_algorithm)
+                        )
+                    with open(part_path, 'ab' if offset else 'wb') as fh:
+                        for chunk in self._iter_body(response, chunk_size):
+                            fh.write(chunk)
+                            if hasher is not None:
+                                hasher.update(chunk)
+                break
+            except WeclappAPIError as exc:
+                if offset and exc.status_code == 416:
+                    # Stale partial file the server can't continue; start over.
+                    os.remove(part_path)
+                    continue
+                attempts += 1
+                # Only transport errors (no HTTP status) are resumable.
+                if not resume or exc.status_code is not None or attempts > DEFAULT_RESUME_ATTEMPTS:
+                    if not resume and os.path.exists(part_path):
+                        os.remove(part_path)
+                    raise
+                logger.warning(
+                    f"Download of {urlparse(url).path} interrupted; resuming "
+                    f"(attempt {attempts}/{DEFAULT_RESUME_ATTEMPTS})"
+                )
+
+        size = os.path.getsize(part_path)
+        os.replace(part_path, path)
+        result: Dict[str, Any] = {
+            "path": path,
+            "content_type": content_type,
+            "size": size,
+            "resumed": resumed,
+        }
+        if hasher is not None:
+            result["digest"] = hasher.hexdigest()
+        return result
+
+    @staticmethod
+    def _file_hasher(path: str, hash_algorithm: str, chunk_size: int = DEFAULT_CHUNK_SIZE):
+        """Return a ``hashlib`` object primed with the contents of ``path``."""
+        hasher = hashlib.new(hash_algorithm)
+        with open(path, 'rb') as fh:
+            for chunk in iter(lambda: fh.read(chunk_size), b''):
+                hasher.update(chunk)
+        return hasher
+
+    def download_many(
+        self,
+        targets: List[Union[tuple, Dict[str, Any]]],
+        directory: Union[str, 'os.PathLike[str]'],
+        max_workers: int = DEFAULT_MAX_WORKERS,
+        hash_algorithm: Optional[str] = 'sha256',
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        overwrite: bool = False
+    ) -> List[Dict[str, Any]]:
+        """
+        Download many binaries in parallel, streaming each to a file in ``directory``.
+
+        Each target is ``(endpoint, id)``, ``(endpoint, id, action)`` or a dict
+        with ``endpoint``, ``id`` and optional ``action``, ``params`` and
+        ``filename``. Without an explicit filename the name is derived from the
+        target (``{endpoint}_{id}[_{action}]``) plus an extension for the
+        response Content-Type, so repeated runs produce the same files.
+
+        Downloads run on a pool of ``max_workers`` threads sharing the client
+        session, so the session's retry and 429 backoff apply to every item.
+        Results are recorded in ``directory/.weclappy-manifest.json``. A target
+        whose file is still present with the recorded size (and digest, if
+        ``hash_algorithm`` is set) is skipped on the next run.
+
+        :param targets: Download targets.
+        :param directory: Target directory; created if missing.
+        :param max_workers: Maximum parallel downloads.
+        :param hash_algorithm: ``hashlib`` algorithm for digests, or ``None``
+            to match skipped files by size only.
+        :param chunk_size: Bytes per read when streaming.
+        :param overwrite: Download every target even if a matching file exists.
+        :return: One manifest entry per target, in input order, with 'endpoint',
+            'id', 'action', 'status' ('downloaded', 'skipped' or 'failed'),
+            'filename', 'path', 'size', 'content_type', 'digest', 'seconds'
+            and 'error'.
+        """
+        directory = os.fspath(directory)
+        os.makedirs(directory, exist_ok=True)
+        normalized = [self._normalize_download_target(target) for target in targets]
+        manifest_path = os.path.join(directory, DOWNLOAD_MANIFEST_FILENAME)
+        recorded = self._read_manifest(manifest_path)
+
+        def run(target: Dict[str, Any]) -> Dict[str, Any]:
+            entry = {
+                'endpoint': target['endpoint'],
+                'id': target['id'],
+                'action': target['action'],
+                'status': 'downloaded',
+                'filename': None,
+                'path': None,
+                'size': None,
+                'content_type': None,
+                'digest': None,
+                'seconds': 0.0,
+                'error': None,
+            }
+            start = time.perf_counter()
+            try:
+                previous = None if overwrite else recorded.get(target['key'])
+                if previous and self._download_is_current(directory, previous, hash_algorithm, chunk_size):
+                    entry.update(
+                        status='skipped',
+                        filename=previous['filename'],
+                        path=os.path.join(directory, previous['filename']),
+                        size=previous.get('size'),
+                        content_type=previous.get('content_type'),
+                        digest=previous.get('digest'),
+                    )
+                else:
+                    entry.update(self._download_into_directory(
+                        target, directory, hash_algorithm, chunk_size
+                    ))
+            except (WeclappAPIError, OSError) as exc:
+                logger.error(
+                    f"Bulk download failed for {target['endpoint']} {target['id']}: {exc}"
+                )
+                entry.update(status='failed', error=str(exc))
+            entry['seconds'] = time.perf_counter() - start
+            return entry
+
+        if normalized:
+            self._reserve_connections(max_workers)
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                results = list(executor.map(run, normalized))
+        else:
+            results = []
+
+        for target, entry in zip(normalized, results):
+            if entry['status'] != 'failed':
+                recorded[target['key']] = {
+                    'filename': entry['filename'],
+                    'size': entry['size'],
+                    'content_type': entry['content_type'],
+                    'digest': entry['digest'],
+                    'hash_algorithm': hash_algorithm if entry['digest'] else None,
+                }
+        self._write_manifest(manifest_path, recorded)
+        return results
+
+    @staticmethod
+    def _normalize_download_target(target: Union[tuple, Dict[str, Any]]) -> Dict[str, Any]:
+        if isinstance(target, dict):
+            endpoint, id_value = target['endpoint'], target.get('id')
+            action, params, filename = target.get('action'), target.get('params'), target.get('filename')
+        else:
+            endpoint, id_value, action = (tuple(target) + (None,))[:3]
+            params = filename = None
+        stem = f"{endpoint}_{id_value}" + (f"_{action}" if action else "")
+        return {
+            'endpoint': endpoint,
+            'id': id_value,
+            'action': action,
+            'params': dict(params) if params else {},
+            'filename': os.path.basename(filename) if filename else None,
+            'stem': re.sub(r'[^A-Za-z0-9._-]', '_', stem),
+            'key': f"{endpoint}/{id_value}/{action or ''}",
+        }
+
+    def _download_into_directory(
+        self,
+        target: Dict[str, Any],
+        directory: str,
+        hash_algorithm: Optional[str],
+        chunk_size: int,
+    ) -> Dict[str, Any]:
+        """Stream one target to a temp file in ``directory`` and rename it into place."""
+        url = self._download_url(target['endpoint'], target['id'], target['action'])
+        fd, tmp_path = _mkstemp(dir=directory, prefix='.', suffix='.part')
+        try:
+            with os.fdopen(fd, 'wb') as fh:
+                info = self._download_to_file(url, target['params'], fh, chunk_size, hash_algorithm)
+            filename = target['filename'] or target['stem'] + self._extension_for(info['content_type'])
+            path = os.path.join(directory, filename)
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        return {
+            'filename': filename,
+            'path': path,
+            'size': info['size'],
+            'content_type': info['content_type'],
+            'digest': info.get('digest'),
+        }
+
+    @staticmethod
+    def _extension_for(content_type: Optional[str]) -> str:
+        mime = (content_type or '').split(';', 1)[0].strip().lower()
+        return EXTENSIONS_BY_MIME_TYPE.get(mime, '.bin')
+
+    def _download_is_current(
+        self,
+        directory: str,
+        previous: Dict[str, Any],
+        hash_algorithm: Optional[str],
+        chunk_size: int,
+    ) -> bool:
+        """True if a previously downloaded file is still present and unchanged."""
+        filename = previous.get('filename')
+        if not filename:
+            return False
+        path = os.path.join(directory, filename)
+        if not os.path.isfile(path) or os.path.getsize(path) != previous.get('size'):
+            return False
+        if hash_algorithm and previous.get('digest'):
+            if previous.get('hash_algorithm') != hash_algorithm:
+                return False
+            return self._file_hasher(path, hash_algorithm, chunk_size).hexdigest() == previous['digest']
+        return True
+
+    @staticmethod
+    def _read_manifest(path: str) -> Dict[str, Dict[str, Any]]:
+        if not os.path.exists(path):
+            return {}
+        try:
+            with open(path, 'r', encoding='utf-8') as fh:
+                items = json.load(fh).get('items', {})
+            return items if isinstance(items, dict) else {}
+        except (OSError, ValueError, AttributeError) as exc:
+            logger.warning(f"Ignoring unreadable manifest {path}: {exc}")
+            return {}
+
+    @staticmethod
+    def _write_manifest(path: str, items: Dict[str, Dict[str, Any]]) -> None:
+        fd, tmp_path = _mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+        with os.fdopen(fd, 'w', encoding='utf-8') as fh:
+            json.dump({'version': 1, 'items': items}, fh, indent=1, sort_keys=True)
+        os.replace(tmp_path, path)
+
+    def download_zip(
+        self,
+        targets: List[Union[tuple, Dict[str, Any]]],
+        destination: Union[str, 'os.PathLike[str]', IO[bytes]],
+        max_workers: int = DEFAULT_MAX_WORKERS,
+        max_in_flight: Optional[int] = None,
+        spool_size: int = DEFAULT_ZIP_SPOOL_SIZE,
+        compression: int = zipfile.ZIP_DEFLATED
+    ) -> List[Dict[str, Any]]:
+        """
+        Download many binaries in parallel and stream them into one ZIP archive.
+
+        Targets use the same shapes as :meth:`download_many`. Entries are
+        written in input order, named like :meth:`download_many` files
+        (duplicates get a `` (n)`` suffix). Workers spool each body into a
+        temporary file that stays in memory up to ``spool_size`` bytes and
+        moves to disk beyond that. At most ``max_in_flight`` downloads are
+        pending at any time, so memory stays bounded by roughly
+        ``max_in_flight * spool_size`` regardless of the archive size.
+
+        :param targets: Download targets.
+        :param destination: Path (written to ``<path>.part`` and renamed when
+            complete) or a writable binary stream; non-seekable streams work.
+        :param max_workers: Maximum parallel downloads.
+        :param max_in_flight: Maximum downloaded-but-unwritten entries
+            (default ``2 * max_workers``).
+        :param spool_size: In-memory bytes per entry before spooling to disk.
+        :param compression: ``zipfile`` compression constant.
+        :return: One entry per target, in input order, with 'endpoint', 'id',
+            'action', 'status' ('added' or 'failed'), 'name', 'size',
+            'content_type', 'seconds' and 'error'. Failed targets are not in
+            the archive.
+        """
+        normalized = [self._normalize_download_target(target) for target in targets]
+        max_in_flight = max(max_in_flight or 2 * max_workers, 1)
+
+        if isinstance(destination, (str, os.PathLike)):
+            path = os.fspath(destination)
+            part_path = path + '.part'
+            try:
+                with open(part_path, 'wb') as fh:
+                    results = self._write_zip(
+                        normalized, fh, max_workers, max_in_flight, spool_size, compression
+                    )
+                os.replace(part_path, path)
+            except BaseException:
+                if os.path.exists(part_path):
+                    os.remove(part_path)
+                raise
+            return results
+        return self._write_zip(
+            normalized, destination, max_workers, max_in_flight, spool_size, compression
+        )
+
+    def _write_zip(
+        self,
+        targets: List[Dict[str, Any]],
+        stream: IO[bytes],
+        max_workers: int,
+        max_in_flight: int,
+        spool_size: int,
+        compression: int,
+    ) -> List[Dict[str, Any]]:
+        def fetch(target: Dict[str, Any]):
+            start = time.perf_counter()
+            spool = tempfile.SpooledTemporaryFile(max_size=spool_size)
+            try:
+                url = self._download_url(target['endpoint'], target['id'], target['action'])
+                info = self._download_to_file(url, target['params'], spool, DEFAULT_CHUNK_SIZE, None)
+            except BaseException:
+                spool.close()
+                raise
+            spool.seek(0)
+            return spool, info, time.perf_counter() - start
+
+        results: List[Dict[str, Any]] = []
+        used_names: set = set()
+        pending: deque = deque()
+
+        def write_next(archive: zipfile.ZipFile) -> None:
+            target, future = pending.popleft()
+            entry = {
+                'endpoint': target['endpoint'],
+                'id': target['id'],
+                'action': target['action'],
+                'status': 'added',
+                'name': None,
+                'size': None,
+                'content_type': None,
+                'seconds': 0.0,
+                'error': None,
+            }
+            try:
+                spool, info, seconds = future.result()
+            except (WeclappAPIError, OSError) as exc:
+                logger.error(f"ZIP entry for {target['endpoint']} {target['id']} failed: {exc}")
+                entry.update(status='failed', error=str(exc))
+                results.append(entry)
+                return
+            with spool:
+                name = self._unique_name(
+                    target['filename'] or target['stem'] + self._extension_for(info['content_type']),
+                    used_names,
+                )
+                zip_info = zipfile.ZipInfo(name, date_time=time.localtime()[:6])
+                zip_info.compress_type = compression
+                with archive.open(zip_info, 'w', force_zip64=True) as member:
+                    shutil.copyfileobj(spool, member, DEFAULT_CHUNK_SIZE)
+            entry.update(name=name, size=info['size'], content_type=info['content_type'], seconds=seconds)
+            results.append(entry)
+
+        self._reserve_connections(max_workers)
+        with zipfile.ZipFile(stream, 'w', compression=compression) as archive:
+            try:
+                with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                    try:
+                        for target in targets:
+                            if len(pending) >= max_in_flight:
+                                write_next(archive)
+                            pending.append((target, executor.submit(fetch, target)))
+                        while pending:
+                            write_next(archive)
+                    except BaseException:
+                        for _target, future in pending:
+                            future.cancel()
+                        raise
+            finally:
+                # On error, drop spooled bodies that were never written. The
+                # executor has shut down, so every remaining future is done.
+                for _target, future in pending:
+                    if not future.cancelled() and future.exception() is None:
+                        future.result()[0].close()
+        return results
+
+    @staticmethod
+    def _unique_name(name: str, used: set) -> str:
+        candidate = name
+        stem, ext = os.path.splitext(name)
+        counter = 2
+        while candidate in used:
+            candidate = f"{stem} ({counter}){ext}"
+            counter += 1
+        used.add(candidate)
+        return candidate
+
+
+class DocumentMirror:
+    """Incremental, content-addressed local mirror of weclapp documents.
+
+    Documents are listed per entity through the ``document`` endpoint (weclapp
+    requires ``entityName`` and ``entityId``) and downloaded only when their
+    ``id``, ``version`` or ``lastModifiedDate`` changed since the last sync.
+    Blobs are stored once per content digest under
+    ``{directory}/blobs/{algorithm}/{xx}/{digest}``, so a file attached to many
+    entities is kept once. ``{directory}/index.json`` maps every mirrored
+    entity to its documents and every document to its blob.
+
+    Example::
+
+        mirror = DocumentMirror(client, "/srv/weclapp-documents")
+        stats = mirror.sync([("salesOrder", "123"), ("salesOrder", "456")])
+        path = mirror.path_for(mirror.documents_for("salesOrder", "123")[0]["id"])
+    """
+
+    INDEX_FILENAME = 'index.json'
+    LIST_PROPERTIES = 'id,version,lastModifiedDate,name,mediaType,documentSize'
+
+    def __init__(
+        self,
+        client: Weclapp,
+        directory: Union[str, 'os.PathLike[str]'],
+        hash_algorithm: str = 'sha256',
+        max_workers: int = DEFAULT_MAX_WORKERS,
+    ) -> None:
+        """
+        :param client: Weclapp client used for listing and downloading.
+        :param directory: Mirror root; created if missing.
+        :param hash_algorithm: ``hashlib`` algorithm used to address blobs.
+        :param max_workers: Maximum parallel list and download requests.
+        """
+        self.client = client
+        self.directory = os.fspath(directory)
+        self.hash_algorithm = hash_algorithm
+        self.max_workers = max_workers
+        self._index_path = os.path.join(self.directory, self.INDEX_FILENAME)
+        self.index = self._load_index()
+
+    def sync(self, entities: List[tuple], prune: bool = False) -> Dict[str, Any]:
+        """Bring the mirror up to date for the given entities.
+
+        :param entities: ``(entityName, entityId)`` pairs to mirror.
+        :param prune: Also delete blobs no longer referenced by any document.
+        :return: Stats dict with 'entities', 'documents', 'downloaded',
+            'unchanged', 'deduplicated', 'bytes', 'pruned' and 'failed'
+            (list of ``{'id', 'error'}``).
+        """
+        os.makedirs(self.directory, exist_ok=True)
+        entities = [(str(name), str(entity_id)) for name, entity_id in entities]
+        stats: Dict[str, Any] = {
+            'entities': len(entities),
+            'documents': 0,
+            'downloaded': 0,
+            'unchanged': 0,
+            'deduplicated': 0,
+            'bytes': 0,
+            'pruned': 0,
+            'failed': [],
+        }
+        listings = self._list_documents(entities, stats['failed'])
+
+        known = self.index['documents']
+        latest: Dict[str, Dict[str, Any]] = {}
+        for documents in listings.values():
+            for document in documents:
+                latest[str(document['id'])] = document
+        stats['documents'] = len(latest)
+
+        changed = [doc for doc_id, doc in latest.items() if not self._is_current(known.get(doc_id), doc)]
+        stats['unchanged'] = len(latest) - len(changed)
+
+        self.client._reserve_connections(self.max_workers)
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = {executor.submit(self._fetch_blob, doc): doc for doc in changed}
+            for future in as_completed(futures):
+                doc = futures[future]
+                doc_id = str(doc['id'])
+                try:
+                    digest, size, stored = future.result()
+                except (WeclappAPIError, OSError) as exc:
+                    logger.error(f"Mirroring document {doc_id} failed: {exc}")
+                    stats['failed'].append({'id': doc_id, 'error': str(exc)})
+                    continue
+                known[doc_id] = self._index_entry(doc, digest, size)
+                stats['downloaded'] += 1
+                stats['bytes'] += size if stored else 0
+                stats['deduplicated'] += 0 if stored else 1
+
+        for (name, entity_id), documents in listings.items():
+            self.index['entities'][f"{name}/{entity_id}"] = [str(doc['id']) for doc in documents]
+
+        referenced = {doc_id for doc_ids in self.index['entities'].values() for doc_id in doc_ids}
+        for doc_id in list(known):
+            if doc_id not in referenced:
+                del known[doc_id]
+        if prune:
+            stats['pruned'] = self._prune_blobs({entry['digest'] for entry in known.values()})
+
+        self._save_index()
+        return stats
+
+    def documents_for(self, entity_name: str, entity_id: str) -> List[Dict[str, Any]]:
+        """Index entries (with 'id' and 'path') of the documents mirrored for one entity."""
+        doc_ids = self.index['entities'].get(f"{entity_name}/{entity_id}", [])
+        documents = self.index['documents']
+        return [
+            dict(documents[doc_id], id=doc_id, path=self.blob_path(documents[doc_id]['digest']))
+            for doc_id in doc_ids if doc_id in documents
+        ]
+
+    def path_for(self, document_id: str) -> Optional[str]:
+        """Local blob path of a mirrored document, or ``None`` if it isn't mirrored."""
+        entry = self.index['documents'].get(str(document_id))
+        return self.blob_path(entry['digest']) if entry else None
+
+    def blob_path(self, digest: str) -> str:
+        return os.path.join(self.directory, 'blobs', self.hash_algorithm, digest[:2], digest)
+
+    def _list_documents(
+        self, entities: List[tuple], failed: List[Dict[str, Any]]
+    ) -> Dict[tuple, List[Dict[str, Any]]]:
+        """List document metadata per entity; entities that fail to list are
+        reported in ``failed`` and keep their previous index entries."""
+        def list_entity(entity: tuple) -> Optional[List[Dict[str, Any]]]:
+            name, entity_id = entity
+            try:
+                return self.client.get_all('document', params={
+                    'entityName': name,
+                    'entityId': entity_id,
+                    'properties': self.LIST_PROPERTIES,
+                })
+            except WeclappAPIError as exc:
+                logger.error(f"Listing documents of {name} {entity_id} failed: {exc}")
+                failed.append({'id': f"{name}/{entity_id}", 'error': str(exc)})
+                return None
+
+        if not entities:
+            return {}
+        self.client._reserve_connections(self.max_workers)
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            listed = zip(entities, executor.map(list_entity, entities))
+            return {entity: documents for entity, documents in listed if documents is not None}
+
+    def _is_current(self, entry: Optional[Dict[str, Any]], document: Dict[str, Any]) -> bool:
+        return (
+            entry is not None
+            and entry.get('version') == document.get('version')
+            and entry.get('lastModifiedDate') == document.get('lastModifiedDate')
+            and os.path.exists(self.blob_path(entry['digest']))
+        )
+
+    def _fetch_blob(self, document: Dict[str, Any]):
+        """Download one document into the blob store; returns ``(digest, size, stored)``."""
+        tmp_dir = os.path.join(self.directory, 'tmp')
+        os.makedirs(tmp_dir, exist_ok=True)
+        url = self.client._download_url('document', document['id'], None)
+        fd, tmp_path = _mkstemp(dir=tmp_dir, suffix='.part')
+        try:
+            with os.fdopen(fd, 'wb') as fh:
+                info = self.client._download_to_file(
+                    url, {}, fh, DEFAULT_CHUNK_SIZE, self.hash_algorithm
+                )
+            digest = info['digest']
+            blob = self.blob_path(digest)
+            if os.path.exists(blob):
+                os.remove(tmp_path)
+                return digest, info['size'], False
+            os.makedirs(os.path.dirname(blob), exist_ok=True)
+            os.replace(tmp_path, blob)
+            return digest, info['size'], True
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    @staticmethod
+    def _index_entry(document: Dict[str, Any], digest: str, size: int) -> Dict[str, Any]:
+        return {
+            'version': document.get('version'),
+            'lastModifiedDate': document.get('lastModifiedDate'),
+            'name': document.get('name'),
+            'mediaType': document.get('mediaType'),
+            'size': size,
+            'digest': digest,
+        }
+
+    def _prune_blobs(self, live_digests: set) -> int:
+        root = os.path.join(self.directory, 'blobs', self.hash_algorithm)
+        removed = 0
+        for dirpath, _dirnames, filenames in os.walk(root):
+            for filename in filenames:
+                if filename not in live_digests:
+                    os.remove(os.path.join(dirpath, filename))
+                    removed += 1
+        return removed
+
+    def _load_index(self) -> Dict[str, Any]:
+        empty = {'version': 1, 'hash_algorithm': self.hash_algorithm, 'documents': {}, 'entities': {}}
+        if not os.path.exists(self._index_path):
+            return empty
+        with open(self._index_path, 'r', encoding='utf-8') as fh:
+            index = json.load(fh)
+        if index.get('hash_algorithm') != self.hash_algorithm:
+            raise ValueError(
+                f"Mirror at {self.directory} uses {index.get('hash_algorithm')}, "
+                f"not {self.hash_algorithm}"
+            )
+        return index
+
+    def _save_index(self) -> None:
+        fd, tmp_path = _mkstemp(dir=self.directory, suffix='.tmp')
+        with os.fdopen(fd, 'w', encoding='utf-8') as fh:
+            json.dump(self.index, fh, sort_keys=True)
+        os.replace(tmp_path, self._index_path)
+
+
+class ArticleImageCache:
+    """On-disk LRU cache of server-scaled article image variants.
+
+    Variants are downloaded from ``article/id/{id}/downloadArticleImage`` with
+    ``scaleWidth`` / ``scaleHeight``, so weclapp does the resizing. Each
+    variant is keyed by ``(articleImageId, size)`` and remembers the image
+    ``version`` it was fetched for; asking for a different version replaces
+    it. Files live under ``{directory}/variants/`` and ``{directory}/index.json``
+    keeps the entries in least-recently-used order. When ``max_bytes`` or
+    ``max_entries`` is exceeded, the least recently used variants are evicted.
+
+    Example::
+
+        cache = ArticleImageCache(client, "/srv/thumbnails", max_bytes=2 * 1024 ** 3)
+        articles = client.get_all("article", params={"properties": "id,articleImages"})
+        stats = cache.sync(articles, sizes=[(200, 200), (800, None)])
+        path = cache.get(article_id, image_id, width=200, height=200, version=image_version)
+    """
+
+    INDEX_FILENAME = 'index.json'
+
+    def __init__(
+        self,
+        client: Weclapp,
+        directory: Union[str, 'os.PathLike[str]'],
+        max_bytes: Optional[int] = None,
+        max_entries: Optional[int] = None,
+        max_workers: int = DEFAULT_MAX_WORKERS,
+    ) -> None:
+        """
+        :param client: Weclapp client used for downloading.
+        :param directory: Cache root; created if missing.
+        :param max_bytes: Optional limit for the total size of cached variants.
+        :param max_entries: Optional limit for the number of cached variants.
+        :param max_workers: Maximum parallel downloads in :meth:`sync`.
+        """
+        self.client = client
+        self.directory = os.fspath(directory)
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self.max_workers = max_workers
+        self._index_path = os.path.join(self.directory, self.INDEX_FILENAME)
+        self._lock = threading.Lock()
+        # Index writes happen outside _lock; a snapshot older than the one
+        # already written is skipped.
+        self._save_lock = threading.Lock()
+        self._dirty = False
+        self._generation = 0
+        self._saved_generation = 0
+        self.entries = self._load_index()
+        self.total_bytes = sum(entry['size'] for entry in self.entries.values())
+        self.evicted = 0
+
+    def get(
+        self,
+        article_id: str,
+        article_image_id: str,
+        width: Optional[int] = None,
+        height: Optional[int] = None,
+        version: Optional[str] = None,
+    ) -> str:
+        """Return the local path of an image variant, downloading it if needed.
+
+        :param article_id: Article the image belongs to.
+        :param article_image_id: ``id`` of the entry in ``article.articleImages``.
+        :param width: ``scaleWidth``; ``None`` keeps the original width.
+        :param height: ``scaleHeight``; ``None`` keeps the original height.
+        :param version: Image ``version``; a cached variant of another version
+            is downloaded again.
+        :raises WeclappAPIError: on download failure.
+        :raises FileNotFoundError: if concurrent downloads keep evicting the
+            variant before it can be returned (limits too tight for the load).
+        """
+        key = self._key(article_image_id, width, height)
+        for _attempt in range(3):
+            path, _size, downloaded = self._get(article_id, article_image_id, width, height, version)
+            with self._lock:
+                # Another thread may have evicted the variant since _get released the lock.
+                entry = self.entries.get(key)
+                present = entry is not None and self._variant_path(entry['filename']) == path
+            if downloaded:
+                self.save()
+            if present:
+                return path
+        raise FileNotFoundError(f"Article image variant {key} was evicted before it could be returned")
+
+    def sync(self, articles: List[Dict[str, Any]], sizes: List[tuple]) -> Dict[str, Any]:
+        """Make sure every size of every image of the given articles is cached.
+
+        Only variants whose image ``version`` changed, or that are not cached
+        yet, are downloaded.
+
+        :param articles: Articles with ``id`` and ``articleImages`` (each with
+            ``id`` and ``version``).
+        :param sizes: ``(width, height)`` pairs; either may be ``None``.
+        :return: Stats dict with 'articles', 'variants', 'downloaded',
+            'cached', 'bytes', 'evicted' and 'failed' (list of ``{'id', 'error'}``).
+        """
+        jobs = []
+        for article in articles:
+            for image in article.get('articleImages') or []:
+                for width, height in sizes:
+                    jobs.append((str(article['id']), str(image['id']), width, height, image.get('version')))
+        stats: Dict[str, Any] = {
+            'articles': len(articles),
+            'variants': len(jobs),
+            'downloaded': 0,
+            'cached': 0,
+            'bytes': 0,
+            'evicted': 0,
+            'failed': [],
+        }
+        evicted_before = self.evicted
+
+        def run(job: tuple) -> None:
+            try:
+                _path, size, downloaded = self._get(*job)
+            except (WeclappAPIError, OSError) as exc:
+                logger.error(f"Caching article image {job[1]} failed: {exc}")
+                with self._lock:
+                    stats['failed'].append({'id': job[1], 'error': str(exc)})
+                return
+            with self._lock:
+                if downloaded:
+                    stats['downloaded'] += 1
+                    stats['bytes'] += size
+                else:
+                    stats['cached'] += 1
+
+        if jobs:
+            self.client._reserve_connections(self.max_workers)
+            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                list(executor.map(run, jobs))
+        with self._lock:
+            stats['evicted'] = self.evicted - evicted_before
+        self.save()
+        return stats
+
+    def save(self) -> None:
+        """Write the index to disk if an entry was added or evicted since the last save.
+
+        :meth:`get` saves after each download and :meth:`sync` once at the end.
+        Recency updates from cache hits stay in memory until the next save.
+        """
+        with self._lock:
+            if not self._dirty:
+                return
+            self._dirty = False
+            self._generation += 1
+            generation = self._generation
+            entries = list(self.entries.items())
+        with self._save_lock:
+            if generation < self._saved_generation:
+                return
+            try:
+                self._write_index(entries)
+            except BaseException:
+                with self._lock:
+                    self._dirty = True
+                raise
+            self._saved_generation = generation
+
+    @staticmethod
+    def _key(article_image_id, width, height) -> str:
+        return f"{article_image_id}/{width or ''}x{height or ''}"
+
+    def _get(self, article_id, article_image_id, width, height, version):
+        """Return ``(path, size, downloaded)``; the index is updated but not saved.
+
+        The size comes from the index, so callers never stat the file, which
+        another thread may evict as soon as the lock is released.
+        """
+        key = self._key(article_image_id, width, height)
+        with self._lock:
+            entry = self.entries.get(key)
+            if entry is not None and entry['version'] == version:
+                path = self._variant_path(entry['filename'])
+                if os.path.exists(path):
+                    self.entries.move_to_end(key)
+                    return path, entry['size'], False
+
+        params: Dict[str, Any] = {'articleImageId': article_image_id}
+        if width:
+            params['scaleWidth'] = width
+        if height:
+            params['scaleHeight'] = height
+        tmp_dir = os.path.join(self.directory, 'tmp')
+        os.makedirs(tmp_dir, exist_ok=True)
+        url = self.client._download_url('article', article_id, 'downloadArticleImage')
+        fd, tmp_path = _mkstemp(dir=tmp_dir, suffix='.part')
+        try:
+            with os.fdopen(fd, 'wb') as fh:
+                info = self.client._download_to_file(url, params, fh, DEFAULT_CHUNK_SIZE, None)
+            stem = re.sub(r'[^A-Za-z0-9._-]', '_', f"{article_image_id}_{width or ''}x{height or ''}_{version}")
+            filename = f"{hashlib.sha1(str(article_image_id).encode()).hexdigest()[:2]}/{stem}"
+            filename += Weclapp._extension_for(info['content_type'])
+            path = self._variant_path(filename)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+        with self._lock:
+            previous = self.entries.pop(key, None)
+            if previous is not None:
+                self.total_bytes -= previous['size']
+                if previous['filename'] != filename:
+                    self._remove_file(previous['filename'])
+            self.entries[key] = {
+                'article_id': article_id,
+                'version': version,
+                'filename': filename,
+                'size': info['size'],
+                'content_type': info['content_type'],
+            }
+            self.total_bytes += info['size']
+            self._evict()
+            self._dirty = True
+        return path, info['size'], True
+
+    def _evict(self) -> None:
+        """Drop least recently used variants until the limits hold (lock held).
+        The most recent entry is always kept."""
+        while len(self.entries) > 1 and (
+            (self.max_entries is not None and len(self.entries) > self.max_entries)
+            or (self.max_bytes is not None and self.total_bytes > self.max_bytes)
+        ):
+            _key, entry = self.entries.popitem(last=False)
+            self.total_bytes -= entry['size']
+            self._remove_file(entry['filename'])
+            self.evicted += 1
+
+    def _variant_path(self, filename: str) -> str:
+        return os.path.join(self.directory, 'variants', filename)
+
+    def _remove_file(self, filename: str) -> None:
+        try:
+            os.remove(self._variant_path(filename))
+        except FileNotFoundError:
+            pass
 
-        return self._send_request("GET", url, params=params)
\ No newline at end of file
+    def _load_index(self) -> 'OrderedDict[str, Dict[str, Any]]':
+        if not os.path.exists(self._index_path):
+            return OrderedDict()
+        with open(self._index_path, 'r', encoding='utf-8') as fh:
+            # Entries are stored least recently used first.
+            return OrderedDict(json.load(fh).get('entries', []))
+
+    def _write_index(self, entries: List[tuple]) -> None:
+        os.makedirs(self.directory, exist_ok=True)
+        fd, tmp_path = _mkstemp(dir=self.directory, suffix='.tmp')
+        with os.fdopen(fd, 'w', encoding='utf-8') as fh:
+            json.dump({'version': 1, 'entries': entries}, fh)
+        os.replace(tmp_path, self._index_path)